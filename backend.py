@@ -1,8 +1,14 @@
+import csv
+import itertools
+import json
+import math
 import numpy as np
-from typing import List, Dict, Tuple, Optional, Union
+from typing import List, Dict, Tuple, Optional, Union, Callable, Iterator
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from PyQt5.QtWidgets import QMessageBox
+from openpyxl import load_workbook
+from metrics import kendall_distance, pairwise_metrics
 
 
 class AHPBackend:
@@ -12,6 +18,22 @@ class AHPBackend:
                  6: 1.24, 7: 1.32, 8: 1.41, 9: 1.45,
                  10: 1.49, 11: 1.51, 12: 1.54, 13: 1.56,
                  14: 1.57, 15: 1.59}
+    # Все значения шкалы Саати с обратными, по возрастанию
+    SAATY_SCALE = np.array([1 / v for v in range(9, 1, -1)] + list(range(1, 10)), dtype=float)
+    # Априорный разброс суждения эксперта в логарифмах (около одной ступени шкалы)
+    JUDGMENT_LOG_SIGMA = 0.5
+    # Шкала интенсивности по умолчанию для режима оценок
+    DEFAULT_RATING_SCALE = ["Отлично", "Хорошо", "Удовлетворительно", "Плохо"]
+    # Размер группы при сравнении альтернатив группами (соседние группы делят опорный элемент)
+    CLUSTER_SIZE = 7
+    # Точность и наибольший распознаваемый период степенного метода для суперматрицы ANP
+    ANP_TOLERANCE = 1e-10
+    ANP_MAX_PERIOD = 12
+    # Поля строки ответа эксперта и число строк, читаемых из файла опроса за раз
+    SURVEY_FIELDS = ('expert', 'matrix', 'i', 'j', 'value')
+    SURVEY_CHUNK_ROWS = 65536
+    # Способы синтеза приоритетов альтернатив
+    SYNTHESIS_MODES = {'distributive': "Распределительный", 'ideal': "Идеальный"}
 
 
     def __init__(self):
@@ -24,6 +46,38 @@ class AHPBackend:
         self.criteria: List[str] = []
         self.criteria_types: Dict[str, List[str]] = {}
         self.matrices: Dict[str, np.ndarray] = {}
+        # Введенные суждения: матрица с NaN в незаполненных ячейках и имена ее строк
+        self.judgments: Dict[str, np.ndarray] = {}
+        self.judgment_items: Dict[str, List[str]] = {}
+        # Число заполненных ячеек над диагональю; сама карта заполнения - не-NaN ячейки judgments
+        self.filled_counts: Dict[str, int] = {}
+        # Режим оценок: альтернативы оцениваются по шкалам интенсивности критериев
+        self.rating_mode = False
+        self.rating_scales: Dict[str, List[str]] = {}
+        self.ratings = np.full((0, 0), -1, dtype=np.int16)  # альтернативы × критерии, -1 - нет оценки
+        self.rating_axes: Tuple[List[str], List[str]] = ([], [])
+        self.unrated_count = 0
+        # Сравнение альтернатив небольшими группами вместо одной большой матрицы
+        self.cluster_mode = False
+        # Нечеткие и интервальные суждения: тройки (l, m, u) в последней оси, NaN - пустая ячейка
+        self.fuzzy_mode = False
+        self.interval_mode = False
+        self.fuzzy_judgments: Dict[str, np.ndarray] = {}
+        # Именованные наборы суждений (сценарии); массивы матриц общие, пока матрица не изменена
+        self.scenarios: Dict[str, Dict[str, dict]] = {}
+        self.active_scenario: Optional[str] = None
+        # Накопленные ответы экспертов: по матрице - имена элементов, суммы логарифмов
+        # и число ответов для ячеек над диагональю; сами ответы не хранятся
+        self.survey_aggregates: Dict[str, Dict[str, object]] = {}
+        self.survey_experts: set = set()
+        # Данные последнего расчета для оценки добавления/удаления альтернативы без пересчета матриц
+        self.synthesis_state: Dict[str, object] = {}
+        # Локальные приоритеты последнего расчета для мгновенного пересчета при других весах
+        self.reweight_state: Dict[str, object] = {}
+        # Сеть ANP: кластеры узлов, веса влияния кластера на узел и веса кластеров
+        self.anp_clusters: Dict[str, List[str]] = {}
+        self.anp_influences: Dict[Tuple[str, str], np.ndarray] = {}
+        self.anp_cluster_weights: Dict[str, Dict[str, float]] = {}
         self.priorities: Dict[str, np.ndarray] = {}
         self.consistency_data: Dict[str, Dict[str, float]] = {}
 
@@ -33,6 +87,7 @@ class AHPBackend:
         name = name.strip()
         if name and name not in self.alternatives:
             self.alternatives.append(name)
+            self.sync_judgments()
             return True
         return False
 
@@ -42,6 +97,7 @@ class AHPBackend:
         name = name.strip()
         if name and name not in self.criteria:
             self.criteria.append(name)
+            self.sync_judgments()
             return True
         return False
 
@@ -55,9 +111,1295 @@ class AHPBackend:
         valid_criteria = [c for c in criteria if c in self.criteria]
         if valid_criteria:
             self.criteria_types[type_name] = valid_criteria
+            self.sync_judgments()
             return True
         return False
 
+    @staticmethod
+    def _extend_unique(target: List[str], names) -> List[str]:
+        """Дописывает в список новые непустые имена без повторов, возвращает добавленные"""
+        seen = set(target)
+        added = []
+        for name in names:
+            name = str(name).strip()
+            if name and name not in seen:
+                seen.add(name)
+                added.append(name)
+        target.extend(added)
+        return added
+
+    def add_alternatives(self, names) -> List[str]:
+        """Добавляет альтернативы списком, возвращает действительно добавленные"""
+        added = self._extend_unique(self.alternatives, names)
+        self.sync_judgments()
+        return added
+
+    def add_criteria(self, names) -> List[str]:
+        """Добавляет критерии списком, возвращает действительно добавленные"""
+        added = self._extend_unique(self.criteria, names)
+        self.sync_judgments()
+        return added
+
+    def remove_alternatives(self, indices) -> None:
+        """Удаляет альтернативы по индексам"""
+        removed = set(indices)
+        self.alternatives = [a for k, a in enumerate(self.alternatives) if k not in removed]
+        self.sync_judgments()
+
+    def remove_criteria(self, indices) -> None:
+        """Удаляет критерии по индексам вместе с их вхождениями в виды критериев"""
+        removed = set(indices)
+        removed_names = {c for k, c in enumerate(self.criteria) if k in removed}
+        self.criteria = [c for k, c in enumerate(self.criteria) if k not in removed]
+
+        for type_name in list(self.criteria_types):
+            remaining = [c for c in self.criteria_types[type_name] if c not in removed_names]
+            if remaining:
+                self.criteria_types[type_name] = remaining
+            else:
+                del self.criteria_types[type_name]
+        self.sync_judgments()
+
+    def remove_criterion_types(self, type_names) -> None:
+        """Удаляет виды критериев по названиям"""
+        for type_name in type_names:
+            self.criteria_types.pop(type_name, None)
+        self.sync_judgments()
+
+    def rename_item(self, item_type: str, index: int, new_name: str) -> bool:
+        """Переименовывает альтернативу, критерий или вид критериев с сохранением суждений
+
+        item_type: 'alternatives', 'criteria' или 'criteria_types'.
+        """
+        new_name = new_name.strip()
+        names = list(self.criteria_types) if item_type == 'criteria_types' else getattr(self, item_type)
+        if not new_name or new_name in names or not 0 <= index < len(names):
+            return False
+        old_name = names[index]
+
+        if item_type == 'criteria_types':
+            # Порядок видов задается порядком ключей словаря
+            self.criteria_types = {new_name if name == old_name else name: criteria
+                                   for name, criteria in self.criteria_types.items()}
+            renamed_keys = {f'criteria_{old_name}': f'criteria_{new_name}'}
+        else:
+            names[index] = new_name
+            renamed_keys = {}
+            if item_type == 'criteria':
+                for criteria in self.criteria_types.values():
+                    if old_name in criteria:
+                        criteria[criteria.index(old_name)] = new_name
+                renamed_keys[f'alternatives_{old_name}'] = f'alternatives_{new_name}'
+                renamed_keys[f'ratings_{old_name}'] = f'ratings_{new_name}'
+                if old_name in self.rating_scales:
+                    self.rating_scales[new_name] = self.rating_scales.pop(old_name)
+            # Оценки альтернатив привязаны к именам строк и столбцов
+            axis = self.rating_axes[0] if item_type == 'alternatives' else self.rating_axes[1]
+            if old_name in axis:
+                axis[axis.index(old_name)] = new_name
+
+        # Сохраненные сценарии и накопленные ответы опроса ссылаются на те же ключи и имена
+        for judgment_set in [self._judgment_set()] + list(self.scenarios.values()):
+            self._rename_in_judgment_set(judgment_set, item_type, old_name, new_name, renamed_keys)
+        for old_key, new_key in renamed_keys.items():
+            if old_key in self.survey_aggregates:
+                self.survey_aggregates[new_key] = self.survey_aggregates.pop(old_key)
+        for key, aggregate in self.survey_aggregates.items():
+            if self.matrix_item_type(key) == item_type and old_name in aggregate['items']:
+                aggregate['items'][aggregate['items'].index(old_name)] = new_name
+        self.sync_judgments()
+        return True
+
+    @classmethod
+    def _rename_in_judgment_set(cls, judgment_set: Dict[str, dict], item_type: str, old_name: str,
+                                new_name: str, renamed_keys: Dict[str, str]) -> None:
+        """Переносит суждения набора на новые ключи матриц и новое имя элемента"""
+        for old_key, new_key in renamed_keys.items():
+            for store in judgment_set.values():
+                if old_key in store:
+                    store[new_key] = store.pop(old_key)
+        # Имя меняется и в строках матриц из элементов того же рода
+        for key, items in judgment_set['judgment_items'].items():
+            if cls.matrix_item_type(key) == item_type and old_name in items:
+                items[items.index(old_name)] = new_name
+
+    def move_item(self, item_type: str, index: int, new_index: int) -> bool:
+        """Перемещает элемент в списке; суждения переставляются вместе с ним"""
+        if item_type == 'criteria_types':
+            names = list(self.criteria_types)
+        else:
+            names = getattr(self, item_type)
+        if not (0 <= index < len(names) and 0 <= new_index < len(names)) or index == new_index:
+            return False
+
+        names.insert(new_index, names.pop(index))
+        if item_type == 'criteria_types':
+            self.criteria_types = {name: self.criteria_types[name] for name in names}
+        self.sync_judgments()
+        return True
+
+    @staticmethod
+    def matrix_item_type(matrix_key: str) -> str:
+        """Род элементов матрицы: 'alternatives', 'criteria' или 'criteria_types'"""
+        if matrix_key == 'criteria_types':
+            return 'criteria_types'
+        if matrix_key.startswith('ratings_'):
+            return 'ratings'
+        if matrix_key == 'alternatives' or matrix_key.startswith('alternatives_'):
+            return 'alternatives'
+        return 'criteria'
+
+    def expected_matrix_items(self) -> Dict[str, List[str]]:
+        """Все матрицы, которые может потребовать текущая иерархия, и их элементы"""
+        expected = {'alternatives': self.alternatives, 'criteria': self.criteria,
+                    'criteria_types': list(self.criteria_types)}
+        for type_name, criteria in self.criteria_types.items():
+            expected[f'criteria_{type_name}'] = criteria
+        for criterion in self.criteria:
+            expected[f'alternatives_{criterion}'] = self.alternatives
+            expected[f'ratings_{criterion}'] = self.rating_scale(criterion)
+        return expected
+
+    @staticmethod
+    def remap_judgments(matrix: np.ndarray, old_items: List[str], new_items: List[str]) -> np.ndarray:
+        """Переносит суждения на новый набор элементов
+
+        Строки и столбцы исчезнувших элементов отбрасываются, новые
+        элементы получают незаполненные (NaN) ячейки. Ячейка может быть
+        вектором (нечеткие суждения).
+        """
+        position = {name: k for k, name in enumerate(old_items)}
+        source = np.array([position.get(name, -1) for name in new_items], dtype=int)
+        kept = np.flatnonzero(source >= 0)
+
+        remapped = np.full((len(new_items), len(new_items)) + matrix.shape[2:], np.nan)
+        remapped[np.ix_(kept, kept)] = matrix[np.ix_(source[kept], source[kept])]
+        diagonal = np.arange(len(new_items))
+        remapped[diagonal, diagonal] = 1.0
+        return remapped
+
+    def sync_judgments(self) -> None:
+        """Приводит сохраненные суждения в соответствие с текущей иерархией"""
+        expected = self.expected_matrix_items()
+        for key in list(self.judgments):
+            items = expected.get(key)
+            if not items:
+                del self.judgments[key]
+                del self.judgment_items[key]
+                del self.filled_counts[key]
+                self.fuzzy_judgments.pop(key, None)
+            elif items != self.judgment_items[key]:
+                if key in self.fuzzy_judgments:
+                    self.fuzzy_judgments[key] = self.remap_judgments(
+                        self.fuzzy_judgments[key], self.judgment_items[key], items)
+                self.judgments[key] = self.remap_judgments(self.judgments[key], self.judgment_items[key], items)
+                self.judgment_items[key] = list(items)
+                self.filled_counts[key] = int(np.count_nonzero(self.fill_mask(key)))
+        self._sync_ratings()
+
+    def rating_scale(self, criterion: str) -> List[str]:
+        """Градации шкалы интенсивности критерия, от лучшей к худшей"""
+        return self.rating_scales.setdefault(criterion, list(self.DEFAULT_RATING_SCALE))
+
+    def set_rating_scale(self, criterion: str, levels: List[str]) -> bool:
+        """Задает градации шкалы критерия; оценки и суждения переносятся по названиям градаций"""
+        levels = self._extend_unique([], levels)
+        if criterion not in self.criteria or not levels:
+            return False
+
+        old_levels = self.rating_scale(criterion)
+        position = {name: k for k, name in enumerate(levels)}
+        # Таблица перевода старого номера градации в новый; последний элемент - для -1
+        lookup = np.array([position.get(name, -1) for name in old_levels] + [-1], dtype=np.int16)
+        self.rating_scales[criterion] = levels
+
+        self._sync_ratings()
+        column = self.rating_axes[1].index(criterion)
+        self.ratings[:, column] = lookup[self.ratings[:, column]]
+        self.unrated_count = int(np.count_nonzero(self.ratings < 0))
+        self.sync_judgments()
+        return True
+
+    def _sync_ratings(self) -> None:
+        """Приводит таблицу оценок в соответствие со списками альтернатив и критериев"""
+        old_alternatives, old_criteria = self.rating_axes
+        if old_alternatives == self.alternatives and old_criteria == self.criteria:
+            return
+
+        def source_positions(old, new):
+            position = {name: k for k, name in enumerate(old)}
+            source = np.array([position.get(name, -1) for name in new], dtype=int)
+            return np.flatnonzero(source >= 0), source[source >= 0]
+
+        rows, source_rows = source_positions(old_alternatives, self.alternatives)
+        cols, source_cols = source_positions(old_criteria, self.criteria)
+        ratings = np.full((len(self.alternatives), len(self.criteria)), -1, dtype=np.int16)
+        ratings[np.ix_(rows, cols)] = self.ratings[np.ix_(source_rows, source_cols)]
+
+        self.ratings = ratings
+        self.rating_axes = (list(self.alternatives), list(self.criteria))
+        self.unrated_count = int(np.count_nonzero(ratings < 0))
+
+    def set_rating(self, alternative: int, criterion: int, level: int) -> bool:
+        """Оценка альтернативы по критерию номером градации (-1 - снять оценку)"""
+        self._sync_ratings()
+        if not (0 <= alternative < self.ratings.shape[0] and 0 <= criterion < self.ratings.shape[1]):
+            return False
+        if not -1 <= level < len(self.rating_scale(self.criteria[criterion])):
+            return False
+
+        self.unrated_count += int(level < 0) - int(self.ratings[alternative, criterion] < 0)
+        self.ratings[alternative, criterion] = level
+        return True
+
+    def set_judgment(self, matrix_key: str, i: int, j: int, value: str) -> bool:
+        """Запоминает суждение для ячейки (i, j); пустое значение очищает ячейку
+
+        Запись "~3" - нечеткое суждение "примерно 3", "3-5" - интервальное
+        "от 3 до 5": в матрицу попадает среднее значение, а тройка (l, m, u) -
+        в fuzzy_judgments.
+        """
+        items = self.expected_matrix_items().get(matrix_key)
+        if not items or not (0 <= i < len(items) and 0 <= j < len(items)) or i == j:
+            return False
+
+        matrix = self.judgments.get(matrix_key)
+        if matrix is None:
+            matrix = np.full((len(items), len(items)), np.nan)
+            np.fill_diagonal(matrix, 1.0)
+            self.judgments[matrix_key] = matrix
+            self.judgment_items[matrix_key] = list(items)
+            self.filled_counts[matrix_key] = 0
+
+        value = value.strip()
+        number = self.parse_judgment(value) if value else np.full(3, np.nan)
+        if number is None:
+            return False
+
+        matrix = self._writable_judgments('judgments', matrix_key)
+        was_filled = not np.isnan(matrix[i, j])
+        matrix[i, j] = number[1]
+        matrix[j, i] = 1 / number[1]
+        self.filled_counts[matrix_key] += bool(value) - was_filled
+
+        # Массив нечетких суждений заводится при первом нечетком суждении матрицы
+        fuzzy = self.fuzzy_judgments.get(matrix_key)
+        if fuzzy is None and number[0] < number[2]:
+            fuzzy = self.fuzzy_judgments[matrix_key] = np.repeat(matrix[:, :, None], 3, axis=2)
+        if fuzzy is not None:
+            fuzzy = self._writable_judgments('fuzzy_judgments', matrix_key)
+            fuzzy[i, j] = number
+            fuzzy[j, i] = 1 / number[::-1]
+        return True
+
+    def parse_judgment(self, value: str) -> Optional[np.ndarray]:
+        """Тройка (l, m, u) для записи суждения или None, если запись неверна
+
+        "3", "1/5" - четкое суждение (v, v, v);
+        "~k" - примерно k: (k-1, k, k+1) в пределах шкалы, "~1" - (1/2, 1, 2), "~1/k" - обратное к "~k";
+        "a-b" - интервал от a до b: (a, sqrt(ab), b), середина - среднее геометрическое границ.
+        """
+        def crisp(text):
+            text = text.strip()
+            if not self.validate_matrix_value(text):
+                return None
+            return 1 / float(text[2:]) if text.startswith("1/") else float(text)
+
+        value = value.strip()
+        if value.startswith('~'):
+            k = crisp(value[1:])
+            if k is None:
+                return None
+            reciprocal = k < 1
+            k = 1 / k if reciprocal else k
+            number = np.array([0.5, 1.0, 2.0]) if k == 1 else np.array([k - 1, k, min(k + 1, 9)])
+            return 1 / number[::-1] if reciprocal else number
+
+        if '-' in value:
+            bounds = [crisp(part) for part in value.split('-', 1)]
+            if None in bounds or bounds[0] > bounds[1]:
+                return None
+            return np.array([bounds[0], math.sqrt(bounds[0] * bounds[1]), bounds[1]])
+
+        v = crisp(value)
+        return None if v is None else np.full(3, v)
+
+    def fill_mask(self, matrix_key: str) -> np.ndarray:
+        """Карта заполнения ячеек над диагональю (True - суждение введено)"""
+        matrix = self.judgments.get(matrix_key)
+        if matrix is None:
+            n = len(self.expected_matrix_items().get(matrix_key, []))
+            return np.zeros((n, n), dtype=bool)
+        return np.triu(~np.isnan(matrix), k=1)
+
+    def required_matrices(self, selected_levels: int = 3) -> Dict[str, List[str]]:
+        """Матрицы, которые нужно заполнить для расчета, в порядке вывода на вкладке"""
+        if selected_levels <= 1:
+            return {'alternatives': self.alternatives}
+
+        required = {}
+        if selected_levels >= 3:
+            required['criteria_types'] = list(self.criteria_types)
+            for type_name, criteria in self.criteria_types.items():
+                required[f'criteria_{type_name}'] = criteria
+        else:
+            required['criteria'] = self.criteria
+        prefix = 'ratings' if self.rating_mode else 'alternatives'
+        for criterion in self.criteria:
+            required[f'{prefix}_{criterion}'] = (self.rating_scale(criterion) if self.rating_mode
+                                                 else self.alternatives)
+        return required
+
+    def matrix_clusters(self, matrix_key: str) -> List[Tuple[int, int]]:
+        """Группы элементов матрицы, внутри которых вводятся суждения: диапазоны [start, stop)
+
+        В режиме групп альтернативы по порядку списка делятся на группы не больше
+        CLUSTER_SIZE, и соседние группы имеют один общий (опорный) элемент. Суждений
+        нужно O(n) вместо n(n-1)/2. Без режима групп вся матрица - одна группа.
+        """
+        n = len(self.judgment_items.get(matrix_key) or self.expected_matrix_items().get(matrix_key, []))
+        if not (self.cluster_mode and self.matrix_item_type(matrix_key) == 'alternatives') or n <= self.CLUSTER_SIZE:
+            return [(0, n)]
+        count = math.ceil((n - 1) / (self.CLUSTER_SIZE - 1))
+        bounds = np.rint(np.linspace(0, n - 1, count + 1)).astype(int)
+        return [(int(start), int(stop) + 1) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+    def required_mask(self, matrix_key: str) -> np.ndarray:
+        """Ячейки над диагональю, в которых нужны суждения для расчета"""
+        n = len(self.judgment_items.get(matrix_key) or self.expected_matrix_items().get(matrix_key, []))
+        mask = np.zeros((n, n), dtype=bool)
+        for start, stop in self.matrix_clusters(matrix_key):
+            mask[start:stop, start:stop] = True
+        return np.triu(mask, k=1)
+
+    def matrix_progress(self, matrix_key: str) -> Tuple[int, int]:
+        """Число заполненных и общее число суждений матрицы"""
+        clusters = self.matrix_clusters(matrix_key)
+        if len(clusters) == 1:
+            n = clusters[0][1]
+            return self.filled_counts.get(matrix_key, 0), n * (n - 1) // 2
+
+        total = sum((stop - start) * (stop - start - 1) // 2 for start, stop in clusters)
+        matrix = self.judgments.get(matrix_key)
+        if matrix is None:
+            return 0, total
+        filled = sum(int(np.count_nonzero(np.triu(~np.isnan(matrix[start:stop, start:stop]), k=1)))
+                     for start, stop in clusters)
+        return filled, total
+
+    def missing_judgments(self, selected_levels: int = 3) -> int:
+        """Сколько суждений осталось ввести до расчета"""
+        missing = 0
+        for key in self.required_matrices(selected_levels):
+            filled, total = self.matrix_progress(key)
+            missing += total - filled
+        if self.rating_mode and selected_levels >= 2:
+            self._sync_ratings()
+            missing += self.unrated_count
+        return missing
+
+    def build_required_matrices(self, selected_levels: int = 3) -> Dict[str, np.ndarray]:
+        """Полные матрицы сравнений для расчета из введенных суждений"""
+        matrices = {}
+        for key in self.required_matrices(selected_levels):
+            matrix = self.judgments.get(key)
+            if matrix is None:
+                continue
+            if len(self.matrix_clusters(key)) > 1:
+                filled, total = self.matrix_progress(key)
+                if filled == total:
+                    # Ячейки между группами достраиваются по приоритетам, сцепленным через опорные элементы
+                    x = self.cluster_log_priorities(key)
+                    matrices[key] = np.where(np.isnan(matrix), np.exp(np.subtract.outer(x, x)), matrix)
+            elif not np.isnan(matrix).any():
+                matrices[key] = matrix.copy()
+        return matrices
+
+    def cluster_log_priorities(self, matrix_key: str) -> np.ndarray:
+        """Логарифмы приоритетов по заполненным группам матрицы
+
+        В каждой группе берется среднее геометрическое строк, затем шкала группы
+        сдвигается так, чтобы опорный элемент совпал с его оценкой в предыдущей группе.
+        """
+        matrix = self.judgments[matrix_key]
+        x = np.zeros(matrix.shape[0])
+        for start, stop in self.matrix_clusters(matrix_key):
+            local = np.log(matrix[start:stop, start:stop]).mean(axis=1)
+            x[start + 1:stop] = local[1:] - local[0] + x[start]
+        return x - x.mean()
+
+    def matrix_consistency(self, matrix_key: str, matrix: np.ndarray) -> Dict[str, float]:
+        """Согласованность матрицы; при вводе по группам - показатели наихудшей группы"""
+        reports = [self.check_consistency(matrix[start:stop, start:stop])
+                   for start, stop in self.matrix_clusters(matrix_key)]
+        return max(reports, key=lambda report: report['CR'])
+
+    def is_ready(self, selected_levels: int = 3) -> bool:
+        """Все ли матрицы, нужные для расчета, заполнены"""
+        return self.missing_judgments(selected_levels) == 0
+
+    def next_missing_judgment(self, selected_levels: int = 3,
+                              after: Optional[Tuple[str, int, int]] = None) -> Optional[Tuple[str, int, int]]:
+        """Следующая незаполненная ячейка (ключ матрицы, i, j) после ячейки after
+
+        Обход идет по матрицам в порядке вывода и по строкам внутри матрицы;
+        после последней ячейки поиск продолжается с начала. Полностью
+        заполненные матрицы пропускаются по счетчику без просмотра ячеек.
+        """
+        required = self.required_matrices(selected_levels)
+        keys = list(required)
+        if not keys:
+            return None
+
+        start = keys.index(after[0]) if after and after[0] in required else 0
+        for step in range(len(keys) + 1):
+            key = keys[(start + step) % len(keys)]
+            filled, total = self.matrix_progress(key)
+            if filled >= total:
+                continue
+
+            n = len(required[key])
+            rows, cols = np.nonzero(~self.fill_mask(key) & self.required_mask(key))
+            if step == 0 and after and after[0] == key:
+                # В матрице текущей ячейки ищем только дальше нее
+                later = rows * n + cols > after[1] * n + after[2]
+                rows, cols = rows[later], cols[later]
+            if rows.size:
+                return key, int(rows[0]), int(cols[0])
+        return None
+
+    def judgment_text(self, matrix_key: str, i: int, j: int) -> str:
+        """Суждение ячейки (i, j) в записи шкалы Саати или пустая строка"""
+        matrix = self.judgments.get(matrix_key)
+        if matrix is None or not (0 <= i < matrix.shape[0] and 0 <= j < matrix.shape[0]):
+            return ""
+        value = matrix[i, j]
+        if np.isnan(value):
+            return ""
+        fuzzy = self.fuzzy_judgments.get(matrix_key)
+        if fuzzy is not None and fuzzy[i, j, 0] < fuzzy[i, j, 2]:
+            text = "~" + self.format_judgment(value)
+            number = self.parse_judgment(text)
+            if number is not None and np.allclose(number, fuzzy[i, j]):
+                return text
+            return f"{self.format_judgment(fuzzy[i, j, 0])}-{self.format_judgment(fuzzy[i, j, 2])}"
+        return self.format_judgment(value)
+
+    @staticmethod
+    def format_judgment(value: float) -> str:
+        """Запись значения шкалы Саати: "3", "1/5"; прочие отношения - десятичной дробью"""
+        if value >= 1 and abs(value - round(value)) < 1e-9:
+            return str(int(round(value)))
+        if value < 1 and abs(1 / value - round(1 / value)) < 1e-9:
+            return f"1/{int(round(1 / value))}"
+        return f"{value:.3g}"
+
+    @classmethod
+    def snap_to_saaty(cls, values: np.ndarray) -> np.ndarray:
+        """Ближайшие (в логарифмах) значения шкалы Саати для массива отношений"""
+        log_scale = np.log(cls.SAATY_SCALE)
+        logs = np.log(np.asarray(values, dtype=float))
+        # Середины между соседними значениями шкалы разбивают ось на интервалы
+        bounds = (log_scale[1:] + log_scale[:-1]) / 2
+        return cls.SAATY_SCALE[np.searchsorted(bounds, logs)]
+
+    @staticmethod
+    def _connected_components(n: int, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """Номера связных компонент графа сравнений (система непересекающихся множеств)"""
+        parent = list(range(n))
+
+        def find(k):
+            while parent[k] != k:
+                parent[k] = parent[parent[k]]
+                k = parent[k]
+            return k
+
+        for i, j in zip(rows.tolist(), cols.tolist()):
+            parent[find(i)] = find(j)
+        return np.array([find(k) for k in range(n)])
+
+    def estimate_log_priorities(self, matrix_key: str) -> Dict[str, np.ndarray]:
+        """Оценка приоритетов по неполной матрице методом наименьших квадратов в логарифмах
+
+        Минимизируется сумма (x_i - x_j - ln a_ij)^2 по введенным суждениям,
+        что сводится к системе с лапласианом графа сравнений L x = b.
+        Псевдообратная L+ дает и решение, и ковариацию оценки:
+        дисперсия разности x_i - x_j равна sigma^2 * (L+_ii + L+_jj - 2 L+_ij).
+        """
+        items = self.expected_matrix_items().get(matrix_key, [])
+        n = len(items)
+        matrix = self.judgments.get(matrix_key)
+        if matrix is None:
+            matrix = np.full((n, n), np.nan)
+
+        rows, cols = np.nonzero(self.fill_mask(matrix_key))
+        logs = np.log(matrix[rows, cols])
+
+        laplacian = np.zeros((n, n))
+        np.add.at(laplacian, (rows, cols), -1.0)
+        np.add.at(laplacian, (cols, rows), -1.0)
+        laplacian[np.diag_indices(n)] = -laplacian.sum(axis=1)
+        rhs = np.zeros(n)
+        np.add.at(rhs, rows, logs)
+        np.add.at(rhs, cols, -logs)
+
+        pinv = np.linalg.pinv(laplacian)
+        x = pinv @ rhs
+        components = self._connected_components(n, rows, cols)
+
+        # Разброс суждений оценивается по невязкам, если есть избыточные сравнения
+        dof = rows.size - (n - np.unique(components).size)
+        sigma = self.JUDGMENT_LOG_SIGMA
+        if dof > 0:
+            residuals = logs - (x[rows] - x[cols])
+            sigma = max(float(np.sqrt(np.sum(residuals ** 2) / dof)), sigma / 2)
+
+        return {'log_priorities': x, 'covariance': pinv, 'sigma': sigma,
+                'components': components, 'filled': self.fill_mask(matrix_key)}
+
+    @staticmethod
+    def normal_tail(z: np.ndarray) -> np.ndarray:
+        """P(Z > z) стандартного нормального распределения для z >= 0
+
+        erfc по приближению Абрамовица - Стиган 7.1.26 (погрешность до 1.5e-7):
+        для сравнения с порогом этого достаточно, а считается одними операциями NumPy.
+        """
+        x = np.asarray(z, dtype=float) / math.sqrt(2)
+        t = 1 / (1 + 0.3275911 * x)
+        poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+        return 0.5 * poly * np.exp(-x * x)
+
+    def next_informative_pair(self, matrix_key: str, tolerance: float = 0.05) -> Optional[Tuple[int, int]]:
+        """Следующая пара для пошагового ввода или None, если ранжирование устойчиво
+
+        Пока граф сравнений несвязен, предлагается пара, присоединяющая
+        очередной элемент к основной компоненте (остовное дерево). Затем
+        ранжирование считается устойчивым, когда у каждой пары соседних
+        по рангу элементов вероятность перестановки не выше tolerance
+        либо пара сравнена напрямую. Иначе выбирается незаполненная пара
+        с наибольшим произведением вероятности перестановки на уменьшение
+        суммарной дисперсии оценки, которое дало бы ее сравнение.
+        """
+        n = len(self.expected_matrix_items().get(matrix_key, []))
+        filled_count, total = self.matrix_progress(matrix_key)
+        if n < 2 or filled_count >= total:
+            return None
+
+        estimate = self.estimate_log_priorities(matrix_key)
+        x, pinv, sigma = estimate['log_priorities'], estimate['covariance'], estimate['sigma']
+        components, filled = estimate['components'], estimate['filled']
+        filled = filled | filled.T
+        required = self.required_mask(matrix_key)
+
+        # 1. Достраивание остовного дерева: элемент вне основной компоненты
+        #    сравнивается с "средним" элементом компоненты
+        main = components == components[0]
+        if not main.all() and len(self.matrix_clusters(matrix_key)) > 1:
+            # При вводе по группам - первая разрешенная пара, связывающая компоненту с остальными
+            rows, cols = np.nonzero(required & ~filled & (main[:, None] != main[None, :]))
+            return int(rows[0]), int(cols[0])
+        if not main.all():
+            members = np.flatnonzero(main)
+            anchor = members[np.argsort(x[members])[members.size // 2]]
+            other = np.flatnonzero(~main)[0]
+            return (int(min(anchor, other)), int(max(anchor, other)))
+
+        # 2. Вероятность перестановки для всех пар
+        diag = np.diag(pinv)
+        resistance = np.maximum(diag[:, None] + diag[None, :] - 2 * pinv, 1e-12)
+        z = np.abs(x[:, None] - x[None, :]) / (sigma * np.sqrt(resistance))
+        swap = self.normal_tail(z)
+
+        order = np.argsort(-x)
+        first, second = order[:-1], order[1:]
+        unsettled = (swap[first, second] > tolerance) & ~filled[first, second]
+        if not unsettled.any():
+            return None
+
+        # 3. Уменьшение следа ковариации при добавлении пары (i, j):
+        #    ||L+ (e_i - e_j)||^2 / (1 + R_ij)
+        squared = pinv @ pinv
+        sq_diag = np.diag(squared)
+        reduction = (sq_diag[:, None] + sq_diag[None, :] - 2 * squared) / (1 + resistance)
+
+        score = np.where(required & ~filled, swap * reduction, -1.0)
+        i, j = np.unravel_index(np.argmax(score), score.shape)
+        return int(i), int(j)
+
+    def suggest_missing_judgments(self, matrix_key: str) -> Dict[Tuple[int, int], str]:
+        """Подсказки для незаполненных ячеек по транзитивности
+
+        Значение пустой ячейки выводится как среднее геометрическое
+        произведений a_ik * a_kj по всем k, для которых обе ячейки известны.
+        В логарифмах это две матричные операции; выведенные значения
+        участвуют в следующем проходе, поэтому за O(log n) проходов
+        учитываются пути любой длины. Результат округляется до шкалы Саати.
+        Ячейки, не связанные с введенными суждениями, остаются без подсказки.
+        """
+        matrix = self.judgments.get(matrix_key)
+        if matrix is None or not self.filled_counts.get(matrix_key):
+            return {}
+
+        known = ~np.isnan(matrix)
+        logs = np.log(np.where(known, matrix, 1.0))
+        inferred = known.copy()
+        while True:
+            mask = inferred.astype(float)
+            counts = mask @ mask
+            new = (counts > 0) & ~inferred
+            if not new.any():
+                break
+            sums = logs @ mask + mask @ logs
+            logs[new] = sums[new] / counts[new]
+            inferred |= new
+
+        rows, cols = np.nonzero(inferred & ~known & self.required_mask(matrix_key))
+        values = self.snap_to_saaty(np.exp(logs[rows, cols]))
+        return {(i, j): self.format_judgment(value)
+                for i, j, value in zip(rows.tolist(), cols.tolist(), values.tolist())}
+
+    def fill_from_estimate(self, matrix_key: str) -> Dict[Tuple[int, int], str]:
+        """Заполняет пустые ячейки отношениями оценки приоритетов, округленными по шкале Саати"""
+        x = self.estimate_log_priorities(matrix_key)['log_priorities']
+        rows, cols = np.nonzero(~self.fill_mask(matrix_key) & self.required_mask(matrix_key))
+        values = self.snap_to_saaty(np.exp(x[rows] - x[cols]))
+
+        filled = {}
+        for i, j, value in zip(rows.tolist(), cols.tolist(), values.tolist()):
+            text = self.format_judgment(value)
+            self.set_judgment(matrix_key, i, j, text)
+            filled[(i, j)] = text
+        return filled
+
+    @staticmethod
+    def parse_item_names(text: str) -> List[str]:
+        """Имена элементов из текста: по одному в строке, из таблицы берется первый столбец"""
+        return [line.split('\t', 1)[0].strip() for line in text.splitlines() if line.strip()]
+
+    @staticmethod
+    def read_table_rows(file_path: str, max_col: Optional[int] = None) -> List[list]:
+        """Строки таблицы из файла CSV или XLSX (первый лист) как списки ячеек"""
+        if file_path.lower().endswith('.xlsx'):
+            workbook = load_workbook(file_path, read_only=True, data_only=True)
+            try:
+                return [list(row) for row in workbook.active.iter_rows(max_col=max_col, values_only=True)]
+            finally:
+                workbook.close()
+
+        with open(file_path, newline='', encoding='utf-8-sig') as f:
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+            except csv.Error:
+                dialect = csv.excel
+            return [row[:max_col] for row in csv.reader(f, dialect)]
+
+    @classmethod
+    def read_item_names(cls, file_path: str) -> List[str]:
+        """Читает имена элементов из первого столбца файла CSV или XLSX"""
+        return [str(row[0]).strip() for row in cls.read_table_rows(file_path, max_col=1)
+                if row and row[0] is not None and str(row[0]).strip()]
+
+    @classmethod
+    def read_attribute_table(cls, file_path: str) -> Tuple[List[str], List[str], np.ndarray]:
+        """Таблица показателей: первая строка - названия показателей, первый столбец - альтернативы
+
+        Возвращает имена альтернатив, названия показателей и матрицу значений
+        (альтернативы × показатели) с NaN в пустых и нечисловых ячейках.
+        """
+        rows = [row for row in cls.read_table_rows(file_path) if row and any(
+            cell is not None and str(cell).strip() for cell in row)]
+        if len(rows) < 2:
+            raise ValueError("В таблице нет строк с данными")
+
+        header = [str(cell).strip() if cell is not None else "" for cell in rows[0][1:]]
+        columns = [k for k, name in enumerate(header) if name]
+        names = [str(row[0]).strip() if row[0] is not None else "" for row in rows[1:]]
+
+        def to_float(cell):
+            if isinstance(cell, (int, float)):
+                return float(cell)
+            try:
+                return float(str(cell).strip().replace('\xa0', '').replace(' ', '').replace(',', '.'))
+            except (TypeError, ValueError):
+                return np.nan
+
+        width = len(header)
+        values = np.array([[to_float(cell) for cell in (list(row[1:]) + [None] * width)[:width]]
+                           for row in rows[1:]], dtype=float).reshape(len(rows) - 1, width)
+        keep = np.array([bool(name) for name in names], dtype=bool)
+        return ([name for name in names if name], [header[k] for k in columns],
+                values[np.ix_(keep, columns)])
+
+    @classmethod
+    def attribute_matrix(cls, values: np.ndarray, benefit: bool = True, mode: str = 'ratio') -> np.ndarray:
+        """Матрица сравнений альтернатив по числовому показателю
+
+        mode='ratio': a_ij = v_i / v_j (для затрат - v_j / v_i), значения должны быть положительны.
+        mode='ratio_saaty': те же отношения, округленные до ближайших значений шкалы Саати.
+        mode='saaty': разность значений линейно отображается на шкалу 1..9, где 9 соответствует
+        размаху показателя; лучшая по направлению альтернатива получает целое значение, другая - обратное.
+        Альтернативы без значения (NaN) дают незаполненные ячейки.
+        """
+        values = np.asarray(values, dtype=float)
+        missing = np.isnan(values)
+        known = values[~missing]
+
+        if mode in ('ratio', 'ratio_saaty'):
+            if np.any(known <= 0):
+                raise ValueError("для отношений нужны положительные значения")
+            matrix = np.divide.outer(values, values) if benefit else np.divide.outer(1 / values, 1 / values)
+            if mode == 'ratio_saaty':
+                matrix = np.where(np.isnan(matrix), np.nan, cls.snap_to_saaty(matrix))
+        else:
+            spread = np.ptp(known) if known.size else 0.0
+            if spread == 0:
+                matrix = np.ones((values.size, values.size))
+            else:
+                # Разность сразу в ступенях шкалы со знаком направления: -8..8
+                scaled = np.where(missing, known[0], values) * ((8 if benefit else -8) / spread)
+                steps = np.subtract.outer(scaled, scaled)
+                np.rint(steps, out=steps)
+                index = steps.astype(np.int8)
+                index += 8
+                matrix = cls.SAATY_SCALE[index]
+            matrix[missing, :] = np.nan
+            matrix[:, missing] = np.nan
+
+        np.fill_diagonal(matrix, 1.0)
+        return matrix
+
+    def apply_attribute_table(self, alternatives: List[str], attributes: List[str], values: np.ndarray,
+                              cost_attributes=(), mode: str = 'ratio') -> Dict[str, str]:
+        """Строит матрицы alternatives_{показатель} по таблице показателей
+
+        Недостающие альтернативы и критерии добавляются. Возвращает ошибки
+        по показателям, для которых матрицу построить не удалось.
+        """
+        self.add_alternatives(alternatives)
+        self.add_criteria(attributes)
+
+        # Строки таблицы переставляются в порядок альтернатив модели одной выборкой
+        row_of = {name: k for k, name in enumerate(alternatives)}
+        source = np.array([row_of.get(name, -1) for name in self.alternatives], dtype=int)
+        padded = np.vstack([values, np.full((1, values.shape[1]), np.nan)])
+        aligned = padded[source]  # -1 указывает на строку из NaN
+
+        cost_attributes = set(cost_attributes)
+        errors = {}
+        for k, attribute in enumerate(attributes):
+            try:
+                matrix = self.attribute_matrix(aligned[:, k], attribute not in cost_attributes, mode)
+            except ValueError as e:
+                errors[attribute] = str(e)
+                continue
+            key = f'alternatives_{attribute}'
+            self.judgments[key] = matrix
+            self.fuzzy_judgments.pop(key, None)
+            self.judgment_items[key] = list(self.alternatives)
+            # Заполнены все пары альтернатив, у которых есть значение показателя
+            known = int(np.count_nonzero(~np.isnan(aligned[:, k])))
+            self.filled_counts[key] = known * (known - 1) // 2
+        return errors
+
+    @classmethod
+    def read_survey_chunks(cls, file_path: str, chunk_rows: Optional[int] = None
+                           ) -> Iterator[Tuple[np.ndarray, int]]:
+        """Ответы экспертов из файла CSV или JSONL порциями по chunk_rows строк
+
+        Выдает массивы строк порция × (эксперт, матрица, i, j, значение) и позицию
+        в файле после порции (для индикатора хода). В CSV столбцы берутся по заголовку
+        expert, matrix, i, j, value, а без него - первые пять по порядку; в JSONL
+        каждая строка - объект с этими ключами. Файл JSON с массивом таких объектов
+        стандартный разбор читает целиком, поэтому он загружается сразу и только
+        выдается порциями.
+        """
+        chunk_rows = chunk_rows or cls.SURVEY_CHUNK_ROWS
+        jsonl = file_path.lower().endswith(('.jsonl', '.ndjson', '.json'))
+        width = len(cls.SURVEY_FIELDS)
+        with open(file_path, 'rb') as f:
+            if jsonl and f.read(4096).decode('utf-8-sig', errors='replace').lstrip().startswith('['):
+                f.seek(0)
+                records = json.loads(f.read().decode('utf-8-sig'))
+                position = f.tell()
+                for start in range(0, len(records), chunk_rows):
+                    yield (np.array([[str(record.get(name, '')) for name in cls.SURVEY_FIELDS]
+                                     for record in records[start:start + chunk_rows]], dtype=str).reshape(-1, width),
+                           position * min(start + chunk_rows, len(records)) // len(records))
+                return
+            f.seek(0)
+            if not jsonl:
+                # Разделитель надежнее определяется по заголовку: в значениях бывают запятые ("0,5")
+                sample = f.read(4096).decode('utf-8-sig', errors='replace')
+                f.seek(0)
+                header = next(iter(sample.splitlines()), '')
+                delimiters = [d for d in ',;\t' if set(cls.SURVEY_FIELDS) <= {
+                    cell.strip().lower() for cell in header.split(d)}]
+                try:
+                    delimiter = delimiters[0] if delimiters else csv.Sniffer().sniff(sample, ',;\t').delimiter
+                except csv.Error:
+                    delimiter = ','
+                header = next(csv.reader([header], delimiter=delimiter), [])
+                if delimiters:
+                    columns = [[cell.strip().lower() for cell in header].index(name) for name in cls.SURVEY_FIELDS]
+                    f.readline()
+                else:
+                    columns = list(range(width))
+                row_width = max(len(header), width)
+
+            while True:
+                lines = list(itertools.islice(f, chunk_rows))
+                if not lines:
+                    break
+                lines = [line for line in b''.join(lines).decode('utf-8-sig').splitlines() if line.strip()]
+                if jsonl:
+                    records = [json.loads(line) for line in lines]
+                    rows = np.array([[str(record.get(name, '')) for name in cls.SURVEY_FIELDS]
+                                     for record in records], dtype=str).reshape(-1, width)
+                    yield rows, f.tell()
+                    continue
+
+                # Без кавычек и при ровно row_width полях в каждой строке порция делится
+                # одним split; иначе она разбирается модулем csv
+                joined = delimiter.join(lines)
+                if '"' not in joined and all(line.count(delimiter) == row_width - 1 for line in lines):
+                    rows = np.array(joined.split(delimiter), dtype=str).reshape(-1, row_width)
+                else:
+                    padding = [''] * row_width
+                    rows = np.array([(row + padding)[:row_width] for row in csv.reader(lines, delimiter=delimiter)],
+                                    dtype=str).reshape(-1, row_width)
+                yield rows[:, columns], f.tell()
+
+    def _survey_log_values(self, values: np.ndarray) -> np.ndarray:
+        """Логарифмы значений ответов, NaN - значение не по шкале Саати
+
+        Различных записей в опросе немного, поэтому каждая разбирается один раз,
+        а результат разносится по строкам порции выборкой по обратному индексу.
+        """
+        texts, inverse = np.unique(values, return_inverse=True)
+        logs = np.full(texts.size, np.nan)
+        for k, text in enumerate(texts.tolist()):
+            normalized = self.normalize_judgment(text)
+            number = self.parse_judgment(normalized) if normalized else None
+            if number is not None:
+                logs[k] = math.log(number[1])
+        return logs[inverse.ravel()]
+
+    @staticmethod
+    def _survey_positions(tokens: np.ndarray, items: List[str]) -> np.ndarray:
+        """Номера элементов по именам или по номерам с единицы; -1 - элемент не найден"""
+        names, inverse = np.unique(np.char.strip(tokens), return_inverse=True)
+        position = {name: k for k, name in enumerate(items)}
+        lookup = np.array([position.get(name, int(name) - 1 if name.isdecimal() and 0 < int(name) <= len(items)
+                                        else -1) for name in names.tolist()], dtype=np.int64)
+        return lookup[inverse.ravel()]
+
+    def _survey_aggregate(self, matrix_key: str, items: List[str]) -> Dict[str, object]:
+        """Накопитель ответов по матрице, приведенный к текущему набору элементов"""
+        aggregate = self.survey_aggregates.get(matrix_key)
+        n = len(items)
+        if aggregate is None:
+            aggregate = self.survey_aggregates[matrix_key] = {
+                'items': list(items), 'log_sums': np.zeros((n, n)), 'counts': np.zeros((n, n), dtype=np.int64)}
+        elif aggregate['items'] != items:
+            for name in ('log_sums', 'counts'):
+                remapped = np.nan_to_num(self.remap_judgments(aggregate[name].astype(float), aggregate['items'], items))
+                np.fill_diagonal(remapped, 0)
+                aggregate[name] = remapped.astype(aggregate[name].dtype)
+            aggregate['items'] = list(items)
+        return aggregate
+
+    def add_survey_responses(self, rows: np.ndarray) -> Tuple[int, int]:
+        """Добавляет порцию ответов (строки эксперт, матрица, i, j, значение) к накопленным суммам
+
+        Ответ по ячейке ниже диагонали переносится в симметричную ячейку с обратным
+        знаком логарифма. Возвращает число принятых и отклоненных строк (значение
+        не по шкале Саати, неизвестная матрица или элемент, i = j).
+        """
+        rows = np.asarray(rows, dtype=str).reshape(-1, len(self.SURVEY_FIELDS))
+        if rows.shape[0] == 0:
+            return 0, 0
+        self.survey_experts.update(name.strip() for name in set(rows[:, 0].tolist()))
+        logs = self._survey_log_values(rows[:, 4])
+        expected = self.expected_matrix_items()
+        keys, key_rows = np.unique(np.char.strip(rows[:, 1]), return_inverse=True)
+        key_rows = key_rows.ravel()
+        accepted = 0
+        for k, key in enumerate(keys.tolist()):
+            items = expected.get(key)
+            if not items or len(items) < 2:
+                continue
+            selected = np.flatnonzero((key_rows == k) & ~np.isnan(logs))
+            i = self._survey_positions(rows[selected, 2], items)
+            j = self._survey_positions(rows[selected, 3], items)
+            valid = (i >= 0) & (j >= 0) & (i != j)
+            if not valid.any():
+                continue
+            i, j, log = i[valid], j[valid], logs[selected[valid]]
+
+            # Сложение по ячейкам: повторяющиеся ячейки порции сводятся одним bincount
+            aggregate = self._survey_aggregate(key, items)
+            cells, inverse = np.unique(np.minimum(i, j) * len(items) + np.maximum(i, j), return_inverse=True)
+            inverse = inverse.ravel()
+            aggregate['log_sums'].flat[cells] += np.bincount(inverse, weights=np.where(i < j, log, -log),
+                                                             minlength=cells.size)
+            aggregate['counts'].flat[cells] += np.bincount(inverse, minlength=cells.size)
+            accepted += int(valid.sum())
+        return accepted, rows.shape[0] - accepted
+
+    def import_survey(self, file_path: str, chunk_rows: Optional[int] = None,
+                      progress: Optional[Callable[[int], bool]] = None) -> Dict[str, object]:
+        """Читает файл ответов экспертов порциями и добавляет их к накопленным суммам
+
+        В памяти одновременно находится только одна порция, поэтому размер файла
+        не ограничен. progress получает позицию в файле после каждой порции; если он
+        возвращает False, чтение прекращается (прочитанные порции остаются учтенными).
+        """
+        stats = {'rows': 0, 'accepted': 0, 'rejected': 0, 'cancelled': False}
+        for rows, position in self.read_survey_chunks(file_path, chunk_rows):
+            accepted, rejected = self.add_survey_responses(rows)
+            stats['rows'] += rows.shape[0]
+            stats['accepted'] += accepted
+            stats['rejected'] += rejected
+            if progress is not None and progress(position) is False:
+                stats['cancelled'] = True
+                break
+        return stats
+
+    def clear_survey(self) -> None:
+        self.survey_aggregates = {}
+        self.survey_experts = set()
+
+    def survey_group_matrix(self, matrix_key: str) -> Optional[np.ndarray]:
+        """Групповая матрица - среднее геометрическое ответов по каждой ячейке
+
+        Ячейки без ответов - NaN; нижний треугольник - обратные значения.
+        """
+        aggregate = self.survey_aggregates.get(matrix_key)
+        if aggregate is None:
+            return None
+        items = self.expected_matrix_items().get(matrix_key)
+        if items:
+            aggregate = self._survey_aggregate(matrix_key, items)
+        counts = aggregate['counts']
+        filled = counts > 0
+        matrix = np.full(counts.shape, np.nan)
+        matrix[filled] = np.exp(aggregate['log_sums'][filled] / counts[filled])
+        matrix.T[filled] = 1 / matrix[filled]
+        np.fill_diagonal(matrix, 1.0)
+        return matrix
+
+    def _survey_answered(self) -> Dict[str, np.ndarray]:
+        """Маски ячеек (в обе стороны от диагонали), по которым есть принятые ответы опроса
+
+        Матрицы, которых нет в текущей иерархии или по которым ответов нет, пропускаются.
+        """
+        expected = self.expected_matrix_items()
+        answered = {}
+        for key in self.survey_aggregates:
+            items = expected.get(key)
+            if not items:
+                continue
+            counts = self._survey_aggregate(key, items)['counts']
+            if counts.any():
+                answered[key] = (counts > 0) | (counts > 0).T
+        return answered
+
+    def survey_conflicts(self) -> int:
+        """Число введенных суждений, которые заменит apply_survey_judgments"""
+        self.sync_judgments()
+        return sum(int(np.count_nonzero(self.fill_mask(key) & answered))
+                   for key, answered in self._survey_answered().items())
+
+    def apply_survey_judgments(self) -> Dict[str, int]:
+        """Переносит в суждения групповые значения опроса
+
+        Меняются только ячейки, по которым есть ответы; остальные суждения
+        матрицы сохраняются. Возвращает число пар с ответами по каждой матрице.
+        """
+        self.sync_judgments()
+        expected = self.expected_matrix_items()
+        applied = {}
+        for key, answered in self._survey_answered().items():
+            group = self.survey_group_matrix(key)
+            current = self.judgments.get(key)
+            if current is None:
+                current = np.full(group.shape, np.nan)
+                np.fill_diagonal(current, 1.0)
+                self.judgment_items[key] = list(expected[key])
+            # Новые массивы, а не запись на месте: сохраненные сценарии могут ссылаться на прежние
+            self.judgments[key] = np.where(answered, group, current)
+            fuzzy = self.fuzzy_judgments.get(key)
+            if fuzzy is not None:
+                self.fuzzy_judgments[key] = np.where(answered[:, :, None], group[:, :, None], fuzzy)
+            self.filled_counts[key] = int(np.count_nonzero(self.fill_mask(key)))
+            applied[key] = int(np.count_nonzero(np.triu(answered, k=1)))
+        return applied
+
+    def _judgment_set(self) -> Dict[str, dict]:
+        """Текущие хранилища суждений (без копирования)"""
+        return {'judgments': self.judgments, 'judgment_items': self.judgment_items,
+                'filled_counts': self.filled_counts, 'fuzzy_judgments': self.fuzzy_judgments}
+
+    @staticmethod
+    def _share_judgment_set(judgment_set: Dict[str, dict]) -> Dict[str, dict]:
+        """Копия набора суждений, разделяющая с исходным массивы матриц
+
+        Копируются только словари и списки имен; массив копируется при первой
+        записи в него (см. _writable_judgments), поэтому сценарий, отличающийся
+        одной матрицей, занимает память одной матрицы.
+        """
+        return {'judgments': dict(judgment_set['judgments']),
+                'judgment_items': {key: list(items) for key, items in judgment_set['judgment_items'].items()},
+                'filled_counts': dict(judgment_set['filled_counts']),
+                'fuzzy_judgments': dict(judgment_set['fuzzy_judgments'])}
+
+    def _use_judgment_set(self, judgment_set: Dict[str, dict]) -> None:
+        self.judgments = judgment_set['judgments']
+        self.judgment_items = judgment_set['judgment_items']
+        self.filled_counts = judgment_set['filled_counts']
+        self.fuzzy_judgments = judgment_set['fuzzy_judgments']
+
+    def _writable_judgments(self, store: str, matrix_key: str) -> np.ndarray:
+        """Массив хранилища store ('judgments' или 'fuzzy_judgments'), который можно менять на месте
+
+        Если массив входит в сохраненный сценарий, текущий набор получает его копию.
+        """
+        arrays = getattr(self, store)
+        array = arrays[matrix_key]
+        if any(scenario[store].get(matrix_key) is array for scenario in self.scenarios.values()):
+            array = arrays[matrix_key] = array.copy()
+        return array
+
+    def save_scenario(self, name: str) -> bool:
+        """Сохраняет текущие суждения как сценарий name (существующий перезаписывается)"""
+        name = name.strip()
+        if not name:
+            return False
+        self.scenarios[name] = self._share_judgment_set(self._judgment_set())
+        self.active_scenario = name
+        return True
+
+    def load_scenario(self, name: str) -> bool:
+        """Делает суждения сценария текущими; матрицы приводятся к текущей иерархии"""
+        if name not in self.scenarios:
+            return False
+        self._use_judgment_set(self._share_judgment_set(self.scenarios[name]))
+        self.active_scenario = name
+        self.sync_judgments()
+        return True
+
+    def delete_scenario(self, name: str) -> bool:
+        if self.scenarios.pop(name, None) is None:
+            return False
+        if self.active_scenario == name:
+            self.active_scenario = None
+        return True
+
+    def scenario_modified(self) -> bool:
+        """Отличаются ли текущие суждения от активного сценария
+
+        Благодаря копированию при записи достаточно сравнить массивы по тождеству.
+        """
+        scenario = self.scenarios.get(self.active_scenario)
+        if scenario is None:
+            return bool(self.judgments)
+        return any(scenario[store].keys() != getattr(self, store).keys()
+                   or any(array is not scenario[store][key] for key, array in getattr(self, store).items())
+                   for store in ('judgments', 'fuzzy_judgments'))
+
+    def scenario_memory(self) -> Tuple[int, int]:
+        """Байты массивов всех сценариев: фактически занятые и без разделения матриц"""
+        arrays = [array for scenario in self.scenarios.values()
+                  for store in ('judgments', 'fuzzy_judgments') for array in scenario[store].values()]
+        unique = {id(array): array.nbytes for array in arrays}
+        return sum(unique.values()), sum(array.nbytes for array in arrays)
+
+    def calculate_scenarios(self, names: List[str], selected_levels: int = 3,
+                            synthesis: str = 'distributive') -> Dict[str, object]:
+        """Расчет нескольких сценариев одним пакетом
+
+        Векторы приоритетов считаются стопкой матриц по каждому ключу, причем
+        матрица, общая для нескольких сценариев, обрабатывается один раз (и ее
+        согласованность проверяется тоже один раз). Синтез
+        выполняется сразу для всех сценариев. Нечеткие суждения учитываются
+        средним значением; режим оценок не поддерживается.
+
+        Возвращает приоритеты (сценарии × альтернативы, NaN - сценарий не готов),
+        места (1 - лучшая), наибольшее отношение согласованности по сценарию,
+        матрицы согласованности ранжирований и расстояний (metrics.pairwise_metrics)
+        и ошибки по сценариям.
+        """
+        unknown = [name for name in names if name not in self.scenarios]
+        if unknown:
+            raise ValueError(f"Нет сценариев: {', '.join(unknown)}")
+        if synthesis not in self.SYNTHESIS_MODES:
+            raise ValueError(f"Неизвестный способ синтеза: {synthesis}")
+        if self.rating_mode and selected_levels >= 2:
+            raise ValueError("Сценарии сравниваются только для парных сравнений альтернатив")
+
+        # Полные матрицы каждого сценария вместе с исходным массивом суждений: по нему
+        # видно, какие матрицы сценарии делят между собой
+        built = []
+        live = self._judgment_set()
+        try:
+            for name in names:
+                self._use_judgment_set(self._share_judgment_set(self.scenarios[name]))
+                self.sync_judgments()
+                matrices = self.build_required_matrices(selected_levels)
+                built.append({key: (self.judgments[key], matrix) for key, matrix in matrices.items()})
+        finally:
+            self._use_judgment_set(live)
+
+        count = len(names)
+        errors = {name: [] for name in names}
+        vectors = {}
+        max_cr = np.zeros(count)
+        for key, items in self.required_matrices(selected_levels).items():
+            groups = {}
+            for s, matrices in enumerate(built):
+                if key in matrices:
+                    source, matrix = matrices[key]
+                    groups.setdefault(id(source), (matrix, []))[1].append(s)
+                else:
+                    errors[names[s]].append(f"Не заполнена матрица '{key}'")
+
+            vectors[key] = np.full((count, len(items)), np.nan)
+            if not groups:
+                continue
+            stack = np.stack([matrix for matrix, _ in groups.values()])
+            weights = np.exp(np.log(stack).mean(axis=2))
+            weights /= weights.sum(axis=1, keepdims=True)
+            for (matrix, members), w in zip(groups.values(), weights):
+                vectors[key][members] = w
+                # Та же оценка, что и в calculate_ahp (при вводе по группам - по наихудшей группе)
+                ratio = self.matrix_consistency(key, matrix)['CR']
+                max_cr[members] = np.maximum(max_cr[members], ratio)
+
+        if selected_levels >= 3:
+            type_weights = vectors['criteria_types']
+            criteria_weights = np.zeros((count, len(self.criteria)))
+            for t, (type_name, type_criteria) in enumerate(self.criteria_types.items()):
+                columns = [self.criteria.index(c) for c in type_criteria]
+                criteria_weights[:, columns] = vectors[f'criteria_{type_name}'] * type_weights[:, [t]]
+            criteria_weights /= criteria_weights.sum(axis=1, keepdims=True)
+        elif selected_levels == 2:
+            criteria_weights = vectors['criteria']
+
+        if selected_levels >= 2:
+            local = np.stack([vectors[f'alternatives_{c}'] for c in self.criteria], axis=2)
+            priorities = np.einsum('snm,sm->sn', self.normalize_local(local, synthesis), criteria_weights)
+        else:
+            priorities = vectors['alternatives']
+        with np.errstate(invalid='ignore'):
+            priorities = priorities / priorities.sum(axis=1, keepdims=True)
+
+        order = np.argsort(-np.nan_to_num(priorities, nan=-np.inf), axis=1, kind='stable')
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.arange(1, len(self.alternatives) + 1)[None, :], axis=1)
+        return {
+            'scenarios': list(names),
+            'alternatives': list(self.alternatives),
+            'priorities': priorities,
+            'ranks': ranks,
+            'max_cr': max_cr,
+            'agreement': pairwise_metrics(priorities, top_k=min(3, len(self.alternatives))),
+            'errors': {name: messages for name, messages in errors.items() if messages},
+        }
+
+    @staticmethod
+    def kendall_tau_distance(priorities: np.ndarray) -> np.ndarray:
+        """Нормированное расстояние Кендалла между ранжированиями (строки - прогоны)
+
+        0 - одинаковый порядок, 1 - обратный; см. metrics.kendall_distance.
+        """
+        return kendall_distance(priorities)
+
+    def quick_scores(self) -> Tuple[np.ndarray, List[str]]:
+        """Предварительные оценки альтернатив по критериям для отбора доминируемых
+
+        Для каждого критерия берется полностью заполненная матрица alternatives_{критерий}
+        (например, построенная по таблице показателей) - логарифм среднего геометрического строки,
+        иначе полный столбец таблицы оценок - вес градации (по матрице ratings_{критерий},
+        если она заполнена, иначе по порядку градаций: первая - лучшая).
+        Возвращает матрицу альтернативы × критерии (больше - лучше, NaN - нет оценки)
+        и список критериев без оценок.
+        """
+        self._sync_ratings()
+        n = len(self.alternatives)
+        scores = np.full((n, len(self.criteria)), np.nan)
+        missing = []
+        for k, criterion in enumerate(self.criteria):
+            key = f'alternatives_{criterion}'
+            if key in self.judgments and self.filled_counts.get(key, 0) == n * (n - 1) // 2:
+                scores[:, k] = np.log(self.judgments[key]).mean(axis=1)
+                continue
+
+            levels = self.ratings[:, k] if self.ratings.shape[1] else np.full(n, -1)
+            if n and np.all(levels >= 0):
+                scale_key = f'ratings_{criterion}'
+                size = len(self.rating_scale(criterion))
+                if scale_key in self.judgments and self.filled_counts.get(scale_key, 0) == size * (size - 1) // 2:
+                    level_scores = np.log(self.judgments[scale_key]).mean(axis=1)
+                else:
+                    level_scores = -np.arange(size, dtype=float)
+                scores[:, k] = level_scores[levels]
+                continue
+            missing.append(criterion)
+        return scores, missing
+
+    @staticmethod
+    def find_dominated(scores: np.ndarray, block: int = 512) -> np.ndarray:
+        """Поиск доминируемых альтернатив (оценки: альтернативы × критерии, больше - лучше)
+
+        Альтернатива доминируется, если другая не хуже по всем критериям и лучше хотя бы
+        по одному. Строки с NaN не сравниваются (их нельзя ни исключить, ни использовать
+        для исключения). Строки обходятся по убыванию суммы оценок: доминирующая всегда
+        идет раньше, поэтому каждый блок сравнивается только с уже найденным недоминируемым
+        множеством и сам с собой - сравнения векторизованы на весь блок.
+
+        Возвращает для каждой альтернативы индекс доминирующей или -1.
+        """
+        scores = np.asarray(scores, dtype=float)
+        n, m = scores.shape
+        dominator = np.full(n, -1, dtype=int)
+        complete = np.flatnonzero(~np.isnan(scores).any(axis=1))
+        if complete.size < 2 or m == 0:
+            return dominator
+
+        order = complete[np.argsort(-scores[complete].sum(axis=1), kind='stable')]
+        skyline = np.empty(0, dtype=int)
+
+        def dominators(candidates, rows):
+            """Первый из candidates, доминирующий каждую из rows, или -1"""
+            if candidates.size == 0 or rows.size == 0:
+                return np.full(rows.size, -1, dtype=int)
+            # "Не хуже по всем критериям" накапливается по столбцам без трехмерного массива
+            dominates = np.ones((rows.size, candidates.size), dtype=bool)
+            for k in range(m):
+                dominates &= scores[candidates, k][None, :] >= scores[rows, k][:, None]
+            # Не хуже по всем и не лучше ни по одному - только совпадающие строки
+            r, c = np.nonzero(dominates)
+            equal = ~(scores[candidates[c]] != scores[rows[r]]).any(axis=1)
+            dominates[r[equal], c[equal]] = False
+            return np.where(dominates.any(axis=1), candidates[dominates.argmax(axis=1)], -1)
+
+        start = 0
+        while start < order.size:
+            # Размер блока ограничивает объем промежуточного массива сравнений
+            size = max(16, min(block, 4_000_000 // (skyline.size + block)))
+            rows = order[start:start + size]
+            start += size
+
+            found = dominators(skyline, rows)
+            rest = found < 0
+            found[rest] = dominators(rows[rest], rows[rest])
+            dominator[rows] = found
+            skyline = np.concatenate([skyline, rows[found < 0]])
+        return dominator
+
+
 
     def validate_matrix_value(self, value: str) -> bool:
         """Проверяет значение по шкале Саати"""
@@ -70,6 +1412,77 @@ class AHPBackend:
         except (ValueError, AttributeError):
             return False
 
+    def normalize_judgment(self, raw: str) -> Optional[str]:
+        """Приводит число из внешнего источника к записи шкалы Саати ("3", "1/5")
+
+        Принимает также десятичную запись (0,333 -> "1/3"), если она с точностью
+        до 2% совпадает со значением шкалы.
+        """
+        raw = raw.strip().replace(',', '.')
+        if raw.startswith('~'):
+            normalized = self.normalize_judgment(raw[1:])
+            return normalized and "~" + normalized
+        if '-' in raw[1:]:
+            bounds = [self.normalize_judgment(part) for part in raw.split('-', 1)]
+            return None if None in bounds else "-".join(bounds)
+        try:
+            if '/' in raw:
+                numerator, denominator = raw.split('/', 1)
+                value = float(numerator) / float(denominator)
+            else:
+                value = float(raw)
+        except (ValueError, ZeroDivisionError):
+            return None
+
+        if not np.isfinite(value) or value <= 0:
+            return None
+
+        ratio = value if value >= 1 else 1 / value
+        nearest = int(round(ratio))
+        if nearest not in self.VALID_SAATY_VALUES or abs(ratio - nearest) > 0.02 * nearest:
+            return None
+        return str(nearest) if value >= 1 or nearest == 1 else f"1/{nearest}"
+
+    def parse_comparison_block(self, text: str, n: int, row: int = 0,
+                               col: int = 0) -> Tuple[Dict[Tuple[int, int], str], List[str]]:
+        """Разбирает блок значений из буфера обмена (строки через перевод строки, ячейки через Tab)
+
+        Распознаются полная матрица n×n и верхний треугольник без диагонали,
+        выровненный по левому краю; любой другой блок вставляется, начиная
+        с ячейки (row, col). Используются только ячейки выше диагонали.
+        Возвращает найденные значения и список ошибок.
+        """
+        lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        while lines and not lines[-1].strip():
+            lines.pop()
+        rows = [line.split('\t') for line in lines]
+        # Длина строки без пустых ячеек в конце
+        filled_lengths = [max((k + 1 for k, v in enumerate(cells) if v.strip()), default=0) for cells in rows]
+
+        if len(rows) == n and all(len(cells) >= n for cells in rows):
+            def position(r, c):
+                return r, c
+        elif n > 1 and filled_lengths == list(range(n - 1, 0, -1)):
+            def position(r, c):
+                return r, r + 1 + c
+        else:
+            def position(r, c):
+                return row + r, col + c
+
+        comparisons = {}
+        errors = []
+        for r, cells in enumerate(rows):
+            for c, raw in enumerate(cells):
+                i, j = position(r, c)
+                if not raw.strip() or not (0 <= i < j < n):
+                    continue
+                value = self.normalize_judgment(raw)
+                if value is None:
+                    errors.append(f"строка {i + 1}, столбец {j + 1}: «{raw.strip()}»")
+                else:
+                    comparisons[(i, j)] = value
+        return comparisons, errors
+
     def build_matrix(self, items: List[str], comparisons: Dict[Tuple[int, int], str]) -> Optional[np.ndarray]:
         """Строит матрицу парных сравнений"""
         n = len(items)
@@ -78,19 +1491,12 @@ class AHPBackend:
 
         matrix = np.eye(n)
         for (i, j), value in comparisons.items():
-            if not (0 <= i < n and 0 <= j < n) or not self.validate_matrix_value(value):
+            number = self.parse_judgment(value) if 0 <= i < n and 0 <= j < n else None
+            if number is None:
                 return None
 
-            try:
-                if value.startswith("1/"):
-                    val = 1 / float(value[2:])
-                else:
-                    val = float(value)
-
-                matrix[i, j] = val
-                matrix[j, i] = 1 / val
-            except (ValueError, ZeroDivisionError):
-                return None
+            matrix[i, j] = number[1]
+            matrix[j, i] = 1 / number[1]
 
         return matrix
 
@@ -102,17 +1508,33 @@ class AHPBackend:
         w = CB / np.sum(CB)
         return CB, w
 
-    def calculate_ahp(self, selected_levels: int = 3) -> Dict[
+    def calculate_ahp(self, selected_levels: int = 3, synthesis: str = 'distributive') -> Dict[
         str, Union[Dict[str, np.ndarray], Dict[str, Dict[str, float]], List[str]]]:
-        """Основной метод расчета AHP с учетом уровней иерархии"""
+        """Основной метод расчета AHP с учетом уровней иерархии
+
+        synthesis - способ синтеза приоритетов альтернатив (см. synthesize);
+        в режиме оценок синтез всегда идеальный.
+        """
         results = {
             'priorities': {},
             'consistency': {},
             'errors': [],
             'matrix_count': 0
         }
+        # Состояние для пересчета без матриц заменяется только вместе с новым результатом:
+        # вкладка результатов продолжает работать с прежним, пока расчет не завершен
+        previous_state = (self.synthesis_state, self.reweight_state)
+        if self.fuzzy_mode:
+            results = self.calculate_fuzzy_ahp(selected_levels)
+            if 'alternatives_priority' in results.get('priorities', {}):
+                self.synthesis_state, self.reweight_state = {}, {}
+            return results
 
         try:
+            if synthesis not in self.SYNTHESIS_MODES:
+                results['errors'].append(f"Неизвестный способ синтеза: {synthesis}")
+                return results
+
             # 1. Расчет для типов критериев (только для 3 уровней)
             if selected_levels >= 3:
                 if not self.criteria_types:
@@ -140,6 +1562,8 @@ class AHPBackend:
                 if selected_levels >= 3:
                     # Для 3 уровней - расчет по типам критериев
                     type_names = list(self.criteria_types.keys())
+                    # Локальные веса критериев внутри типов: критерии × типы
+                    type_local = np.zeros((len(self.criteria), len(type_names)))
                     for type_name, type_criteria in self.criteria_types.items():
                         criteria_matrix = self.matrices.get(f'criteria_{type_name}')
                         if criteria_matrix is None:
@@ -153,9 +1577,9 @@ class AHPBackend:
                         w_criteria_normalized = w_criteria / np.sum(w_criteria)
 
                         # Умножаем на вес типа (матричное умножение)
-                        criteria_priority[[self.criteria.index(c) for c in type_criteria]] = (
-                                w_criteria_normalized * w_types[type_names.index(type_name)]
-                        )
+                        rows = [self.criteria.index(c) for c in type_criteria]
+                        type_local[rows, type_names.index(type_name)] = w_criteria_normalized
+                        criteria_priority[rows] = w_criteria_normalized * w_types[type_names.index(type_name)]
 
                         results['consistency'][f'criteria_{type_name}'] = self.check_consistency(criteria_matrix)
 
@@ -177,6 +1601,8 @@ class AHPBackend:
                     results['consistency']['criteria'] = self.check_consistency(criteria_matrix)
 
                 results['priorities']['criteria_priority'] = criteria_priority
+                if selected_levels >= 3:
+                    results['local_priorities'] = {'criteria': type_local}
 
             # 3. Расчет для альтернатив (для всех уровней)
             if not self.alternatives:
@@ -185,9 +1611,18 @@ class AHPBackend:
 
             alternatives_priority = np.zeros(len(self.alternatives))
 
-            if selected_levels >= 2:
-                # Для 2 и 3 уровней - расчет по критериям
-                for criterion in self.criteria:
+            if selected_levels >= 2 and self.rating_mode:
+                # Режим оценок - синтез одним матричным произведением
+                scores = self._rating_synthesis(results)
+                if scores is None:
+                    return results
+                self._store_local_priorities(scores, results)
+                alternatives_priority = scores @ criteria_priority
+            elif selected_levels >= 2:
+                # Для 2 и 3 уровней - локальные приоритеты по каждому критерию в столбцах
+                local = np.zeros((len(self.alternatives), len(self.criteria)))
+                keys = []
+                for k, criterion in enumerate(self.criteria):
                     alt_matrix = self.matrices.get(f'alternatives_{criterion}')
                     if alt_matrix is None:
                         results['errors'].append(
@@ -195,15 +1630,17 @@ class AHPBackend:
                         continue
 
                     results['matrix_count'] += 1
-                    CB_alt, w_alt = self.calculate_priority_vector(alt_matrix)
+                    CB_alt, local[:, k] = self.calculate_priority_vector(alt_matrix)
+                    keys.append(f'alternatives_{criterion}')
 
-                    # Нормализуем веса альтернатив для каждого критерия
-                    w_alt_normalized = w_alt / np.sum(w_alt) if np.sum(w_alt) != 0 else w_alt
+                    results['consistency'][f'alternatives_{criterion}'] = self.matrix_consistency(
+                        f'alternatives_{criterion}', alt_matrix)
 
-                    # Умножаем на вес критерия (матричное умножение)
-                    alternatives_priority += w_alt_normalized * criteria_priority[self.criteria.index(criterion)]
-
-                    results['consistency'][f'alternatives_{criterion}'] = self.check_consistency(alt_matrix)
+                local = self.normalize_local(local, synthesis)
+                alternatives_priority = local @ criteria_priority
+                if len(keys) == len(self.criteria):
+                    self._store_synthesis_state(keys, criteria_priority, synthesis)
+                    self._store_local_priorities(local, results)
             else:
                 # Для 1 уровня - простой расчет (как для первого уровня)
                 alt_matrix = self.matrices.get('alternatives')
@@ -213,22 +1650,452 @@ class AHPBackend:
 
                 results['matrix_count'] += 1
                 CB_alt, alternatives_priority = self.calculate_priority_vector(alt_matrix)
-                results['consistency']['alternatives'] = self.check_consistency(alt_matrix)
+                results['consistency']['alternatives'] = self.matrix_consistency('alternatives', alt_matrix)
+                self._store_synthesis_state(['alternatives'], np.ones(1), synthesis)
 
             # Финальная нормализация весов альтернатив
             sum_alternatives = np.sum(alternatives_priority)
             if sum_alternatives == 0:
                 results['errors'].append("Суммарный вес альтернатив равен нулю")
+                self.synthesis_state, self.reweight_state = previous_state
                 return results
             alternatives_priority = alternatives_priority / sum_alternatives
 
             results['priorities']['alternatives_priority'] = alternatives_priority
+            results['synthesis'] = synthesis
+            # Состояние, не сохраненное этим расчетом, к новому результату не относится
+            if self.synthesis_state is previous_state[0]:
+                self.synthesis_state = {}
+            if self.reweight_state is previous_state[1]:
+                self.reweight_state = {}
+            if self.interval_mode and not (selected_levels >= 2 and self.rating_mode):
+                self._add_interval_bounds(selected_levels, synthesis, results)
+            return results
+
+        except Exception as e:
+            results['errors'].append(f"Ошибка расчета: {str(e)}")
+            self.synthesis_state, self.reweight_state = previous_state
+            return results
+
+
+    def build_fuzzy_matrices(self, matrices: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Матрицы троек (n, n, 3) из полных четких матриц и введенных нечетких/интервальных суждений
+
+        Четкие ячейки (в том числе достроенные при вводе по группам) дают (v, v, v).
+        """
+        fuzzy = {}
+        for key, matrix in matrices.items():
+            numbers = np.repeat(matrix[:, :, None], 3, axis=2)
+            entered = self.fuzzy_judgments.get(key)
+            if entered is not None and entered.shape == numbers.shape:
+                known = ~np.isnan(entered[:, :, 1])
+                numbers[known] = entered[known]
+            fuzzy[key] = numbers
+        return fuzzy
+
+    @staticmethod
+    def fuzzy_priority_vector(matrices: np.ndarray) -> np.ndarray:
+        """Нечеткие веса по методу средних геометрических Бакли
+
+        matrices - (..., n, n, 3): можно передать стопку матриц одного размера.
+        Среднее геометрическое строки считается покомпонентно, а деление на сумму -
+        по правилу деления треугольных чисел: (l / Σu, m / Σm, u / Σl).
+        Результат - (..., n, 3).
+        """
+        n = matrices.shape[-2]
+        # Сумма по строке как произведение на вектор единиц: BLAS вместо свертки по средней оси
+        means = np.exp(np.ones(n) @ np.log(matrices) / n)
+        totals = means.sum(axis=-2, keepdims=True)
+        return means / totals[..., ::-1]
+
+    def calculate_fuzzy_ahp(self, selected_levels: int = 3) -> Dict[
+        str, Union[Dict[str, np.ndarray], Dict[str, Dict[str, float]], List[str]]]:
+        """Нечеткий расчет AHP по матрицам self.matrices и нечетким суждениям
+
+        Веса всех уровней - треугольные числа; синтез - покомпонентное
+        произведение и сумма треугольных чисел. В results['fuzzy_priorities']
+        попадают нечеткие веса, в results['priorities'] - их центры тяжести
+        (l + m + u) / 3, нормированные к единице.
+        """
+        results = {
+            'priorities': {},
+            'fuzzy_priorities': {},
+            'consistency': {},
+            'errors': [],
+            'matrix_count': 0
+        }
+
+        try:
+            if selected_levels >= 2 and self.rating_mode:
+                results['errors'].append("Нечеткий расчет не поддерживает режим оценок")
+                return results
+
+            required = list(self.required_matrices(selected_levels))
+            missing = [key for key in required if key not in self.matrices]
+            if missing:
+                results['errors'].append("Отсутствуют матрицы сравнения: " + ", ".join(missing))
+                return results
+            fuzzy = self.build_fuzzy_matrices({key: self.matrices[key] for key in required})
+            for key in required:
+                results['consistency'][key] = self.matrix_consistency(key, self.matrices[key])
+            results['matrix_count'] = len(required)
+
+            def store(name, weights):
+                results['fuzzy_priorities'][name] = weights
+                centroid = weights.mean(axis=-1)
+                results['priorities'][name] = centroid / centroid.sum()
+
+            if selected_levels >= 3:
+                type_weights = self.fuzzy_priority_vector(fuzzy['criteria_types'])
+                store('type_priority', type_weights)
+                criteria_weights = np.zeros((len(self.criteria), 3))
+                for t, (type_name, type_criteria) in enumerate(self.criteria_types.items()):
+                    local = self.fuzzy_priority_vector(fuzzy[f'criteria_{type_name}'])
+                    criteria_weights[[self.criteria.index(c) for c in type_criteria]] = local * type_weights[t]
+            elif selected_levels == 2:
+                criteria_weights = self.fuzzy_priority_vector(fuzzy['criteria'])
+
+            if selected_levels >= 2:
+                store('criteria_priority', criteria_weights)
+                # Все матрицы альтернатив одного размера - один вызов на стопку (критерии, n, n, 3)
+                local = self.fuzzy_priority_vector(
+                    np.stack([fuzzy[f'alternatives_{criterion}'] for criterion in self.criteria]))
+                alternatives_weights = np.einsum('cak,ck->ak', local, criteria_weights)
+            else:
+                alternatives_weights = self.fuzzy_priority_vector(fuzzy['alternatives'])
+
+            store('alternatives_priority', alternatives_weights)
             return results
 
         except Exception as e:
             results['errors'].append(f"Ошибка расчета: {str(e)}")
             return results
 
+    @staticmethod
+    def ratio_bounds(low: np.ndarray, high: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Границы долей x_i / Σx при x_k из [low_k, high_k] (по последней оси)
+
+        Наименьшая доля - когда x_i минимален, а остальные максимальны, наибольшая - наоборот.
+        """
+        total_low = low.sum(axis=-1, keepdims=True)
+        total_high = high.sum(axis=-1, keepdims=True)
+        return low / (total_high - high + low), high / (total_low - low + high)
+
+    @staticmethod
+    def _max_of_others(x: np.ndarray) -> np.ndarray:
+        """Максимум по последней оси без самого элемента"""
+        top = np.sort(x, axis=-1)[..., -2:]
+        return np.where(x == top[..., 1:], top[..., :1], top[..., 1:])
+
+    def interval_priority_bounds(self, matrices: np.ndarray, synthesis: str = 'distributive'
+                                 ) -> Tuple[np.ndarray, np.ndarray]:
+        """Границы локальных приоритетов для стопки интервальных матриц (..., n, n, 3)
+
+        Среднее геометрическое строки монотонно по каждому суждению, поэтому его границы -
+        средние геометрические нижних и верхних границ строки; из них границы нормированных
+        весов получаются в замкнутом виде, без перебора вершин и линейного программирования.
+        Границы внешние: истинный диапазон весов лежит внутри них.
+        """
+        low = np.exp(np.log(matrices[..., 0]).mean(axis=-1))
+        high = np.exp(np.log(matrices[..., 2]).mean(axis=-1))
+        if synthesis == 'ideal':
+            return (low / np.maximum(low, self._max_of_others(high)),
+                    high / np.maximum(high, self._max_of_others(low)))
+        return self.ratio_bounds(low, high)
+
+    @staticmethod
+    def rank_bounds(lower: np.ndarray, upper: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Лучшее и худшее возможные места (с 1) при приоритетах из интервалов [lower, upper]
+
+        Место гарантированно выше, чем у всех, чья верхняя граница ниже нижней границы
+        элемента; подсчет - двоичным поиском по отсортированным границам.
+        """
+        n = lower.size
+        surely_better = n - np.searchsorted(np.sort(lower), upper, side='right')
+        surely_worse = np.searchsorted(np.sort(upper), lower, side='left')
+        return 1 + surely_better, n - surely_worse
+
+    def _add_interval_bounds(self, selected_levels: int, synthesis: str, results: dict) -> None:
+        """Границы приоритетов всех уровней и устойчивость мест альтернатив по интервальным суждениям"""
+        required = [key for key in self.required_matrices(selected_levels) if key in self.matrices]
+        bounds = self.build_fuzzy_matrices({key: self.matrices[key] for key in required})
+        priority_bounds = {}
+
+        if selected_levels >= 3:
+            type_low, type_high = self.interval_priority_bounds(bounds['criteria_types'])
+            priority_bounds['type_priority'] = (type_low, type_high)
+            criteria_low = np.zeros(len(self.criteria))
+            criteria_high = np.zeros(len(self.criteria))
+            for t, (type_name, type_criteria) in enumerate(self.criteria_types.items()):
+                local_low, local_high = self.interval_priority_bounds(bounds[f'criteria_{type_name}'])
+                positions = [self.criteria.index(c) for c in type_criteria]
+                criteria_low[positions] = local_low * type_low[t]
+                criteria_high[positions] = local_high * type_high[t]
+            criteria_low, criteria_high = self.ratio_bounds(criteria_low, criteria_high)
+        elif selected_levels == 2:
+            criteria_low, criteria_high = self.interval_priority_bounds(bounds['criteria'])
+
+        if selected_levels >= 2:
+            priority_bounds['criteria_priority'] = (criteria_low, criteria_high)
+            local_low, local_high = self.interval_priority_bounds(
+                np.stack([bounds[f'alternatives_{criterion}'] for criterion in self.criteria]), synthesis)
+            low, high = self.ratio_bounds(criteria_low @ local_low, criteria_high @ local_high)
+        else:
+            low, high = self.interval_priority_bounds(bounds['alternatives'])
+        priority_bounds['alternatives_priority'] = (low, high)
+
+        results['priority_bounds'] = {name: np.column_stack(pair) for name, pair in priority_bounds.items()}
+        best, worst = self.rank_bounds(low, high)
+        results['rank_bounds'] = np.column_stack([best, worst])
+        results['robust_alternatives'] = [self.alternatives[k] for k in np.flatnonzero(best == worst)]
+
+    @staticmethod
+    def synthesize(local: np.ndarray, criteria_priority: np.ndarray, synthesis: str = 'distributive') -> np.ndarray:
+        """Взвешивание локальных приоритетов альтернатив (альтернативы × критерии) весами критериев
+
+        distributive - столбцы нормируются на сумму: вес критерия делится между альтернативами,
+        и появление новой альтернативы отнимает долю у остальных (возможна смена рангов).
+        ideal - столбцы нормируются на максимум: лучшая по критерию получает его полный вес,
+        и оценка альтернативы не зависит от того, сколько еще альтернатив сравнивается.
+        Результат не нормирован.
+        """
+        return AHPBackend.normalize_local(local, synthesis) @ criteria_priority
+
+    @staticmethod
+    def normalize_local(local: np.ndarray, synthesis: str = 'distributive') -> np.ndarray:
+        """Нормировка столбцов локальных приоритетов по способу синтеза (на сумму или на максимум)
+
+        local - альтернативы × критерии или стопка таких матриц.
+        """
+        # Ось альтернатив - предпоследняя, поэтому так же нормируется стопка матриц сценариев
+        norm = local.max(axis=-2, keepdims=True) if synthesis == 'ideal' else local.sum(axis=-2, keepdims=True)
+        return np.divide(local, norm, out=np.zeros_like(local), where=norm > 0)
+
+    def _store_local_priorities(self, local: np.ndarray, results: dict):
+        """Сохраняет нормированные локальные приоритеты альтернатив × критериев
+
+        После этого любые другие веса критериев дают новые приоритеты одним
+        произведением матрицы на вектор (reweight) без обращения к матрицам сравнений.
+        """
+        results.setdefault('local_priorities', {})['alternatives'] = local
+        self.reweight_state = {
+            'alternatives': list(self.alternatives),
+            'criteria': list(self.criteria),
+            'local': local,
+            'type_local': results['local_priorities'].get('criteria'),
+            'criteria_priority': results['priorities']['criteria_priority'],
+        }
+
+    def criteria_weights_from_types(self, type_weights: np.ndarray) -> np.ndarray:
+        """Веса критериев при других весах типов: матрица критерии × типы на вектор"""
+        type_local = self.reweight_state.get('type_local')
+        if type_local is None:
+            raise ValueError("Сначала выполните расчет для 3-уровневой иерархии")
+        type_weights = np.asarray(type_weights, dtype=float)
+        if type_weights.shape != (type_local.shape[1],):
+            raise ValueError("Число весов не совпадает с числом типов критериев")
+        return type_local @ type_weights
+
+    def reweight(self, criteria_weights: np.ndarray) -> np.ndarray:
+        """Приоритеты альтернатив при других весах критериев
+
+        Одно произведение сохраненной матрицы локальных приоритетов на вектор
+        весов; веса не обязаны быть нормированы, результат нормируется на сумму.
+        """
+        state = self._checked_reweight_state()
+        criteria_weights = np.asarray(criteria_weights, dtype=float)
+        if criteria_weights.shape != (len(state['criteria']),) or np.any(criteria_weights < 0):
+            raise ValueError("Веса критериев должны быть неотрицательным вектором по числу критериев")
+        priorities = state['local'] @ criteria_weights
+        total = priorities.sum()
+        if total <= 0:
+            raise ValueError("Суммарный вес альтернатив равен нулю")
+        return priorities / total
+
+    def reweight_ready(self) -> bool:
+        """Относится ли сохраненное состояние к текущим альтернативам и критериям"""
+        state = self.reweight_state
+        return bool(state) and state['alternatives'] == self.alternatives and state['criteria'] == self.criteria
+
+    def _checked_reweight_state(self) -> dict:
+        if not self.reweight_ready():
+            raise ValueError("Сначала выполните расчет для текущих альтернатив и критериев")
+        return self.reweight_state
+
+    @staticmethod
+    def weight_stability(local: np.ndarray, weights: np.ndarray, rows: Optional[np.ndarray] = None,
+                         block: int = 256) -> Dict[str, np.ndarray]:
+        """Диапазоны веса каждого критерия, в которых места альтернатив не меняются
+
+        Вес критерия k заменяется на t, остальные пропорционально делят 1 - t. Тогда
+        оценка альтернативы линейна по t: f_i(t) = b_ik + (a_ik - b_ik)·t, где a_ik -
+        ее локальный приоритет по k, а b_ik - оценка при нулевом весе k. Места меняются
+        только в точках пересечения прямых, поэтому для каждой строки rows ищутся
+        ближайшие к текущему весу пересечения снизу и сверху - без перебора весов.
+
+        Возвращает массивы (строки × критерии): lower и upper - границы диапазона,
+        lower_rival и upper_rival - альтернатива, меняющаяся местами на границе
+        (-1, если граница 0 или 1), margin - наименьшее изменение веса до смены места.
+        """
+        local = np.asarray(local, dtype=float)
+        weights = np.asarray(weights, dtype=float)
+        weights = weights / weights.sum()
+        n, m = local.shape
+        rows = np.arange(n) if rows is None else np.asarray(rows, dtype=int)
+
+        rest = 1 - weights
+        others = (local @ weights)[:, None] - local * weights
+        b = np.divide(others, rest, out=np.zeros_like(others), where=rest > 0)
+        slope = local - b
+
+        result = {key: np.empty((rows.size, m)) for key in ('lower', 'upper')}
+        result.update({key: np.empty((rows.size, m), dtype=int) for key in ('lower_rival', 'upper_rival')})
+        # Объем промежуточного массива пересечений ограничен block строками
+        for start in range(0, rows.size, block):
+            part = rows[start:start + block]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                cross = (b[None, :, :] - b[part, None, :]) / (slope[part, None, :] - slope[None, :, :])
+            below = np.where(cross <= weights, cross, -np.inf)
+            above = np.where(cross >= weights, cross, np.inf)
+            lower_rival, upper_rival = below.argmax(axis=1), above.argmin(axis=1)
+            lower = np.take_along_axis(below, lower_rival[:, None, :], axis=1)[:, 0]
+            upper = np.take_along_axis(above, upper_rival[:, None, :], axis=1)[:, 0]
+            result['lower'][start:start + block] = np.maximum(lower, 0)
+            result['upper'][start:start + block] = np.minimum(upper, 1)
+            result['lower_rival'][start:start + block] = np.where(lower > 0, lower_rival, -1)
+            result['upper_rival'][start:start + block] = np.where(upper < 1, upper_rival, -1)
+
+        result['margin'] = np.minimum(weights - result['lower'], result['upper'] - weights)
+        return result
+
+    def stability_report(self, top_n: Optional[int] = None) -> Dict[str, object]:
+        """Отчет об устойчивости ранжирования по весам критериев
+
+        Для лидера - диапазон веса каждого критерия, в котором он остается первым
+        (основа диаграммы «торнадо»); для top_n лучших альтернатив (по умолчанию
+        всех) - запас веса до смены их места (тепловая карта).
+        """
+        state = self._checked_reweight_state()
+        weights = np.asarray(state['criteria_priority'], dtype=float)
+        priorities = state['local'] @ weights
+        order = np.argsort(-priorities, kind='stable')
+        rows = order if top_n is None else order[:top_n]
+        stability = self.weight_stability(state['local'], weights, rows)
+        return {
+            'criteria': list(state['criteria']),
+            'weights': weights / weights.sum(),
+            'alternatives': [state['alternatives'][i] for i in rows],
+            'priorities': priorities[rows] / priorities.sum(),
+            'rival_names': state['alternatives'],
+            **stability,
+        }
+
+    def _store_synthesis_state(self, keys: List[str], criteria_priority: np.ndarray, synthesis: str):
+        """Сохраняет суммы логарифмов строк матриц альтернатив
+
+        Вектор приоритетов - среднее геометрическое строки, поэтому добавление или
+        удаление альтернативы меняет каждую сумму на одно слагаемое.
+        """
+        self.synthesis_state = {
+            'alternatives': list(self.alternatives),
+            'keys': keys,
+            'criteria_priority': criteria_priority,
+            'synthesis': synthesis,
+            'log_sums': np.column_stack([np.log(self.matrices[key]).sum(axis=1) for key in keys]),
+        }
+
+    def _synthesis_from_log_sums(self, log_sums: np.ndarray, synthesis: Optional[str]) -> np.ndarray:
+        """Нормированные глобальные приоритеты по суммам логарифмов строк"""
+        state = self.synthesis_state
+        local = np.exp((log_sums - log_sums.max(axis=0)) / log_sums.shape[0])
+        local /= local.sum(axis=0)
+        priority = self.synthesize(local, state['criteria_priority'], synthesis or state['synthesis'])
+        return priority / priority.sum()
+
+    def _checked_synthesis_state(self) -> dict:
+        """Данные последнего расчета, если с тех пор набор альтернатив не менялся"""
+        state = self.synthesis_state
+        if not state or state['alternatives'] != self.alternatives:
+            raise ValueError("Сначала выполните расчет для текущего набора альтернатив")
+        return state
+
+    def priorities_without_alternative(self, name: str, synthesis: Optional[str] = None
+                                       ) -> Tuple[List[str], np.ndarray]:
+        """Приоритеты альтернатив после удаления name без пересчета матриц
+
+        Из суммы логарифмов каждой строки вычитается сравнение с удаляемой
+        альтернативой: O(n·m) вместо O(n²·m).
+        """
+        state = self._checked_synthesis_state()
+        k = state['alternatives'].index(name)
+        removed = np.column_stack([np.log(self.matrices[key][:, k]) for key in state['keys']])
+        keep = np.arange(len(state['alternatives'])) != k
+        log_sums = (state['log_sums'] - removed)[keep]
+        names = [alt for alt in state['alternatives'] if alt != name]
+        return names, self._synthesis_from_log_sums(log_sums, synthesis)
+
+    def priorities_with_alternative(self, name: str, comparisons: np.ndarray, synthesis: Optional[str] = None
+                                    ) -> Tuple[List[str], np.ndarray]:
+        """Приоритеты альтернатив после добавления name без пересчета матриц
+
+        comparisons - суждения "новая альтернатива относительно существующей":
+        альтернативы × критерии (для одноуровневой иерархии - вектор).
+        """
+        state = self._checked_synthesis_state()
+        comparisons = np.asarray(comparisons, dtype=float).reshape(len(state['alternatives']), -1)
+        if comparisons.shape[1] != len(state['keys']):
+            raise ValueError("Число столбцов суждений не совпадает с числом критериев")
+        if not np.all(comparisons > 0):
+            raise ValueError("Суждения должны быть положительными числами")
+
+        logs = np.log(comparisons)
+        log_sums = np.vstack([state['log_sums'] - logs, logs.sum(axis=0)])
+        return state['alternatives'] + [name], self._synthesis_from_log_sums(log_sums, synthesis)
+
+    @staticmethod
+    def rank_changes(names_before: List[str], before: np.ndarray, names_after: List[str],
+                     after: np.ndarray) -> List[Tuple[str, int, int]]:
+        """Альтернативы, чье место среди общих для двух расчетов альтернатив изменилось
+
+        Возвращает (имя, место до, место после); места считаются с 1.
+        """
+        position = {name: k for k, name in enumerate(names_after)}
+        common = [k for k, name in enumerate(names_before) if name in position]
+        old = np.array(before)[common]
+        new = np.array(after)[[position[names_before[k]] for k in common]]
+        old_rank = np.empty(len(common), dtype=int)
+        old_rank[np.argsort(-old, kind='stable')] = np.arange(1, len(common) + 1)
+        new_rank = np.empty(len(common), dtype=int)
+        new_rank[np.argsort(-new, kind='stable')] = np.arange(1, len(common) + 1)
+        return [(names_before[common[k]], int(old_rank[k]), int(new_rank[k]))
+                for k in np.flatnonzero(old_rank != new_rank)]
+
+    def _rating_synthesis(self, results: dict) -> Optional[np.ndarray]:
+        """Локальные приоритеты альтернатив × критериев в режиме оценок
+
+        Вес градации - вектор приоритетов ее матрицы, деленный на максимум
+        (идеальная нормировка). Таблица оценок превращается в матрицу
+        весов альтернатив × критериев одной выборкой по индексам; итог -
+        ее произведение на вектор весов критериев - считает calculate_ahp.
+        """
+        self._sync_ratings()
+        if self.unrated_count:
+            results['errors'].append(f"Не выставлено оценок: {self.unrated_count}")
+            return None
+
+        intensity = np.zeros((len(self.criteria), max(len(self.rating_scale(c)) for c in self.criteria)))
+        for k, criterion in enumerate(self.criteria):
+            matrix = self.matrices.get(f'ratings_{criterion}')
+            if matrix is None:
+                results['errors'].append(f"Отсутствует матрица шкалы оценок для критерия '{criterion}'")
+                return None
+
+            results['matrix_count'] += 1
+            CB_levels, w_levels = self.calculate_priority_vector(matrix)
+            intensity[k, :w_levels.size] = w_levels / np.max(w_levels)
+            results['consistency'][f'ratings_{criterion}'] = self.check_consistency(matrix)
+
+        return intensity[np.arange(len(self.criteria)), self.ratings]
 
     def check_consistency(self, matrix: np.ndarray) -> Dict[str, float]:
         """Проверка согласованности матрицы"""
@@ -261,9 +2128,239 @@ class AHPBackend:
             'status': status
         }
 
-
-    def visualize_results(self, results: dict, display_percent: bool = False):
-        """Визуализация результатов анализа"""
+    def set_anp_clusters(self, clusters: Dict[str, List[str]]) -> None:
+        """Задает кластеры сети ANP; имена узлов должны быть уникальны во всей сети"""
+        names = [node for nodes in clusters.values() for node in nodes]
+        if len(set(names)) != len(names):
+            raise ValueError("Имена узлов сети повторяются")
+        self.anp_clusters = {cluster: list(nodes) for cluster, nodes in clusters.items()}
+        known = set(names)
+        # Сравнения, ссылающиеся на исчезнувшие узлы или кластеры, отбрасываются
+        self.anp_influences = {(node, cluster): weights for (node, cluster), weights in self.anp_influences.items()
+                               if node in known and cluster in self.anp_clusters
+                               and weights.size == len(self.anp_clusters[cluster])}
+        self.anp_cluster_weights = {
+            cluster: {source: w for source, w in weights.items() if source in self.anp_clusters}
+            for cluster, weights in self.anp_cluster_weights.items() if cluster in self.anp_clusters}
+
+    def _anp_vector(self, values, size: int) -> np.ndarray:
+        """Вектор весов из вектора или матрицы парных сравнений"""
+        values = np.asarray(values, dtype=float)
+        if values.ndim == 2:
+            CB, values = self.calculate_priority_vector(values)
+        if values.shape != (size,) or np.any(values < 0) or not np.any(values > 0):
+            raise ValueError("Веса должны быть неотрицательным вектором по числу элементов")
+        return values / values.sum()
+
+    def set_anp_influence(self, node: str, cluster: str, values) -> None:
+        """Влияние узлов кластера cluster на узел node: вектор весов или матрица их парных сравнений"""
+        if cluster not in self.anp_clusters or not any(node in nodes for nodes in self.anp_clusters.values()):
+            raise ValueError(f"Узел '{node}' или кластер '{cluster}' не входит в сеть")
+        self.anp_influences[(node, cluster)] = self._anp_vector(values, len(self.anp_clusters[cluster]))
+
+    def set_anp_cluster_weights(self, cluster: str, sources: List[str], values) -> None:
+        """Веса кластеров sources по влиянию на узлы кластера cluster (вектор или матрица сравнений)"""
+        if cluster not in self.anp_clusters or any(source not in self.anp_clusters for source in sources):
+            raise ValueError("Кластер не входит в сеть")
+        weights = self._anp_vector(values, len(sources))
+        self.anp_cluster_weights[cluster] = dict(zip(sources, weights.tolist()))
+
+    def anp_supermatrix(self) -> Dict[str, object]:
+        """Взвешенная суперматрица сети в разреженном виде (rows, cols, values)
+
+        Столбец - узел, относительно которого сравнивались узлы кластера; блок
+        кластера умножается на вес этого кластера для кластера узла-столбца (без
+        заданных весов - поровну), после чего столбец нормируется к единице, то есть
+        матрица стохастична по столбцам. Узел, на который никто не влияет (обычно
+        альтернативы), получает петлю с весом 1. Память и время - O(числа ненулевых).
+        """
+        nodes = [node for cluster_nodes in self.anp_clusters.values() for node in cluster_nodes]
+        index = {node: k for k, node in enumerate(nodes)}
+        cluster_of = {node: cluster for cluster, cluster_nodes in self.anp_clusters.items() for node in cluster_nodes}
+        first = {}
+        offset = 0
+        for cluster, cluster_nodes in self.anp_clusters.items():
+            first[cluster] = offset
+            offset += len(cluster_nodes)
+
+        rows, cols, values = [], [], []
+        for (node, cluster), weights in self.anp_influences.items():
+            weight = self.anp_cluster_weights.get(cluster_of[node], {}).get(cluster, 1.0)
+            rows.append(np.arange(first[cluster], first[cluster] + weights.size))
+            cols.append(np.full(weights.size, index[node]))
+            values.append(weights * weight)
+
+        size = len(nodes)
+        rows = np.concatenate(rows) if rows else np.empty(0, dtype=int)
+        cols = np.concatenate(cols) if cols else np.empty(0, dtype=int)
+        values = np.concatenate(values) if values else np.empty(0)
+        keep = values > 0
+        rows, cols, values = rows[keep], cols[keep], values[keep]
+
+        column_sums = np.bincount(cols, weights=values, minlength=size)
+        sinks = np.flatnonzero(column_sums == 0)
+        values = values / column_sums[cols]
+        rows = np.concatenate([rows, sinks])
+        cols = np.concatenate([cols, sinks])
+        values = np.concatenate([values, np.ones(sinks.size)])
+        return {'nodes': nodes, 'size': size, 'rows': rows, 'cols': cols, 'values': values}
+
+    def anp_limit_priorities(self, max_iterations: int = 100000) -> Dict[str, object]:
+        """Предельные приоритеты сети ANP степенным методом по разреженной суперматрице
+
+        Шаг x <- W x - одно умножение разреженной матрицы на вектор (np.bincount).
+        Итерации начинаются с узлов без входящего влияния, поэтому для иерархии
+        результат совпадает с иерархическим синтезом. Сходимость - изменение
+        меньше ANP_TOLERANCE в норме L1. Если вместо этого
+        вектор повторяется с периодом p <= ANP_MAX_PERIOD (суперматрица циклична),
+        предельными считаются средние по циклу (предел по Чезаро).
+        Возвращает узлы, предельные приоритеты, приоритеты внутри каждого кластера,
+        число итераций и период (1 - обычная сходимость, 0 - не сошлось).
+        """
+        supermatrix = self.anp_supermatrix()
+        size = supermatrix['size']
+        if size == 0:
+            raise ValueError("В сети нет узлов")
+        rows, cols, values = supermatrix['rows'], supermatrix['cols'], supermatrix['values']
+
+        # Влияние распространяется от узлов, на которые не влияет никто (цель иерархии);
+        # если таких нет, сеть связна и начальный вектор может быть любым
+        sources = np.bincount(rows, minlength=size) == 0
+        x = sources / sources.sum() if sources.any() else np.full(size, 1.0 / size)
+        depth = self.ANP_MAX_PERIOD + 1
+        history = np.empty((depth, size))  # последние итерации по кругу
+        history[0] = x
+        lags = np.arange(2, depth)
+        limit, period, iteration = x, 0, 0
+        for iteration in range(1, max_iterations + 1):
+            x_next = np.bincount(rows, weights=values * x[cols], minlength=size)
+            step = np.abs(x_next - x).sum()
+            if step < self.ANP_TOLERANCE:
+                limit, period = x_next, 1
+                break
+            x = x_next
+            history[iteration % depth] = x
+            # Затухающие колебания досчитываются до сходимости, цикл - только незатухающий
+            if iteration >= depth and step > np.sqrt(self.ANP_TOLERANCE):
+                past = history[(iteration - lags) % depth]
+                repeated = np.flatnonzero(np.abs(past - x).sum(axis=1) < self.ANP_TOLERANCE)
+                if repeated.size:
+                    period = int(lags[repeated[0]])
+                    limit = history[(iteration - np.arange(period)) % depth].mean(axis=0)
+                    break
+        else:
+            limit = x
+
+        by_cluster = {}
+        offset = 0
+        for cluster, cluster_nodes in self.anp_clusters.items():
+            block = limit[offset:offset + len(cluster_nodes)]
+            total = block.sum()
+            by_cluster[cluster] = block / total if total > 0 else block
+            offset += len(cluster_nodes)
+
+        return {'nodes': supermatrix['nodes'], 'priorities': limit / limit.sum(), 'by_cluster': by_cluster,
+                'iterations': iteration, 'period': period}
+
+    def aggregate_top_n(self, labels: List[str], values: np.ndarray,
+                        top_n: int) -> Tuple[List[str], np.ndarray]:
+        """Оставляет top_n наибольших значений по убыванию, остальные объединяет в «Прочие»"""
+        values = np.asarray(values, dtype=float)
+        if top_n <= 0 or values.size <= top_n:
+            return list(labels), values
+
+        top = np.argpartition(-values, top_n - 1)[:top_n]
+        top = top[np.argsort(-values[top], kind='stable')]
+        other = np.sum(values) - np.sum(values[top])
+
+        top_labels = [labels[i] for i in top] + [f"Прочие ({values.size - top_n})"]
+        return top_labels, np.append(values[top], other)
+
+    @staticmethod
+    def label_step(count: int, max_labels: Optional[int]) -> int:
+        """Шаг прореживания подписей, чтобы их было не больше max_labels"""
+        if not max_labels or count <= max_labels:
+            return 1
+        return int(np.ceil(count / max_labels))
+
+    def _plot_priority_bars(self, labels: List[str], values: np.ndarray, title: str, color: str,
+                            display_percent: bool, top_n: Optional[int], max_labels: Optional[int]):
+        """Строит одну столбчатую диаграмму приоритетов"""
+        if top_n:
+            labels, values = self.aggregate_top_n(labels, values, top_n)
+
+        if display_percent:
+            values = values / np.sum(values) * 100
+            ylabel = "Приоритет, %"
+        else:
+            ylabel = "Значение приоритета"
+
+        fig, ax = plt.subplots(figsize=(10, 6))
+        positions = np.arange(len(labels))
+        ax.bar(positions, values, color=color)
+        ax.set_title(title)
+        ax.set_ylabel(ylabel)
+        ax.grid(axis='y', linestyle='--', alpha=0.7)
+
+        # Подписываем только каждый step-й столбец
+        step = self.label_step(len(labels), max_labels)
+        ax.set_xticks(positions[::step])
+        ax.set_xticklabels(labels[::step])
+        for x, height in zip(positions[::step], values[::step]):
+            ax.text(x, height, f'{height:.2f}%' if display_percent else f'{height:.4f}',
+                    ha='center', va='bottom')
+
+        return fig
+
+    @staticmethod
+    def plot_tornado(report: Dict[str, object]):
+        """Диаграмма «торнадо»: диапазоны весов критериев, в которых лидер остается первым
+
+        Самые чувствительные критерии (узкий диапазон) - сверху; точка - текущий вес.
+        """
+        lower, upper, weights = report['lower'][0], report['upper'][0], report['weights']
+        order = np.argsort(upper - lower, kind='stable')
+        positions = np.arange(order.size)
+
+        fig, ax = plt.subplots(figsize=(10, max(3, 0.5 * order.size + 1.5)))
+        ax.barh(positions, upper[order] - lower[order], left=lower[order], color='#4C72B0', alpha=0.8)
+        ax.plot(weights[order], positions, 'o', color='#C44E52', label="Текущий вес")
+        ax.set_yticks(positions)
+        ax.set_yticklabels([report['criteria'][k] for k in order])
+        ax.set_ylim(order.size - 0.5, -0.5)
+        ax.set_xlim(0, 1)
+        ax.set_xlabel("Вес критерия")
+        ax.set_title(f"Диапазоны весов, в которых «{report['alternatives'][0]}» остается лучшей")
+        ax.grid(axis='x', linestyle='--', alpha=0.7)
+        ax.legend(loc='lower right')
+        fig.tight_layout()
+        return fig
+
+    @staticmethod
+    def plot_rank_heatmap(report: Dict[str, object]):
+        """Тепловая карта: на сколько нужно изменить вес критерия, чтобы альтернатива сменила место"""
+        margin = report['margin']
+        fig, ax = plt.subplots(figsize=(max(6, 0.9 * margin.shape[1] + 3), max(3, 0.4 * margin.shape[0] + 1.5)))
+        image = ax.imshow(margin, cmap='RdYlGn', vmin=0, vmax=max(margin.max(), 1e-9), aspect='auto')
+        ax.set_xticks(np.arange(margin.shape[1]))
+        ax.set_xticklabels(report['criteria'], rotation=45, ha='right')
+        ax.set_yticks(np.arange(margin.shape[0]))
+        ax.set_yticklabels([f"{rank}. {name}" for rank, name in enumerate(report['alternatives'], 1)])
+        if margin.size <= 400:
+            for (i, k), value in np.ndenumerate(margin):
+                ax.text(k, i, f"{value:.3f}", ha='center', va='center', fontsize=8)
+        fig.colorbar(image, ax=ax, label="Запас веса до смены места")
+        ax.set_title("Устойчивость мест альтернатив")
+        fig.tight_layout()
+        return fig
+
+    def visualize_results(self, results: dict, display_percent: bool = False,
+                          top_n: Optional[int] = None, max_labels: Optional[int] = None):
+        """Визуализация результатов анализа
+
+        top_n оставляет на диаграмме только наибольшие значения и столбец «Прочие»,
+        max_labels ограничивает число подписей на оси и над столбцами.
+        """
         try:
             if not results or 'priorities' not in results:
                 raise ValueError("Нет данных для визуализации")
@@ -273,79 +2370,24 @@ class AHPBackend:
 
             # Визуализация приоритетов альтернатив
             if 'alternatives_priority' in priorities:
-                fig, ax = plt.subplots(figsize=(10, 6))
-                alternatives = self.alternatives
-                values = priorities['alternatives_priority']
-
-                if display_percent:
-                    values = values / np.sum(values) * 100
-                    ylabel = "Приоритет, %"
-                else:
-                    ylabel = "Значение приоритета"
-
-                bars = ax.bar(alternatives, values, color='skyblue')
-                ax.set_title("Итоговые приоритеты альтернатив")
-                ax.set_ylabel(ylabel)
-                ax.grid(axis='y', linestyle='--', alpha=0.7)
-
-                for bar in bars:
-                    height = bar.get_height()
-                    ax.text(bar.get_x() + bar.get_width() / 2., height,
-                            f'{height:.2f}%' if display_percent else f'{height:.4f}',
-                            ha='center', va='bottom')
-
-                figures.append(fig)
+                figures.append(self._plot_priority_bars(
+                    self.alternatives, priorities['alternatives_priority'],
+                    "Итоговые приоритеты альтернатив", 'skyblue',
+                    display_percent, top_n, max_labels))
 
             # Визуализация приоритетов критериев (для 2 и 3 уровней)
             if 'criteria_priority' in priorities:
-                fig, ax = plt.subplots(figsize=(10, 6))
-                criteria = self.criteria
-                values = priorities['criteria_priority']
-
-                if display_percent:
-                    values = values / np.sum(values) * 100
-                    ylabel = "Приоритет, %"
-                else:
-                    ylabel = "Значение приоритета"
-
-                bars = ax.bar(criteria, values, color='lightgreen')
                 title = "Приоритеты критериев" + (" (второй уровень)" if len(priorities) > 1 else "")
-                ax.set_title(title)
-                ax.set_ylabel(ylabel)
-                ax.grid(axis='y', linestyle='--', alpha=0.7)
-
-                for bar in bars:
-                    height = bar.get_height()
-                    ax.text(bar.get_x() + bar.get_width() / 2., height,
-                            f'{height:.2f}%' if display_percent else f'{height:.4f}',
-                            ha='center', va='bottom')
-
-                figures.append(fig)
+                figures.append(self._plot_priority_bars(
+                    self.criteria, priorities['criteria_priority'], title, 'lightgreen',
+                    display_percent, top_n, max_labels))
 
             # Визуализация приоритетов типов критериев (для 3 уровней)
             if 'type_priority' in priorities:
-                fig, ax = plt.subplots(figsize=(10, 6))
-                types = list(self.criteria_types.keys())
-                values = priorities['type_priority']
-
-                if display_percent:
-                    values = values / np.sum(values) * 100
-                    ylabel = "Приоритет, %"
-                else:
-                    ylabel = "Значение приоритета"
-
-                bars = ax.bar(types, values, color='salmon')
-                ax.set_title("Приоритеты типов критериев (первый уровень)")
-                ax.set_ylabel(ylabel)
-                ax.grid(axis='y', linestyle='--', alpha=0.7)
-
-                for bar in bars:
-                    height = bar.get_height()
-                    ax.text(bar.get_x() + bar.get_width() / 2., height,
-                            f'{height:.2f}%' if display_percent else f'{height:.4f}',
-                            ha='center', va='bottom')
-
-                figures.append(fig)
+                figures.append(self._plot_priority_bars(
+                    list(self.criteria_types.keys()), priorities['type_priority'],
+                    "Приоритеты типов критериев (первый уровень)", 'salmon',
+                    display_percent, top_n, max_labels))
 
             return figures
 
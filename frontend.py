@@ -1,3 +1,8 @@
+import bisect
+import io
+import json
+import os
+import re
 import sys
 import textwrap
 import traceback
@@ -10,14 +15,779 @@ from docx.shared import Pt, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 import numpy as np
 import matplotlib.pyplot as plt
-from PyQt5.QtGui import QColor, QRegExpValidator, QFont, QKeySequence, QPalette
+from PyQt5.QtGui import QColor, QRegExpValidator, QFont, QKeySequence, QPalette, QBrush
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.collections import PolyCollection
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QTabWidget, QVBoxLayout, QHBoxLayout,
-                             QLabel, QLineEdit, QPushButton, QScrollArea, QFrame, QListWidget,
-                             QGroupBox, QMessageBox, QTableWidget, QTableWidgetItem, QAbstractItemView, QGridLayout,
-                             QSizePolicy, QButtonGroup, QHeaderView, QRadioButton, QAction, QShortcut, QFileDialog)
-from PyQt5.QtCore import Qt, QRegExp, QTimer
+                             QLabel, QLineEdit, QPushButton, QScrollArea, QFrame,
+                             QGroupBox, QMessageBox, QTableView, QAbstractItemView, QGridLayout,
+                             QSizePolicy, QButtonGroup, QHeaderView, QRadioButton, QAction, QShortcut, QFileDialog,
+                             QStackedWidget, QSpinBox, QComboBox, QCheckBox, QScrollBar, QListView, QMenu, QSlider,
+                             QStyledItemDelegate, QStyleOptionButton, QStyleOptionViewItem, QStyle, QDialog,
+                             QDialogButtonBox, QInputDialog, QProgressDialog)
+from PyQt5.QtCore import (Qt, QRegExp, QTimer, QEvent, QAbstractTableModel, QAbstractListModel, QModelIndex,
+                          QRect, QSortFilterProxyModel, pyqtSignal)
 from backend import AHPBackend
+from styles import render_stylesheet
+
+
+class LiveChart:
+    """Основа диаграмм, которые обновляются при перетаскивании ползунков
+
+    Подкласс задает bar_artists, value_labels, values и _redraw().
+    Меняющиеся элементы помечаются анимируемыми: обычная перерисовка запоминает
+    фон без них, а частое обновление рисует поверх этого фона только столбцы
+    (blit) - оси и текст не перекомпоновываются. Подписи значений вернет
+    следующее обычное обновление. Скрытая диаграмма перерисуется при показе.
+    """
+
+    def _init_live(self):
+        self.background = None
+        self.live_enabled = False
+        self.redraw_on_show = False
+        self.canvas.showEvent = self._show_event
+
+    def _enable_live(self):
+        if self.live_enabled:
+            return
+        self.live_enabled = True
+        for artist in self.bar_artists + self.value_labels:
+            artist.set_animated(True)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        """После полной перерисовки запоминает фон и дорисовывает анимируемые элементы"""
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        for artist in self.bar_artists + self.value_labels:
+            self.ax.draw_artist(artist)
+
+    def _blit_bars(self):
+        self.canvas.restore_region(self.background)
+        for artist in self.bar_artists:
+            self.ax.draw_artist(artist)
+        self.canvas.blit(self.figure.bbox)
+
+    def _fits(self, limit):
+        """Помещаются ли значения в текущую шкалу, не сжимаясь до половины"""
+        top = self.values.max() * self._scale() if self.values.size else 0
+        return limit * 0.5 < top * 1.05 < limit
+
+    def _scale(self):
+        return 100 if self.display_percent else 1
+
+    def _show_event(self, event):
+        FigureCanvas.showEvent(self.canvas, event)
+        if self.redraw_on_show:
+            self.redraw_on_show = False
+            self._redraw()
+
+
+class ResultBarChart(LiveChart):
+    """Столбчатая диаграмма результатов, создаваемая один раз для набора данных
+
+    При max_labels подписи оси и значений выводятся только у каждого step-го
+    столбца, чтобы компоновка текста не росла вместе с числом элементов.
+    Столбцы - одна коллекция прямоугольников: их высоты меняются правкой
+    массива вершин, а отрисовка не зависит от числа объектов.
+    """
+
+    def __init__(self, labels, values, title, color, max_labels=None):
+        self.values = np.array(values, dtype=float)
+        self.labels = list(labels)
+
+        self.figure = plt.figure(figsize=(10, 6))
+        self.ax = self.figure.add_subplot(111)
+        positions = np.arange(len(labels))
+        # Вершины столбцов (x0, 0), (x0, h), (x1, h), (x1, 0) - как у ax.bar шириной 0.8
+        self.verts = np.zeros((len(labels), 4, 2))
+        self.verts[:, :2, 0] = positions[:, None] - 0.4
+        self.verts[:, 2:, 0] = positions[:, None] + 0.4
+        self.bars = PolyCollection(self.verts, facecolors=color, alpha=0.8)
+        self.ax.add_collection(self.bars)
+        self.bar_artists = [self.bars]
+        self.ax.autoscale_view(scaley=False)
+        self.ax.set_title(title, fontsize=16, pad=20, fontweight='bold')
+        self.ax.grid(axis='y', linestyle='--', alpha=0.5)
+
+        self.step = AHPBackend.label_step(len(labels), max_labels)
+        self.ax.set_xticks(positions[::self.step])
+        self.ax.set_xticklabels(self.labels[::self.step], rotation=45, ha='right')
+
+        self.value_labels = [
+            self.ax.text(x, 0, "", ha='center', va='bottom', fontsize=12)
+            for x in positions[::self.step]
+        ]
+        self.canvas = FigureCanvas(self.figure)
+        self.widget = self.canvas
+        self.display_percent = None
+        self._init_live()
+
+    def set_percent(self, display_percent):
+        """Переформатирует высоты, подписи и ось без пересоздания диаграммы"""
+        if display_percent == self.display_percent:
+            return
+        first_layout = self.display_percent is None
+        self.display_percent = display_percent
+        self._redraw()
+        if first_layout:
+            self.figure.tight_layout()
+
+    def set_values(self, values, labels=None, live=False):
+        """Новые высоты тех же столбцов (и при необходимости подписи оси) без пересоздания фигуры
+
+        live - частое обновление: пока подписи оси не меняются, а столбцы помещаются
+        в шкалу, перерисовываются только столбцы.
+        """
+        self.values = np.array(values, dtype=float)
+        relabel = labels is not None and list(labels) != self.labels
+        if relabel:
+            self.labels = list(labels)
+            self.ax.set_xticklabels(self.labels[::self.step], rotation=45, ha='right')
+        if not self.canvas.isVisible():
+            self.redraw_on_show = True
+            return
+
+        if live:
+            self._enable_live()
+            if self.background is not None and not relabel and self._fits(self.ax.get_ylim()[1]):
+                self._set_heights()
+                self._blit_bars()
+                return
+        # При перетаскивании шкала берется с запасом, чтобы реже перерисовывать оси
+        self._redraw(1.4 if live else 1.15)
+
+    def _set_heights(self):
+        heights = self.values * self._scale()
+        offset = self.ax.get_ylim()[1] * 0.01
+        fmt = "{:.2f}%" if self.display_percent else "{:.4f}"
+
+        self.verts[:, 1:3, 1] = heights[:, None]
+        self.bars.set_verts(self.verts)
+        for text, height in zip(self.value_labels, heights[::self.step]):
+            text.set_y(height + offset)
+            text.set_text(fmt.format(height))
+
+    def _redraw(self, headroom=1.15):
+        heights = self.values * self._scale()
+        ymax = heights.max() * headroom if heights.size and heights.max() > 0 else 1
+        self.ax.set_ylabel("Приоритет, %" if self.display_percent else "Значение приоритета", fontsize=14)
+        self.ax.set_ylim(0, ymax)
+        self._set_heights()
+        self.canvas.draw_idle()
+
+    def close(self):
+        plt.close(self.figure)
+
+
+class ScrollingBarChart(LiveChart):
+    """Горизонтальная диаграмма в прокручиваемом окне
+
+    Элементы упорядочены по убыванию приоритета. На фигуре всегда window
+    столбцов: при прокрутке им присваиваются новые значения и подписи,
+    поэтому перерисовка не зависит от общего числа элементов.
+    """
+
+    def __init__(self, labels, values, title, color, window=25):
+        self.names = list(labels)
+        self._sort_values(values)
+        self.window = min(window, len(self.labels))
+        self.start = 0
+
+        self.figure = plt.figure(figsize=(10, 6))
+        self.ax = self.figure.add_subplot(111)
+        positions = np.arange(self.window)
+        self.bars = self.ax.barh(positions, np.zeros(self.window), color=color, alpha=0.8)
+        self.bar_artists = list(self.bars)
+        self.ax.set_yticks(positions)
+        self.ax.set_ylim(self.window - 0.5, -0.5)
+        self.ax.set_title(title, fontsize=16, pad=20, fontweight='bold')
+        self.ax.grid(axis='x', linestyle='--', alpha=0.5)
+        self.value_labels = [
+            self.ax.text(0, y, "", ha='left', va='center', fontsize=10) for y in positions
+        ]
+        self.canvas = FigureCanvas(self.figure)
+
+        self.scrollbar = QScrollBar(Qt.Vertical)
+        self.scrollbar.setRange(0, len(self.labels) - self.window)
+        self.scrollbar.setPageStep(self.window)
+        self.scrollbar.valueChanged.connect(self.show_window)
+
+        self.widget = QWidget()
+        layout = QHBoxLayout(self.widget)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.canvas)
+        layout.addWidget(self.scrollbar)
+        self.canvas.wheelEvent = self._wheel_event
+
+        self.display_percent = None
+        self._init_live()
+
+    def set_percent(self, display_percent):
+        """Меняет шкалу оси и подписи видимых столбцов"""
+        if display_percent == self.display_percent:
+            return
+        first_layout = self.display_percent is None
+        self.display_percent = display_percent
+
+        self.ax.set_xlabel("Приоритет, %" if display_percent else "Значение приоритета", fontsize=12)
+        self._redraw()
+        if first_layout:
+            self.figure.tight_layout()
+
+    def set_values(self, values, labels=None, live=False):
+        """Пересортировывает элементы по новым значениям и перерисовывает текущее окно
+
+        live - частое обновление: порядок элементов сохраняется (пересортировка -
+        при следующем обычном обновлении), и перерисовываются только столбцы окна.
+        """
+        if labels is not None:
+            self.names = list(labels)
+        if not live:
+            self._sort_values(values)
+        else:
+            self.values = np.asarray(values, dtype=float)[self.order]
+        if not self.canvas.isVisible():
+            self.redraw_on_show = True
+            return
+
+        if live:
+            self._enable_live()
+            if self.background is not None and self._fits(self.ax.get_xlim()[1]):
+                self._set_window_values()
+                self._blit_bars()
+                return
+        self._redraw(1.4 if live else 1.15)
+
+    def _sort_values(self, values):
+        values = np.array(values, dtype=float)
+        self.order = np.argsort(-values, kind='stable')
+        self.labels = [f"{rank}. {self.names[i]}" for rank, i in enumerate(self.order, 1)]
+        self.values = values[self.order]
+
+    def show_window(self, start):
+        self.start = start
+        self._draw_window()
+
+    def _redraw(self, headroom=1.15):
+        # Шкала задается по всем элементам, чтобы не меняться при прокрутке
+        xmax = self.values.max() * self._scale() * headroom if self.values.size and self.values.max() > 0 else 1
+        self.ax.set_xlim(0, xmax)
+        self._draw_window()
+
+    def _set_window_values(self):
+        """Присваивает столбцам окна значения элементов start..start+window"""
+        chunk = self.values[self.start:self.start + self.window] * self._scale()
+        offset = self.ax.get_xlim()[1] * 0.01
+        fmt = "{:.2f}%" if self.display_percent else "{:.4f}"
+
+        for bar, text, width in zip(self.bars, self.value_labels, chunk):
+            bar.set_width(width)
+            text.set_x(width + offset)
+            text.set_text(fmt.format(width))
+
+    def _draw_window(self):
+        self._set_window_values()
+        self.ax.set_yticklabels(self.labels[self.start:self.start + self.window])
+        self.canvas.draw_idle()
+
+    def _wheel_event(self, event):
+        if event.modifiers() & Qt.ControlModifier:
+            event.ignore()
+            return
+        steps = -event.angleDelta().y() // 120
+        self.scrollbar.setValue(self.scrollbar.value() + steps * 3)
+
+    def close(self):
+        plt.close(self.figure)
+
+
+class ResultPieChart:
+    """Круговая диаграмма результатов с переключаемыми подписями секторов"""
+
+    def __init__(self, figure, autotexts, values):
+        self.figure = figure
+        self.autotexts = autotexts or []
+        self.values = np.array(values, dtype=float)
+        self.canvas = FigureCanvas(figure)
+        self.display_percent = None
+
+    def set_percent(self, display_percent):
+        """Меняет только текст подписей секторов"""
+        if display_percent == self.display_percent:
+            return
+        self.display_percent = display_percent
+
+        total = np.sum(self.values)
+        for text, value in zip(self.autotexts, self.values):
+            if display_percent:
+                text.set_text(f'{value / total * 100:.1f}%' if total else "")
+            else:
+                text.set_text(f'{value:.3f}')
+        self.canvas.draw_idle()
+
+    def close(self):
+        plt.close(self.figure)
+
+
+class PriorityTableModel(QAbstractTableModel):
+    """Модель таблицы приоритетов поверх массивов значений
+
+    Видимые строки задаются массивом индексов self.rows, поэтому сортировка,
+    фильтр и отбор первых N выполняются векторно, а представление запрашивает
+    данные только для отображаемых ячеек.
+    """
+
+    HEADERS = ["Место", "Элемент", "Значение приоритета", "Процент"]
+    ALIGNMENTS = [Qt.AlignCenter,
+                  Qt.AlignLeft | Qt.AlignVCenter,
+                  Qt.AlignRight | Qt.AlignVCenter,
+                  Qt.AlignRight | Qt.AlignVCenter]
+
+    def __init__(self, labels, values, parent=None, bounds=None, bounds_title="Границы"):
+        super().__init__(parent)
+        # Границы приоритета (нечеткого или интервального) - дополнительный столбец
+        self.bounds = None if bounds is None else np.asarray(bounds, dtype=float)
+        self.headers = self.HEADERS + ([bounds_title] if self.bounds is not None else [])
+        self.labels = [str(label) for label in labels]
+        self.labels_lower = np.char.lower(np.array(self.labels, dtype=str))
+        self.values = np.array(values, dtype=float)
+        if self.values.size == 0 or len(self.labels) != self.values.size:
+            raise ValueError("Количество меток и значений не совпадает")
+
+        # Место каждого элемента в рейтинге (0 - лучший)
+        order = np.argsort(-self.values, kind='stable')
+        self.ranks = np.empty(order.size, dtype=int)
+        self.ranks[order] = np.arange(order.size)
+        self.best = ~np.isnan(self.values) & np.isclose(self.values, np.nanmax(self.values))
+
+        # Стили строки с максимальным значением создаются один раз
+        self.best_background = QBrush(QColor(230, 255, 230))
+        self.best_foreground = QBrush(QColor(0, 100, 0))
+        self.best_font = QFont()
+        self.best_font.setBold(True)
+
+        self.filter_text = ""
+        self.top_n = 0
+        self.sort_column = 0
+        self.sort_order = Qt.AscendingOrder
+        self.rows = np.arange(self.values.size)
+
+    def total_count(self):
+        return self.values.size
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.rows.size
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = self.rows[index.row()]
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return str(self.ranks[row] + 1)
+            if column == 1:
+                return self.labels[row]
+            if column == 2:
+                return f"{self.values[row]:.4f}"
+            if column == 4:
+                return f"{self.bounds[row, 0]:.4f} – {self.bounds[row, 1]:.4f}"
+            return f"{self.values[row] * 100:.2f}%"
+        if role == Qt.TextAlignmentRole:
+            return int(self.ALIGNMENTS[min(column, 3)])
+        if self.best[row]:
+            if role == Qt.BackgroundRole:
+                return self.best_background
+            if role == Qt.ForegroundRole:
+                return self.best_foreground
+            if role == Qt.FontRole:
+                return self.best_font
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        self._update_rows()
+
+    def set_filter_text(self, text):
+        self.filter_text = text.strip().lower()
+        self._update_rows()
+
+    def set_top_n(self, top_n):
+        self.top_n = top_n
+        self._update_rows()
+
+    def _update_rows(self):
+        """Пересчитывает видимые строки с учетом фильтра, первых N и сортировки"""
+        mask = np.ones(self.values.size, dtype=bool)
+        if self.top_n:
+            mask &= self.ranks < self.top_n
+        if self.filter_text:
+            mask &= np.char.find(self.labels_lower, self.filter_text) >= 0
+        rows = np.flatnonzero(mask)
+
+        if self.sort_column == 0:
+            rows = rows[np.argsort(self.ranks[rows], kind='stable')]
+        elif self.sort_column == 1:
+            rows = rows[np.argsort(self.labels_lower[rows], kind='stable')]
+        elif self.sort_column in (2, 3):
+            rows = rows[np.argsort(self.values[rows], kind='stable')]
+        elif self.sort_column == 4:
+            # Интервалы - по нижней границе, при равенстве по верхней
+            rows = rows[np.lexsort((self.bounds[rows, 1], self.bounds[rows, 0]))]
+        if self.sort_order == Qt.DescendingOrder:
+            rows = rows[::-1]
+
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+
+class ItemListModel(QAbstractListModel):
+    """Модель списка элементов иерархии (альтернатив, критериев, видов)
+
+    Хранит имена элементов; текст строки строится функцией describe,
+    чтобы вид критериев мог показывать входящие в него критерии.
+    Если задана функция rename(row, name), строки можно переименовывать
+    в самом списке.
+    """
+
+    def __init__(self, items=(), describe=None, rename=None, parent=None):
+        super().__init__(parent)
+        self.items = list(items)
+        self.describe = describe or str
+        self.rename = rename
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.items)
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and self.rename is not None:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return self.describe(self.items[index.row()])
+        if role == Qt.EditRole:
+            return self.items[index.row()]
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole or self.rename is None:
+            return False
+        name = str(value).strip()
+        if name == self.items[index.row()] or not self.rename(index.row(), name):
+            return False
+        self.items[index.row()] = name
+        self.dataChanged.emit(index, index)
+        return True
+
+    def set_items(self, items):
+        """Полная замена списка одним сбросом модели"""
+        self.beginResetModel()
+        self.items = list(items)
+        self.endResetModel()
+
+    def append_items(self, items):
+        """Добавление элементов в конец без перестроения остальных строк"""
+        items = list(items)
+        if not items:
+            return
+        first = len(self.items)
+        self.beginInsertRows(QModelIndex(), first, first + len(items) - 1)
+        self.items.extend(items)
+        self.endInsertRows()
+
+
+class CheckListModel(ItemListModel):
+    """Список элементов с отметками; отметки хранятся по именам"""
+
+    def __init__(self, items=(), parent=None):
+        super().__init__(items, parent=parent)
+        self.checked = set()
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role == Qt.CheckStateRole:
+            return Qt.Checked if self.items[index.row()] in self.checked else Qt.Unchecked
+        return super().data(index, role)
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.CheckStateRole:
+            return False
+        name = self.items[index.row()]
+        if value == Qt.Checked:
+            self.checked.add(name)
+        else:
+            self.checked.discard(name)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+    def checked_items(self):
+        """Отмеченные элементы в порядке списка"""
+        return [name for name in self.items if name in self.checked]
+
+    def clear_checks(self):
+        self.beginResetModel()
+        self.checked.clear()
+        self.endResetModel()
+
+    def set_checked(self, names):
+        self.beginResetModel()
+        self.checked = set(names) & set(self.items)
+        self.endResetModel()
+
+
+class CriteriaPickerModel(CheckListModel):
+    """Список критериев с отметками для составления вида критериев
+
+    Для поиска хранится индекс начал слов: отсортированный список пар
+    (слово или имя целиком в нижнем регистре, номер строки). Строки,
+    у которых какое-либо слово начинается с запроса, находятся двумя
+    двоичными поисками. Отметки хранятся по именам и не теряются при фильтрации.
+    """
+
+    WORD_SPLIT = re.compile(r"\W+")
+
+    def __init__(self, items=(), parent=None):
+        super().__init__(items, parent=parent)
+        self.revision = 0
+        self._rebuild_index()
+
+    def _index_keys(self, name):
+        lowered = name.lower()
+        keys = {lowered}
+        keys.update(word for word in self.WORD_SPLIT.split(lowered) if word)
+        return keys
+
+    def _rebuild_index(self):
+        self.search_index = sorted((key, row) for row, name in enumerate(self.items)
+                                   for key in self._index_keys(name))
+        self.revision += 1
+
+    def set_items(self, items):
+        self.beginResetModel()
+        self.items = list(items)
+        self.checked &= set(self.items)
+        self._rebuild_index()
+        self.endResetModel()
+
+    def append_items(self, items):
+        items = list(items)
+        if not items:
+            return
+        first = len(self.items)
+        self.beginInsertRows(QModelIndex(), first, first + len(items) - 1)
+        self.items.extend(items)
+        for row, name in enumerate(items, first):
+            for key in self._index_keys(name):
+                bisect.insort(self.search_index, (key, row))
+        self.revision += 1
+        self.endInsertRows()
+
+    def match_rows(self, query):
+        """Номера строк, у которых имя или одно из слов начинается с запроса"""
+        query = query.strip().lower()
+        lo = bisect.bisect_left(self.search_index, (query, -1))
+        hi = bisect.bisect_left(self.search_index, (query + "\U0010ffff", -1))
+        return {row for _, row in self.search_index[lo:hi]}
+
+
+class CriteriaFilterProxyModel(QSortFilterProxyModel):
+    """Фильтр списка критериев по индексу CriteriaPickerModel
+
+    Подходящие строки вычисляются один раз на запрос (и на изменение
+    списка), после чего проверка каждой строки — поиск во множестве.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.query = ""
+        self.accepted_rows = None
+        self.accepted_revision = -1
+
+    def set_query(self, query):
+        self.query = query.strip()
+        self.accepted_revision = -1
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self.query:
+            return True
+        source = self.sourceModel()
+        if self.accepted_revision != source.revision:
+            self.accepted_rows = source.match_rows(self.query)
+            self.accepted_revision = source.revision
+        return source_row in self.accepted_rows
+
+
+class ScenarioComparisonModel(QAbstractTableModel):
+    """Места и приоритеты альтернатив по сценариям (столбцы) рядом
+
+    Строки упорядочены по месту в первом сценарии; ячейки, где место
+    отличается от первого сценария, подсвечиваются.
+    """
+
+    def __init__(self, comparison, parent=None):
+        super().__init__(parent)
+        self.scenarios = comparison['scenarios']
+        self.alternatives = comparison['alternatives']
+        self.priorities = comparison['priorities']
+        self.ranks = comparison['ranks']
+        self.rows = np.argsort(self.ranks[0], kind='stable')
+        self.changed_brush = QBrush(QColor(255, 240, 200))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.rows.size
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.scenarios)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.scenarios[section]
+        return self.alternatives[self.rows[section]]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, scenario = self.rows[index.row()], index.column()
+        if role == Qt.DisplayRole:
+            value = self.priorities[scenario, row]
+            return "—" if np.isnan(value) else f"{self.ranks[scenario, row]} ({value:.4f})"
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role == Qt.BackgroundRole and self.ranks[scenario, row] != self.ranks[0, row]:
+            return self.changed_brush
+        return None
+
+
+class RatingTableModel(QAbstractTableModel):
+    """Таблица оценок альтернатив (строки) по критериям (столбцы)
+
+    Данные берутся прямо из AHPBackend.ratings, поэтому таблица на сотни
+    тысяч альтернатив не требует копирования.
+    """
+
+    def __init__(self, backend, parent=None):
+        super().__init__(parent)
+        self.backend = backend
+        self.unrated_brush = QBrush(QColor(255, 240, 200))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.backend.alternatives)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.backend.criteria)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.backend.criteria[section]
+        return self.backend.alternatives[section]
+
+    def flags(self, index):
+        return super().flags(index) | Qt.ItemIsEditable
+
+    def scale(self, index):
+        return self.backend.rating_scale(self.backend.criteria[index.column()])
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        level = int(self.backend.ratings[index.row(), index.column()])
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self.scale(index)[level] if level >= 0 else ""
+        if role == Qt.BackgroundRole and level < 0:
+            return self.unrated_brush
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        if not self.backend.set_rating(index.row(), index.column(), int(value)):
+            return False
+        self.dataChanged.emit(index, index)
+        return True
+
+
+class RatingDelegate(QStyledItemDelegate):
+    """Выбор градации шкалы из выпадающего списка"""
+
+    def createEditor(self, parent, option, index):
+        editor = QComboBox(parent)
+        editor.addItems(index.model().scale(index))
+        return editor
+
+    def setEditorData(self, editor, index):
+        level = int(index.model().backend.ratings[index.row(), index.column()])
+        editor.setCurrentIndex(max(level, 0))
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentIndex())
+
+
+class DeleteButtonDelegate(QStyledItemDelegate):
+    """Рисует кнопку «Удалить» в каждой строке списка
+
+    Кнопка только отрисовывается, отдельные виджеты на строки не создаются;
+    нажатие определяется по координатам и передается сигналом deleteRequested.
+    """
+
+    deleteRequested = pyqtSignal(int)
+    BUTTON_TEXT = "Удалить"
+
+    def _button_rect(self, option):
+        width = option.fontMetrics.horizontalAdvance(self.BUTTON_TEXT) + 20
+        rect = option.rect
+        return QRect(rect.right() - width - 2, rect.top() + 2, width, rect.height() - 4)
+
+    def paint(self, painter, option, index):
+        button_rect = self._button_rect(option)
+        text_option = QStyleOptionViewItem(option)
+        text_option.rect = option.rect.adjusted(0, 0, -button_rect.width() - 6, 0)
+        super().paint(painter, text_option, index)
+
+        button = QStyleOptionButton()
+        button.rect = button_rect
+        button.text = self.BUTTON_TEXT
+        button.state = QStyle.State_Enabled
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.CE_PushButton, button, painter, option.widget)
+
+    def sizeHint(self, option, index):
+        size = super().sizeHint(option, index)
+        size.setHeight(max(size.height(), option.fontMetrics.height() + 12))
+        return size
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton \
+                and self._button_rect(option).contains(event.pos()):
+            self.deleteRequested.emit(index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
+
 
 class AHPFrontend(QMainWindow):
     def __init__(self):
@@ -30,7 +800,26 @@ class AHPFrontend(QMainWindow):
         self.current_items = []
         self.result_display_mode = "chart"
         self.result_data = None
+        self.result_pages = {}
+        self.result_charts = []
+        self.bar_charts = []
+        self.level_bar_charts = {}  # Диаграммы уровней иерархии: 'types', 'criteria', 'alternatives'
+        self.whatif_sliders = []
+        self.whatif_group = None
+        self.whatif_status = None
+        self.result_tables = []
+        self.chart_mode = "top"
+        self.decimate_chart_labels = True
         self.matrix_entries = {}
+        self.matrix_sizes = {}  # Размер каждой матрицы в порядке вывода на вкладке
+        self.matrix_frames = {}
+        self.matrix_progress_labels = {}
+        self.matrix_suggestion_buttons = {}
+        self.matrix_suggestions = {}
+        self.guided_mode = False
+        self.synthesis_mode = 'distributive'
+        self.kept_dominated = set()  # Доминируемые альтернативы, которые пользователь решил оставить
+        self.GUIDED_TOLERANCE = 0.05  # Допустимая вероятность перестановки соседних по рангу элементов
         self.display_percent = False
         self.selected_levels = 3  # По умолчанию 3 уровня
 
@@ -41,14 +830,33 @@ class AHPFrontend(QMainWindow):
         self.MAX_SCALE = 2.0
         self.SCALE_STEP = 0.1
 
+        # Серия шагов масштаба (прокрутка с Ctrl) применяется одной перерисовкой
+        self.scale_timer = QTimer(self)
+        self.scale_timer.setSingleShot(True)
+        self.scale_timer.setInterval(150)
+        self.scale_timer.timeout.connect(self._apply_scale)
+
+        # Движение ползунков весов перерисовывает диаграммы не чаще ~30 раз в секунду
+        self.whatif_timer = QTimer(self)
+        self.whatif_timer.setSingleShot(True)
+        self.whatif_timer.setInterval(30)
+        self.whatif_timer.timeout.connect(self._apply_whatif_weights)
+
+        # Параметры диаграмм для больших наборов элементов
+        self.CHART_TOP_N = 20
+        self.CHART_MAX_LABELS = 40
+        self.CHART_SCROLL_WINDOW = 25
+        self.WHATIF_SLIDER_STEPS = 1000
+        self.STABILITY_HEADERS = ["Критерий", "Текущий вес", "Нижняя граница", "Верхняя граница",
+                                  "Лидер при весе ниже", "Лидер при весе выше"]
+
         # Создание виджетов
         self._create_widgets()
         self._setup_ui()
         self._create_settings_menu()
 
-        # Применяем тему и масштаб
+        # Применяем тему и масштаб (одна таблица стилей)
         self._apply_theme()
-        self._apply_scale()
 
         # Настройка окна
         self.setWindowState(Qt.WindowMaximized)
@@ -138,126 +946,11 @@ class AHPFrontend(QMainWindow):
             palette.setColor(QPalette.HighlightedText, Qt.black)
 
             app.setPalette(palette)
-            app.setStyleSheet("""
-                QMainWindow, QDialog, QWidget {
-                    background-color: #353535;
-                }
-                QTabWidget::pane {
-                    border: 1px solid #444;
-                    background: #353535;
-                }
-                QTabBar::tab {
-                    background: #444;
-                    color: white;
-                    padding: 8px;
-                    border: 1px solid #444;
-                    border-bottom: none;
-                    border-top-left-radius: 4px;
-                    border-top-right-radius: 4px;
-                }
-                QTabBar::tab:selected {
-                    background: #555;
-                    border-color: #555;
-                }
-                QGroupBox {
-                    border: 1px solid #555;
-                    margin-top: 10px;
-                    padding-top: 15px;
-                    background: #353535;
-                }
-                QGroupBox::title {
-                    color: white;
-                    subcontrol-origin: margin;
-                    left: 10px;
-                }
-                QLabel {
-                    color: white;
-                }
-                QLineEdit, QTextEdit, QPlainTextEdit {
-                    background: #454545;
-                    color: white;
-                    border: 1px solid #555;
-                    padding: 5px;
-                }
-                QPushButton {
-                    background: #555;
-                    color: white;
-                    border: 1px solid #555;
-                    padding: 5px 10px;
-                    border-radius: 4px;
-                }
-                QPushButton:hover {
-                    background: #666;
-                }
-                QListWidget, QTableWidget {
-                    background: #454545;
-                    color: white;
-                    border: 1px solid #555;
-                }
-            """)
         else:
             # Светлая палитра
             app.setPalette(app.style().standardPalette())
-            app.setStyleSheet("""
-                QMainWindow, QDialog, QWidget {
-                    background-color: #f0f0f0;
-                }
-                QTabWidget::pane {
-                    border: 1px solid #C2C7CB;
-                    background: #f0f0f0;
-                }
-                QTabBar::tab {
-                    background: #F0F0F0;
-                    color: black;
-                    padding: 8px;
-                    border: 1px solid #C2C7CB;
-                    border-bottom: none;
-                    border-top-left-radius: 4px;
-                    border-top-right-radius: 4px;
-                }
-                QTabBar::tab:selected {
-                    background: white;
-                    border-color: #C2C7CB;
-                }
-                QGroupBox {
-                    border: 1px solid #C2C7CB;
-                    margin-top: 10px;
-                    padding-top: 15px;
-                    background: white;
-                }
-                QGroupBox::title {
-                    color: #333;
-                    subcontrol-origin: margin;
-                    left: 10px;
-                }
-                QLabel {
-                    color: black;
-                }
-                QLineEdit, QTextEdit, QPlainTextEdit {
-                    background: white;
-                    color: black;
-                    border: 1px solid #C2C7CB;
-                    padding: 5px;
-                }
-                QPushButton {
-                    background: #f0f0f0;
-                    color: black;
-                    border: 1px solid #C2C7CB;
-                    padding: 5px 10px;
-                    border-radius: 4px;
-                }
-                QPushButton:hover {
-                    background: #e0e0e0;
-                }
-                QListWidget, QTableWidget {
-                    background: white;
-                    color: black;
-                    border: 1px solid #C2C7CB;
-                }
-            """)
-
-        # Обновляем стиль матриц
-        self._update_matrices_style()
+
+        self._apply_stylesheet()
 
     def _update_percent_toggle_text(self):
         """Обновляет текст кнопки переключения режима"""
@@ -266,111 +959,37 @@ class AHPFrontend(QMainWindow):
             else "Показать в процентах"
         )
 
-    def _toggle_percent_display(self):
-        """Переключение между процентами и абсолютными значениями"""
-        self.display_percent = not self.display_percent
-        self._update_percent_toggle_text()
-        self._display_results()
-
-    def _update_matrices_style(self):
-        """Обновляет стиль всех матриц при смене темы"""
-        for key in self.matrix_entries:
-            widget = self.matrix_entries[key]
-            if isinstance(widget, (QLineEdit, QLabel)):
-                if self.dark_mode:
-                    widget.setStyleSheet(self._get_dark_matrix_cell_style())
-                else:
-                    widget.setStyleSheet(self._get_light_matrix_cell_style())
-
-    def _get_dark_matrix_cell_style(self):
-        """Возвращает стиль ячеек матрицы для темной темы"""
-        return """
-            QLineEdit, QLabel {
-                border: 1px solid #555;
-                padding: 5px;
-                background-color: #454545;
-                color: white;
-                border-radius: 3px;
-            }
-            QLineEdit:focus {
-                border: 2px solid #8E2DC5;
-            }
-        """
-
-    def _get_light_matrix_cell_style(self):
-        """Возвращает стиль ячеек матрицы для светлой темы"""
-        return """
-            QLineEdit, QLabel {
-                border: 1px solid #ccc;
-                padding: 5px;
-                background-color: white;
-                color: black;
-                border-radius: 3px;
-            }
-            QLineEdit:focus {
-                border: 2px solid #4CAF50;
-            }
-        """
+    def _apply_stylesheet(self):
+        """Применяет единую таблицу стилей для текущей темы и масштаба"""
+        QApplication.instance().setStyleSheet(render_stylesheet(self.dark_mode, self.current_scale))
 
     def zoom_in(self):
         """Увеличивает масштаб интерфейса"""
         new_scale = round(self.current_scale + self.SCALE_STEP, 1)
         if new_scale <= self.MAX_SCALE:
             self.current_scale = new_scale
-            self._apply_scale()
+            self.scale_timer.start()
 
     def zoom_out(self):
         """Уменьшает масштаб интерфейса"""
         new_scale = round(self.current_scale - self.SCALE_STEP, 1)
         if new_scale >= self.MIN_SCALE:
             self.current_scale = new_scale
-            self._apply_scale()
+            self.scale_timer.start()
 
     def reset_zoom(self):
         """Сбрасывает масштаб к значению по умолчанию"""
         self.current_scale = 1.0
-        self._apply_scale()
+        self.scale_timer.start()
 
     def _apply_scale(self):
         """Применяет текущий масштаб ко всему приложению"""
-        app = QApplication.instance()
+        # Размеры шрифтов заданы в таблице стилей, достаточно одной перерисовки
+        self._apply_stylesheet()
 
-        # Устанавливаем шрифт для всего приложения
-        font = app.font()
-        base_size = 9 if self.dark_mode else 10
-        font.setPointSize(int(base_size * self.current_scale))
-        app.setFont(font)
-
-        # Обновляем специальные виджеты
-        self._update_special_widgets_fonts()
-
-        # Обновляем все виджеты
-        self.update()
-        self.updateGeometry()
-
-        # Принудительное обновление всех дочерних виджетов
-        for widget in self.findChildren(QWidget):
-            widget.updateGeometry()
-            widget.update()
-
-    def _update_special_widgets_fonts(self):
-        """Обновляет шрифты специальных виджетов"""
-        # Обновляем матрицы
-        for key in self.matrix_entries:
-            widget = self.matrix_entries[key]
-            if isinstance(widget, (QLineEdit, QLabel)):
-                font = widget.font()
-                base_size = 8 if self.dark_mode else 9
-                font.setPointSize(int(base_size * self.current_scale))
-                widget.setFont(font)
-
-        # Обновляем таблицы
-        for table in self.findChildren(QTableWidget):
-            font = table.font()
-            font.setPointSize(int(10 * self.current_scale))
-            table.setFont(font)
-            table.resizeRowsToContents()
-            table.resizeColumnsToContents()
+        # Высота строк таблиц результатов зависит от метрик шрифта
+        for table in self.result_tables:
+            self._fit_priority_table(table)
 
     def wheelEvent(self, event):
         """Обработка масштабирования колесиком мыши с Ctrl"""
@@ -459,15 +1078,25 @@ class AHPFrontend(QMainWindow):
             alt_layout.addWidget(QLabel("Альтернатива:"))
             alt_layout.addWidget(self.alt_entry)
             alt_layout.addWidget(add_alt_btn)
+            alt_layout.addWidget(self._create_import_button('alternatives'))
             alt_layout.addStretch()
 
-            self.alt_list_widget = QWidget()
-            self.alt_list_layout = QVBoxLayout(self.alt_list_widget)
-            self.alt_list_layout.setAlignment(Qt.AlignTop)
+            self.alt_model = ItemListModel(rename=lambda row, name: self._rename_item('alternatives', row, name))
+            self.alt_view = self._create_item_list_view(self.alt_model, 'alternatives')
 
             self.alt_group.setLayout(QVBoxLayout())
             self.alt_group.layout().addLayout(alt_layout)
-            self.alt_group.layout().addWidget(self.alt_list_widget)
+            self.alt_group.layout().addWidget(self.alt_view)
+            self.alt_group.layout().addLayout(self._create_item_list_actions(self.alt_view, 'alternatives'))
+
+            self.cluster_mode_check = QCheckBox(
+                f"Сравнивать альтернативы группами по {self.backend.CLUSTER_SIZE} (для сотен альтернатив)")
+            self.cluster_mode_check.setToolTip(
+                "Вместо одной большой матрицы - небольшие матрицы для групп соседних по списку альтернатив.\n"
+                "Соседние группы имеют общую (опорную) альтернативу, через нее связываются их оценки.\n"
+                "Лучше располагать альтернативы в списке примерно по убыванию предпочтения.")
+            self.cluster_mode_check.toggled.connect(self._toggle_cluster_mode)
+            self.alt_group.layout().addWidget(self.cluster_mode_check)
 
             # Группа критериев
             self.crit_group = QGroupBox("3. Ввод критериев")
@@ -481,15 +1110,29 @@ class AHPFrontend(QMainWindow):
             crit_layout.addWidget(QLabel("Критерий:"))
             crit_layout.addWidget(self.crit_entry)
             crit_layout.addWidget(add_crit_btn)
+            crit_layout.addWidget(self._create_import_button('criteria'))
             crit_layout.addStretch()
 
-            self.crit_list_widget = QWidget()
-            self.crit_list_layout = QVBoxLayout(self.crit_list_widget)
-            self.crit_list_layout.setAlignment(Qt.AlignTop)
+            self.crit_model = ItemListModel(rename=lambda row, name: self._rename_item('criteria', row, name))
+            self.crit_view = self._create_item_list_view(self.crit_model, 'criteria')
 
             self.crit_group.setLayout(QVBoxLayout())
             self.crit_group.layout().addLayout(crit_layout)
-            self.crit_group.layout().addWidget(self.crit_list_widget)
+            self.crit_group.layout().addWidget(self.crit_view)
+            self.crit_group.layout().addLayout(self._create_item_list_actions(self.crit_view, 'criteria'))
+
+            self.rating_mode_check = QCheckBox("Режим оценок: альтернативы оцениваются по шкале каждого критерия, "
+                                               "а не попарно")
+            self.rating_mode_check.setToolTip("Подходит для сотен и тысяч альтернатив: для критерия сравниваются\n"
+                                              "только градации шкалы, а каждая альтернатива получает одну оценку")
+            self.rating_mode_check.toggled.connect(self._toggle_rating_mode)
+            self.crit_group.layout().addWidget(self.rating_mode_check)
+
+            attribute_btn = QPushButton("Матрицы из таблицы показателей...")
+            attribute_btn.setToolTip("Таблица CSV/XLSX: первая строка - показатели (критерии),\n"
+                                     "первый столбец - альтернативы, в ячейках - числовые значения")
+            attribute_btn.clicked.connect(self._import_attribute_table)
+            self.crit_group.layout().addWidget(attribute_btn)
 
             # Группа типов критериев
             self.type_group = QGroupBox("4. Ввод видов критериев")
@@ -509,14 +1152,24 @@ class AHPFrontend(QMainWindow):
             search_layout = QHBoxLayout()
             search_layout.addWidget(QLabel("Поиск критериев:"))
             self.criteria_search = QLineEdit()
-            self.criteria_search.setPlaceholderText("Введите текст для поиска...")
-            self.criteria_search.textChanged.connect(self._filter_criteria_list)
+            self.criteria_search.setPlaceholderText("Введите начало слова для поиска...")
+            self.criteria_search.textChanged.connect(lambda: self.search_timer.start())
             search_layout.addWidget(self.criteria_search)
+
+            # Фильтр применяется после паузы в наборе, а не на каждое нажатие
+            self.search_timer = QTimer(self)
+            self.search_timer.setSingleShot(True)
+            self.search_timer.setInterval(200)
+            self.search_timer.timeout.connect(self._filter_criteria_list)
             type_layout.addLayout(search_layout)
 
             # Список критериев
-            self.type_criteria = QListWidget()
-            self.type_criteria.setSelectionMode(QListWidget.MultiSelection)
+            self.criteria_picker_model = CriteriaPickerModel()
+            self.criteria_proxy = CriteriaFilterProxyModel(self)
+            self.criteria_proxy.setSourceModel(self.criteria_picker_model)
+            self.type_criteria = QListView()
+            self.type_criteria.setModel(self.criteria_proxy)
+            self.type_criteria.setUniformItemSizes(True)
             self.type_criteria.setFixedHeight(100)
             type_layout.addWidget(self.type_criteria)
 
@@ -526,10 +1179,13 @@ class AHPFrontend(QMainWindow):
             type_layout.addWidget(add_type_btn)
 
             # Список добавленных видов
-            self.type_list_widget = QWidget()
-            self.type_list_layout = QVBoxLayout(self.type_list_widget)
-            self.type_list_layout.setAlignment(Qt.AlignTop)
-            type_layout.addWidget(self.type_list_widget)
+            self.type_model = ItemListModel(
+                describe=lambda name: f"{name}: {', '.join(self.backend.criteria_types.get(name, []))}",
+                rename=lambda row, name: self._rename_item('criteria_types', row, name))
+            self.type_view = self._create_item_list_view(self.type_model, 'criteria_types')
+            self.type_view.setFixedHeight(120)
+            type_layout.addWidget(self.type_view)
+            type_layout.addLayout(self._create_item_list_actions(self.type_view, 'criteria_types'))
 
             self.type_group.setLayout(type_layout)
 
@@ -603,14 +1259,7 @@ class AHPFrontend(QMainWindow):
 
             # Кнопка проверки согласованности
             self.recalc_btn = QPushButton("Проверить согласованность →")
-            self.recalc_btn.setStyleSheet("""
-                QPushButton {
-                    font-weight: bold;
-                    padding: 8px;
-                    margin: 10px;
-                    min-width: 200px;
-                }
-            """)
+            self.recalc_btn.setProperty("role", "action")
             self.recalc_btn.clicked.connect(self._check_all_consistency)
 
             btn_container = QWidget()
@@ -637,8 +1286,61 @@ class AHPFrontend(QMainWindow):
             scroll_content = QWidget()
             self.scroll_layout = QVBoxLayout(scroll_content)
 
+            # Сводка заполнения и переход к незаполненным суждениям
+            progress_layout = QHBoxLayout()
+            self.fill_status_label = QLabel()
+            progress_layout.addWidget(self.fill_status_label)
+            progress_layout.addStretch()
+            guided_check = QCheckBox("Пошаговый ввод")
+            guided_check.setToolTip("Программа сама выбирает следующую пару для сравнения\n"
+                                    "и предлагает остановиться, когда ранжирование устойчиво")
+            guided_check.toggled.connect(self._toggle_guided_mode)
+            progress_layout.addWidget(guided_check)
+            fuzzy_check = QCheckBox("Нечеткий расчет")
+            fuzzy_check.setToolTip("Суждения вида ~3 (примерно 3) учитываются как треугольные нечеткие числа;\n"
+                                   "в таблице результатов выводится интервал нечеткого веса")
+            fuzzy_check.toggled.connect(lambda checked: setattr(self.backend, 'fuzzy_mode', checked))
+            progress_layout.addWidget(fuzzy_check)
+            interval_check = QCheckBox("Интервальные оценки")
+            interval_check.setToolTip("Суждения вида 3-5 (от 3 до 5) дают интервалы приоритетов;\n"
+                                      "в результатах отмечаются альтернативы с устойчивым местом")
+            interval_check.toggled.connect(lambda checked: setattr(self.backend, 'interval_mode', checked))
+            progress_layout.addWidget(interval_check)
+            next_missing_btn = QPushButton("К следующему незаполненному (Ctrl+J)")
+            next_missing_btn.clicked.connect(self._jump_to_next_missing)
+            progress_layout.addWidget(next_missing_btn)
+            next_missing_shortcut = QShortcut("Ctrl+J", self.comp_tab)
+            next_missing_shortcut.setContext(Qt.WidgetWithChildrenShortcut)
+            next_missing_shortcut.activated.connect(self._jump_to_next_missing)
+            self.comp_tab.layout().addLayout(progress_layout)
+
+            # Именованные наборы суждений (пессимистичный, базовый, оптимистичный и т. п.)
+            scenario_layout = QHBoxLayout()
+            scenario_layout.addWidget(QLabel("Сценарий:"))
+            self.scenario_combo = QComboBox()
+            self.scenario_combo.setMinimumWidth(200)
+            self.scenario_combo.activated.connect(self._load_scenario)
+            scenario_layout.addWidget(self.scenario_combo)
+            save_scenario_btn = QPushButton("Сохранить как...")
+            save_scenario_btn.clicked.connect(self._save_scenario)
+            scenario_layout.addWidget(save_scenario_btn)
+            delete_scenario_btn = QPushButton("Удалить")
+            delete_scenario_btn.clicked.connect(self._delete_scenario)
+            scenario_layout.addWidget(delete_scenario_btn)
+            compare_scenarios_btn = QPushButton("Сравнить сценарии...")
+            compare_scenarios_btn.clicked.connect(self._compare_scenarios)
+            scenario_layout.addWidget(compare_scenarios_btn)
+            survey_btn = QPushButton("Ответы экспертов...")
+            survey_btn.setToolTip("Файл CSV/JSONL: строка на ответ (expert, matrix, i, j, value);\n"
+                                  "суждения заменяются средним геометрическим ответов по каждой ячейке")
+            survey_btn.clicked.connect(self._import_survey)
+            scenario_layout.addWidget(survey_btn)
+            scenario_layout.addStretch()
+            self.comp_tab.layout().addLayout(scenario_layout)
+
             scroll.setWidget(scroll_content)
             self.comp_tab.layout().addWidget(scroll)
+            self.comp_scroll = scroll
 
             self.tabs.addTab(self.comp_tab, "2. Метод парных сравнений")
 
@@ -655,7 +1357,7 @@ class AHPFrontend(QMainWindow):
             # 1. Проверка первого уровня (типы критериев) - только для 3 уровней
             if self.selected_levels >= 3 and 'criteria_types' in self.backend.matrices:
                 title1 = QLabel(("Первый уровень:" if self.selected_levels == 3 else "") + " Согласованность видов критериев")
-                title1.setStyleSheet("font-weight: bold; font-size: 12pt;")
+                title1.setProperty("role", "sectionTitle")
                 self.consistency_layout.addWidget(title1)
 
                 matrix = self.backend.matrices['criteria_types']
@@ -670,7 +1372,7 @@ class AHPFrontend(QMainWindow):
             # 2. Проверка второго уровня (критерии) - для 2 и 3 уровней
             if self.selected_levels >= 2:
                 title2 = QLabel(("Второй уровень:" if self.selected_levels == 3 else "") + " Согласованность критериев")
-                title2.setStyleSheet("font-weight: bold; font-size: 12pt; margin-top: 20px;")
+                title2.setProperty("role", "levelTitle")
                 self.consistency_layout.addWidget(title2)
 
                 if self.selected_levels >= 3:
@@ -702,16 +1404,18 @@ class AHPFrontend(QMainWindow):
 
             # 3. Проверка третьего уровня (альтернативы) - для всех уровней
             title3 = QLabel("Согласованность альтернатив")
-            title3.setStyleSheet("font-weight: bold; font-size: 12pt; margin-top: 20px;")
+            title3.setProperty("role", "levelTitle")
             self.consistency_layout.addWidget(title3)
 
             if self.selected_levels >= 2:
                 # Для 2 и 3 уровней - проверка по критериям
                 for criterion in self.backend.criteria:
                     key = f'alternatives_{criterion}'
+                    group_title = f"Альтернативы по критерию '{criterion}'"
+                    if self.backend.rating_mode:
+                        key = f'ratings_{criterion}'
+                        group_title = f"Шкала оценок по критерию '{criterion}'"
                     if key in self.backend.matrices:
-                        # Убрали подзаголовок "Критерий", оставили только название группы
-                        group_title = f"Альтернативы по критерию '{criterion}'"  # Измененная строка
                         matrix = self.backend.matrices[key]
                         consistency = self.backend.check_consistency(matrix)
 
@@ -756,11 +1460,11 @@ class AHPFrontend(QMainWindow):
 
         status = QLabel(f"Статус: {consistency['status']}")
         if "ТРЕБУЕТСЯ пересмотр" in consistency['status']:
-            status.setStyleSheet("color: red; font-weight: bold;")
+            status.setProperty("status", "bad")
         elif "Приемлемая согласованность" in consistency['status']:
-            status.setStyleSheet("color: orange;")
+            status.setProperty("status", "warn")
         else:
-            status.setStyleSheet("color: green;")
+            status.setProperty("status", "good")
 
         layout.addWidget(status)
         layout.addWidget(QLabel("(ОС < 0.1 - отличная, ОС < 0.2 - приемлемая, ОС ≥ 0.2 - требует пересмотра)"))
@@ -800,8 +1504,7 @@ class AHPFrontend(QMainWindow):
                 text = self.alt_entry.text().strip()
                 if text and hasattr(self, 'backend') and self.backend.add_alternative(text):
                     self.alt_entry.clear()
-                    self._update_alt_list()
-                    self._update_criteria_listbox()
+                    self.alt_model.append_items([self.backend.alternatives[-1]])
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Ошибка добавления альтернативы: {str(e)}")
 
@@ -812,8 +1515,8 @@ class AHPFrontend(QMainWindow):
                 text = self.crit_entry.text().strip()
                 if text and hasattr(self, 'backend') and self.backend.add_criterion(text):
                     self.crit_entry.clear()
-                    self._update_crit_list()
-                    self._update_criteria_listbox()
+                    self.crit_model.append_items([self.backend.criteria[-1]])
+                    self.criteria_picker_model.append_items([self.backend.criteria[-1]])
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Ошибка добавления критерия: {str(e)}")
 
@@ -824,7 +1527,7 @@ class AHPFrontend(QMainWindow):
                 return
 
             type_name = self.type_entry.text().strip()
-            selected = [item.text() for item in self.type_criteria.selectedItems()]
+            selected = self.criteria_picker_model.checked_items()
 
             if not type_name:
                 QMessageBox.warning(self, "Ошибка", "Введите название вида критериев")
@@ -837,151 +1540,388 @@ class AHPFrontend(QMainWindow):
                 self.type_entry.clear()
                 if hasattr(self, 'criteria_search'):
                     self.criteria_search.clear()
-                self.type_criteria.clearSelection()
+                    self._filter_criteria_list()
+                self.criteria_picker_model.clear_checks()
                 self._update_type_list()
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Ошибка добавления вида критериев: {str(e)}")
 
-    def _update_alt_list(self):
-        """Обновление списка альтернатив"""
+    def _create_item_list_view(self, model, item_type):
+        """Список элементов иерархии с кнопкой удаления в строке и множественным выбором"""
+        view = QListView()
+        view.setModel(model)
+        view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        view.setUniformItemSizes(True)
+        view.setFixedHeight(180)
+
+        delegate = DeleteButtonDelegate(view)
+        delegate.deleteRequested.connect(lambda row: self._remove_items(item_type, [row]))
+        view.setItemDelegate(delegate)
+
+        shortcut = QShortcut(QKeySequence.Delete, view)
+        shortcut.setContext(Qt.WidgetShortcut)
+        shortcut.activated.connect(lambda: self._remove_selected_items(view, item_type))
+        return view
+
+    def _create_item_list_actions(self, view, item_type):
+        """Строка действий под списком элементов"""
+        layout = QHBoxLayout()
+        remove_btn = QPushButton("Удалить выбранные")
+        remove_btn.clicked.connect(lambda: self._remove_selected_items(view, item_type))
+        layout.addWidget(remove_btn)
+
+        for text, step in (("Вверх", -1), ("Вниз", 1)):
+            move_btn = QPushButton(text)
+            move_btn.clicked.connect(lambda _, s=step: self._move_current_item(view, item_type, s))
+            layout.addWidget(move_btn)
+
+        layout.addWidget(QLabel("Двойной щелчок — переименовать"))
+        layout.addStretch()
+        return layout
+
+    def _rename_item(self, item_type, row, name):
+        """Переименование элемента иерархии; введенные суждения сохраняются"""
+        if not self.backend.rename_item(item_type, row, name):
+            QMessageBox.warning(self, "Ошибка", f"Название «{name}» пустое или уже используется")
+            return False
+        if item_type == 'criteria':
+            self._update_type_list()
+            self._update_criteria_listbox()
+        return True
+
+    def _move_current_item(self, view, item_type, step):
+        """Перемещение текущего элемента списка на позицию вверх или вниз"""
         try:
-            if not hasattr(self, 'alt_list_layout') or not hasattr(self, 'backend'):
+            row = view.currentIndex().row()
+            if row < 0 or not self.backend.move_item(item_type, row, row + step):
                 return
 
-            self._clear_layout(self.alt_list_layout)
-
-            for i, alt in enumerate(getattr(self.backend, 'alternatives', [])):
-                frame = QWidget()
-                frame.setLayout(QHBoxLayout())
-
-                label = QLabel(alt)
-                btn = QPushButton("Удалить")
-                btn.clicked.connect(lambda _, idx=i: self._remove_item('alternatives', idx))
+            if item_type == 'alternatives':
+                self._update_alt_list()
+            elif item_type == 'criteria':
+                self._update_crit_list()
+                self._update_criteria_listbox()
+            else:
+                self._update_type_list()
+            view.setCurrentIndex(view.model().index(row + step, 0))
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка", f"Ошибка перемещения элемента: {str(e)}")
+
+    def _create_import_button(self, item_type):
+        """Кнопка массового импорта элементов из файла или буфера обмена"""
+        button = QPushButton("Импорт")
+        menu = QMenu(button)
+        menu.addAction("Из файла CSV/XLSX...", lambda: self._import_items(item_type, from_clipboard=False))
+        menu.addAction("Из буфера обмена", lambda: self._import_items(item_type, from_clipboard=True))
+        button.setMenu(menu)
+        return button
+
+    def _import_items(self, item_type, from_clipboard):
+        """Массовое добавление альтернатив или критериев: одно имя в строке (первый столбец)"""
+        try:
+            if from_clipboard:
+                names = self.backend.parse_item_names(QApplication.clipboard().text())
+            else:
+                file_path, _ = QFileDialog.getOpenFileName(
+                    self, "Импорт элементов", "", "Таблицы (*.csv *.xlsx);;CSV (*.csv);;Excel (*.xlsx)")
+                if not file_path:
+                    return
+                names = self.backend.read_item_names(file_path)
 
-                frame.layout().addWidget(label)
-                frame.layout().addWidget(btn)
-                frame.layout().addStretch()
+            if item_type == 'alternatives':
+                added = self.backend.add_alternatives(names)
+                self.alt_model.append_items(added)
+            else:
+                added = self.backend.add_criteria(names)
+                self.crit_model.append_items(added)
+                if added:
+                    self._update_criteria_listbox()
 
-                self.alt_list_layout.addWidget(frame)
+            skipped = len(names) - len(added)
+            message = f"Добавлено элементов: {len(added)}"
+            if skipped:
+                message += f"\nПропущено (пустые или повторяющиеся): {skipped}"
+            QMessageBox.information(self, "Импорт", message)
         except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Ошибка обновления списка альтернатив: {str(e)}")
+            QMessageBox.critical(self, "Ошибка", f"Ошибка импорта: {str(e)}")
 
-    def _update_crit_list(self):
-        """Обновление списка критериев"""
+    def _import_attribute_table(self):
+        """Построение матриц сравнения альтернатив по числовым показателям из файла"""
         try:
-            if not hasattr(self, 'crit_list_layout') or not hasattr(self, 'backend'):
+            file_path, _ = QFileDialog.getOpenFileName(
+                self, "Таблица показателей", "", "Таблицы (*.csv *.xlsx);;CSV (*.csv);;Excel (*.xlsx)")
+            if not file_path:
+                return
+            alternatives, attributes, values = self.backend.read_attribute_table(file_path)
+            if not alternatives or not attributes:
+                QMessageBox.warning(self, "Ошибка", "В таблице не найдены альтернативы или показатели")
                 return
 
-            self._clear_layout(self.crit_list_layout)
+            dialog = QDialog(self)
+            dialog.setWindowTitle("Матрицы из таблицы показателей")
+            layout = QVBoxLayout(dialog)
+            layout.addWidget(QLabel(f"Альтернатив: {len(alternatives)}, показателей: {len(attributes)}"))
+
+            mode_combo = QComboBox()
+            mode_combo.addItem("Отношение значений (a/b)", 'ratio')
+            mode_combo.addItem("Отношение значений, округленное до шкалы Саати", 'ratio_saaty')
+            mode_combo.addItem("Шкала Саати по разности значений", 'saaty')
+            layout.addWidget(QLabel("Способ перевода значений в суждения:"))
+            layout.addWidget(mode_combo)
+
+            layout.addWidget(QLabel("Отметьте показатели, для которых меньше - лучше:"))
+            cost_model = CheckListModel(attributes)
+            cost_view = QListView()
+            cost_view.setModel(cost_model)
+            cost_view.setUniformItemSizes(True)
+            layout.addWidget(cost_view)
+
+            buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+            buttons.accepted.connect(dialog.accept)
+            buttons.rejected.connect(dialog.reject)
+            layout.addWidget(buttons)
+            if dialog.exec_() != QDialog.Accepted:
+                return
 
-            for i, crit in enumerate(getattr(self.backend, 'criteria', [])):
-                frame = QWidget()
-                frame.setLayout(QHBoxLayout())
+            errors = self.backend.apply_attribute_table(
+                alternatives, attributes, values, cost_attributes=cost_model.checked_items(),
+                mode=mode_combo.currentData())
+            self._update_alt_list()
+            self._update_crit_list()
+            self._update_criteria_listbox()
+            if self.matrix_sizes:
+                self._setup_comparison_tab()
 
-                label = QLabel(crit)
-                btn = QPushButton("Удалить")
-                btn.clicked.connect(lambda _, idx=i: self._remove_item('criteria', idx))
+            message = f"Построено матриц: {len(attributes) - len(errors)}"
+            if errors:
+                message += "\nНе построены:\n" + "\n".join(
+                    f"{name}: {error}" for name, error in list(errors.items())[:20])
+            QMessageBox.information(self, "Таблица показателей", message)
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка", f"Ошибка чтения таблицы показателей: {str(e)}")
 
-                frame.layout().addWidget(label)
-                frame.layout().addWidget(btn)
-                frame.layout().addStretch()
+    def _import_survey(self):
+        """Групповые матрицы по файлу ответов экспертов (читается порциями)"""
+        try:
+            file_path, _ = QFileDialog.getOpenFileName(
+                self, "Ответы экспертов", "", "Ответы (*.csv *.jsonl *.ndjson *.json);;CSV (*.csv);;"
+                                            "JSON Lines (*.jsonl *.ndjson *.json)")
+            if not file_path:
+                return
+            if self.backend.survey_aggregates:
+                answer = QMessageBox.question(self, "Ответы экспертов",
+                                              "Добавить ответы к загруженным ранее? "
+                                              "«Нет» - начать накопление заново.",
+                                              QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel)
+                if answer == QMessageBox.Cancel:
+                    return
+                if answer == QMessageBox.No:
+                    self.backend.clear_survey()
+
+            size = max(os.path.getsize(file_path), 1)
+            progress = QProgressDialog("Чтение ответов экспертов...", "Прервать", 0, 1000, self)
+            progress.setWindowModality(Qt.WindowModal)
+            progress.setMinimumDuration(500)
+
+            def report(position):
+                progress.setValue(int(1000 * position / size))
+                QApplication.processEvents()
+                return not progress.wasCanceled()
+
+            try:
+                stats = self.backend.import_survey(file_path, progress=report)
+            finally:
+                progress.close()
+            conflicts = self.backend.survey_conflicts()
+            if conflicts:
+                answer = QMessageBox.question(self, "Ответы экспертов",
+                                              f"Групповые значения заменят введенные суждения: {conflicts}.\n"
+                                              "Остальные суждения не изменятся. Заменить?",
+                                              QMessageBox.Yes | QMessageBox.No)
+            applied = self.backend.apply_survey_judgments() if not conflicts or answer == QMessageBox.Yes else {}
+            if self.matrix_sizes:
+                self._setup_comparison_tab()
+
+            message = (f"Прочитано строк: {stats['rows']}, принято: {stats['accepted']}, "
+                       f"отклонено: {stats['rejected']}\n"
+                       f"Экспертов: {len(self.backend.survey_experts)}, "
+                       f"обновлено матриц: {len(applied)}")
+            if stats['cancelled']:
+                message += "\nЧтение прервано: учтена только прочитанная часть файла"
+            QMessageBox.information(self, "Ответы экспертов", message)
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка", f"Ошибка чтения ответов экспертов: {str(e)}")
+
+    def _update_scenario_combo(self):
+        """Список сценариев с текущим выбранным"""
+        self.scenario_combo.clear()
+        self.scenario_combo.addItems(list(self.backend.scenarios))
+        if self.backend.active_scenario is not None:
+            self.scenario_combo.setCurrentText(self.backend.active_scenario)
+        else:
+            self.scenario_combo.setCurrentIndex(-1)
 
-                self.crit_list_layout.addWidget(frame)
+    def _save_scenario(self):
+        """Сохранение текущих суждений как именованного сценария"""
+        try:
+            name, accepted = QInputDialog.getText(self, "Сохранение сценария", "Название сценария:",
+                                                  text=self.backend.active_scenario or "")
+            if not accepted or not name.strip():
+                return
+            if name.strip() in self.backend.scenarios and name.strip() != self.backend.active_scenario:
+                answer = QMessageBox.question(self, "Сохранение сценария",
+                                              f"Сценарий «{name.strip()}» уже есть. Перезаписать?",
+                                              QMessageBox.Yes | QMessageBox.No)
+                if answer != QMessageBox.Yes:
+                    return
+            self.backend.save_scenario(name)
+            self._update_scenario_combo()
         except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Ошибка обновления списка критериев: {str(e)}")
+            QMessageBox.critical(self, "Ошибка", f"Ошибка сохранения сценария: {str(e)}")
 
-    def _update_type_list(self):
-        """Обновление списка видов критериев"""
+    def _load_scenario(self, index):
+        """Загрузка суждений выбранного сценария в матрицы"""
         try:
-            if not hasattr(self, 'type_list_layout') or not hasattr(self, 'backend'):
+            name = self.scenario_combo.itemText(index)
+            if name == self.backend.active_scenario and not self.backend.scenario_modified():
                 return
+            if self.backend.scenario_modified():
+                answer = QMessageBox.question(self, "Загрузка сценария",
+                                              "Текущие суждения не сохранены в сценарий и будут заменены. Продолжить?",
+                                              QMessageBox.Yes | QMessageBox.No)
+                if answer != QMessageBox.Yes:
+                    self._update_scenario_combo()
+                    return
+            self.backend.load_scenario(name)
+            self._update_scenario_combo()
+            if self.matrix_sizes:
+                self._setup_comparison_tab()
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка", f"Ошибка загрузки сценария: {str(e)}")
+
+    def _delete_scenario(self):
+        name = self.scenario_combo.currentText()
+        if name and self.backend.delete_scenario(name):
+            self._update_scenario_combo()
 
-            self._clear_layout(self.type_list_layout)
+    def _compare_scenarios(self):
+        """Пакетный расчет выбранных сценариев и сравнение их ранжирований"""
+        try:
+            names = list(self.backend.scenarios)
+            if len(names) < 2:
+                QMessageBox.warning(self, "Сценарии", "Сохраните хотя бы два сценария")
+                return
 
-            for type_name, criteria in getattr(self.backend, 'criteria_types', {}).items():
-                frame = QWidget()
-                frame.setLayout(QHBoxLayout())
+            dialog = QDialog(self)
+            dialog.setWindowTitle("Сравнение сценариев")
+            layout = QVBoxLayout(dialog)
+            layout.addWidget(QLabel("Сценарии для сравнения:"))
+            picker = CheckListModel(names)
+            picker.set_checked(names)
+            picker_view = QListView()
+            picker_view.setModel(picker)
+            picker_view.setMaximumHeight(120)
+            layout.addWidget(picker_view)
+            buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+            buttons.accepted.connect(dialog.accept)
+            buttons.rejected.connect(dialog.reject)
+            layout.addWidget(buttons)
+            if dialog.exec_() != QDialog.Accepted:
+                return
+            selected = picker.checked_items()
+            if len(selected) < 2:
+                QMessageBox.warning(self, "Сценарии", "Отметьте хотя бы два сценария")
+                return
 
-                label = QLabel(f"{type_name}: {', '.join(criteria)}")
-                btn = QPushButton("Удалить")
-                btn.clicked.connect(lambda _, tn=type_name: self._remove_criterion_type(tn))
+            comparison = self.backend.calculate_scenarios(selected, self.selected_levels, self.synthesis_mode)
 
-                frame.layout().addWidget(label)
-                frame.layout().addWidget(btn)
-                frame.layout().addStretch()
+            dialog = QDialog(self)
+            dialog.setWindowTitle("Сравнение сценариев")
+            dialog.resize(900, 600)
+            layout = QVBoxLayout(dialog)
+            table = QTableView()
+            table.setModel(ScenarioComparisonModel(comparison, table))
+            table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+            layout.addWidget(table)
 
-                self.type_list_layout.addWidget(frame)
+            agreement = comparison['agreement']
+            lines = ["Согласованность ранжирований: расстояние Кендалла (0 - совпадают, 1 - обратны), "
+                     "ро Спирмена, доля общих альтернатив в первых трех местах:"]
+            for a in range(len(selected)):
+                for b in range(a + 1, len(selected)):
+                    values = [agreement[key][a, b] for key in ('kendall_distance', 'spearman_rho', 'top_k_overlap')]
+                    text = "—" if np.isnan(values).any() else "{:.3f}; {:.3f}; {:.0%}".format(*values)
+                    lines.append(f"{selected[a]} — {selected[b]}: {text}")
+            lines += [f"{name}: {'; '.join(messages[:3])}" for name, messages in comparison['errors'].items()]
+            summary = QLabel("\n".join(lines))
+            summary.setWordWrap(True)
+            layout.addWidget(summary)
+
+            close = QDialogButtonBox(QDialogButtonBox.Close)
+            close.rejected.connect(dialog.reject)
+            layout.addWidget(close)
+            dialog.exec_()
         except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Ошибка обновления списка видов критериев: {str(e)}")
+            QMessageBox.critical(self, "Ошибка", f"Ошибка сравнения сценариев: {str(e)}")
+
+    def _update_alt_list(self):
+        """Обновление списка альтернатив"""
+        if hasattr(self, 'alt_model'):
+            self.alt_model.set_items(self.backend.alternatives)
+
+    def _update_crit_list(self):
+        """Обновление списка критериев"""
+        if hasattr(self, 'crit_model'):
+            self.crit_model.set_items(self.backend.criteria)
+
+    def _update_type_list(self):
+        """Обновление списка видов критериев"""
+        if hasattr(self, 'type_model'):
+            self.type_model.set_items(self.backend.criteria_types.keys())
 
     def _filter_criteria_list(self):
         """Фильтрация списка критериев"""
         try:
-            if not hasattr(self, 'criteria_search') or not hasattr(self, 'type_criteria'):
+            if not hasattr(self, 'criteria_search') or not hasattr(self, 'criteria_proxy'):
                 return
 
-            search_text = self.criteria_search.text().lower()
-            for i in range(self.type_criteria.count()):
-                item = self.type_criteria.item(i)
-                if item:
-                    item.setHidden(search_text not in item.text().lower())
+            self.search_timer.stop()
+            self.criteria_proxy.set_query(self.criteria_search.text())
         except Exception as e:
             print(f"Ошибка фильтрации списка критериев: {str(e)}")
 
     def _update_criteria_listbox(self):
-        """Обновление списка критериев с сохранением фильтра"""
+        """Обновление списка критериев с сохранением фильтра и отметок"""
         try:
-            if not hasattr(self, 'criteria_search') or not hasattr(self, 'type_criteria') or \
-                    not hasattr(self, 'backend'):
+            if not hasattr(self, 'criteria_picker_model') or not hasattr(self, 'backend'):
                 return
 
-            current_search = self.criteria_search.text()
-            self.type_criteria.clear()
-
-            for crit in getattr(self.backend, 'criteria', []):
-                self.type_criteria.addItem(crit)
-
-            if current_search:
-                self._filter_criteria_list()
+            self.criteria_picker_model.set_items(self.backend.criteria)
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Ошибка обновления списка критериев: {str(e)}")
 
-    def _remove_item(self, item_type, index):
-        """Удаление элемента (альтернативы или критерия)"""
-        try:
-            if not hasattr(self, 'backend'):
-                return
+    def _remove_selected_items(self, view, item_type):
+        """Удаление всех выделенных в списке элементов"""
+        rows = [index.row() for index in view.selectionModel().selectedRows()]
+        if rows:
+            self._remove_items(item_type, rows)
 
+    def _remove_items(self, item_type, rows):
+        """Удаление элементов иерархии по номерам строк"""
+        try:
             if item_type == 'alternatives':
-                if 0 <= index < len(getattr(self.backend, 'alternatives', [])):
-                    del self.backend.alternatives[index]
-                    self._update_alt_list()
+                self.backend.remove_alternatives(rows)
+                self._update_alt_list()
             elif item_type == 'criteria':
-                if 0 <= index < len(getattr(self.backend, 'criteria', [])):
-                    crit = self.backend.criteria[index]
-
-                    # Удаление из типов критериев
-                    for type_name in list(getattr(self.backend, 'criteria_types', {}).keys()):
-                        if crit in self.backend.criteria_types[type_name]:
-                            self.backend.criteria_types[type_name].remove(crit)
-                            if not self.backend.criteria_types[type_name]:
-                                del self.backend.criteria_types[type_name]
-
-                    del self.backend.criteria[index]
-                    self._update_crit_list()
-                    self._update_type_list()
-                    self._update_criteria_listbox()
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Ошибка удаления элемента: {str(e)}")
-
-    def _remove_criterion_type(self, type_name):
-        """Удаление вида критериев"""
-        try:
-            if hasattr(self.backend, 'criteria_types') and type_name in self.backend.criteria_types:
-                del self.backend.criteria_types[type_name]
+                self.backend.remove_criteria(rows)
+                self._update_crit_list()
+                self._update_type_list()
+                self._update_criteria_listbox()
+            elif item_type == 'criteria_types':
+                self.backend.remove_criterion_types([self.type_model.items[row] for row in rows])
                 self._update_type_list()
         except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Ошибка удаления вида критериев: {str(e)}")
+            QMessageBox.critical(self, "Ошибка", f"Ошибка удаления элемента: {str(e)}")
 
     def _generate_matrices(self):
         """Генерация матриц сравнения с учетом выбранных уровней"""
@@ -1000,36 +1940,68 @@ class AHPFrontend(QMainWindow):
             QMessageBox.critical(self, "Ошибка", "Добавьте хотя бы один вид критериев")
             return
 
+        if self.selected_levels >= 2 and not self.backend.rating_mode:
+            self._propose_removing_dominated()
+
         # Активация вкладки сравнений
         self.tabs.setTabEnabled(1, True)
         self.tabs.setCurrentIndex(1)
         self._setup_comparison_tab()
 
+    def _propose_removing_dominated(self):
+        """Предложение убрать доминируемые альтернативы до попарных сравнений
+
+        Работает, когда по каждому критерию уже есть предварительные оценки
+        (таблица показателей или оценки по шкалам).
+        """
+        try:
+            scores, missing = self.backend.quick_scores()
+            if missing or len(self.backend.alternatives) < 2:
+                return
+            dominator = self.backend.find_dominated(scores)
+            alternatives = self.backend.alternatives
+            rows = [k for k in np.flatnonzero(dominator >= 0) if alternatives[k] not in self.kept_dominated]
+            if not rows:
+                return
+
+            details = "\n".join(f"{alternatives[k]} (уступает «{alternatives[dominator[k]]}»)" for k in rows[:15])
+            if len(rows) > 15:
+                details += f"\n... и еще {len(rows) - 15}"
+            n = len(alternatives)
+            left = n - len(rows)
+            answer = QMessageBox.question(
+                self, "Доминируемые альтернативы",
+                f"По предварительным оценкам {len(rows)} из {n} альтернатив не лучше другой "
+                f"ни по одному критерию:\n{details}\n\n"
+                f"Удалить их? Сравнений в каждой матрице альтернатив станет "
+                f"{left * (left - 1) // 2} вместо {n * (n - 1) // 2}.",
+                QMessageBox.Yes | QMessageBox.No)
+            if answer == QMessageBox.Yes:
+                self.backend.remove_alternatives(rows)
+                self._update_alt_list()
+            else:
+                self.kept_dominated.update(alternatives[k] for k in rows)
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка", f"Ошибка отбора доминируемых альтернатив: {str(e)}")
+
     def _setup_comparison_tab(self):
         """Настройка вкладки с матрицами сравнения с учетом уровней и количества матриц"""
         self._clear_layout(self.scroll_layout)
+        self.matrix_entries = {}
+        self.matrix_sizes = {}
+        self.matrix_frames = {}
+        self.matrix_progress_labels = {}
+        self.matrix_suggestion_buttons = {}
+        self.matrix_suggestions = {}
 
         main_frame = QFrame()
         main_layout = QVBoxLayout(main_frame)
         main_layout.setAlignment(Qt.AlignTop)  # Выравнивание по верхнему краю
 
-        # Получаем количество матриц из backend
-        results = self.backend.calculate_ahp(self.selected_levels)
-        matrix_count = results.get('matrix_count', 1)
-
-        # Стиль для заголовков
-        title_style = """
-            QLabel {
-                font-weight: bold; 
-                font-size: 12pt;
-                margin-bottom: 10px;
-            }
-        """
-
         # Матрица сравнения альтернатив (для 1 уровня)
         if self.selected_levels == 1:
             title = QLabel("Матрица сравнения альтернатив")
-            title.setStyleSheet(title_style)
+            title.setProperty("role", "sectionTitle")
             main_layout.addWidget(title, alignment=Qt.AlignTop)  # Выравнивание по верхнему краю
 
             self._create_matrix_ui(self.backend.alternatives, 'alternatives', main_layout)
@@ -1038,32 +2010,19 @@ class AHPFrontend(QMainWindow):
         elif self.selected_levels == 2:
             # Матрица критериев
             title1 = QLabel("Матрица сравнения критериев")
-            title1.setStyleSheet(title_style)
+            title1.setProperty("role", "sectionTitle")
             main_layout.addWidget(title1, alignment=Qt.AlignTop)
 
             self._create_matrix_ui(self.backend.criteria, 'criteria', main_layout)
 
             # Матрицы альтернатив по каждому критерию
-            title2 = QLabel("Матрицы сравнения альтернатив по критериям")
-            title2.setStyleSheet(title_style)
-            main_layout.addWidget(title2, alignment=Qt.AlignTop)
-
-            for criterion in self.backend.criteria:
-                subtitle = QLabel(f"Критерий: {criterion}")
-                subtitle.setStyleSheet("font-weight: bold; margin-top: 15px;")
-                main_layout.addWidget(subtitle, alignment=Qt.AlignTop)
-
-                self._create_matrix_ui(
-                    self.backend.alternatives,
-                    f'alternatives_{criterion}',
-                    main_layout
-                )
+            self._create_alternatives_ui(main_layout)
 
         # Матрицы сравнения типов критериев, критериев и альтернатив (для 3 уровней)
         elif self.selected_levels >= 3:
             # Матрица типов критериев
             title1 = QLabel("Матрица сравнения видов критериев")
-            title1.setStyleSheet(title_style)
+            title1.setProperty("role", "sectionTitle")
             main_layout.addWidget(title1, alignment=Qt.AlignTop)
 
             type_names = list(self.backend.criteria_types.keys())
@@ -1071,85 +2030,53 @@ class AHPFrontend(QMainWindow):
 
             # Матрицы критериев по типам
             title2 = QLabel("Матрицы сравнения критериев по видам")
-            title2.setStyleSheet(title_style)
+            title2.setProperty("role", "sectionTitle")
             main_layout.addWidget(title2, alignment=Qt.AlignTop)
 
             for type_name in self.backend.criteria_types:
                 subtitle = QLabel(f"Вид критериев: {type_name}")
-                subtitle.setStyleSheet("font-weight: bold; margin-top: 15px;")
+                subtitle.setProperty("role", "subtitle")
                 main_layout.addWidget(subtitle, alignment=Qt.AlignTop)
 
                 criteria = self.backend.criteria_types[type_name]
                 self._create_matrix_ui(criteria, f'criteria_{type_name}', main_layout)
 
             # Матрицы альтернатив по критериям
-            title3 = QLabel("Матрицы сравнения альтернатив по критериям")
-            title3.setStyleSheet(title_style)
-            main_layout.addWidget(title3, alignment=Qt.AlignTop)
-
-            for criterion in self.backend.criteria:
-                subtitle = QLabel(f"Критерий: {criterion}")
-                subtitle.setStyleSheet("font-weight: bold; margin-top: 15px;")
-                main_layout.addWidget(subtitle, alignment=Qt.AlignTop)
-
-                self._create_matrix_ui(
-                    self.backend.alternatives,
-                    f'alternatives_{criterion}',
-                    main_layout
-                )
+            self._create_alternatives_ui(main_layout)
 
         # Кнопка расчета (всегда внизу)
         calc_btn = QPushButton("Рассчитать приоритеты →")
-        calc_btn.setStyleSheet("""
-            QPushButton {
-                font-weight: bold;
-                padding: 10px;
-                margin-top: 20px;
-                min-width: 200px;
-                background-color: #4CAF50;
-                color: white;
-                border: none;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-        """)
+        calc_btn.setProperty("role", "primary")
         calc_btn.clicked.connect(self._calculate_priorities)
 
+        synthesis_combo = QComboBox()
+        for mode, title in self.backend.SYNTHESIS_MODES.items():
+            synthesis_combo.addItem(title, mode)
+        synthesis_combo.setCurrentIndex(synthesis_combo.findData(self.synthesis_mode))
+        synthesis_combo.setToolTip("Распределительный: вес критерия делится между альтернативами,\n"
+                                   "добавление альтернативы может изменить порядок остальных.\n"
+                                   "Идеальный: лучшая по критерию альтернатива получает его полный вес,\n"
+                                   "и ее оценка не уменьшается от появления новых альтернатив.")
+        synthesis_combo.currentIndexChanged.connect(
+            lambda: setattr(self, 'synthesis_mode', synthesis_combo.currentData()))
+
         btn_container = QWidget()
         btn_layout = QHBoxLayout(btn_container)
         btn_layout.addStretch()
+        if self.selected_levels >= 2 and not self.backend.rating_mode:
+            btn_layout.addWidget(QLabel("Синтез:"))
+            btn_layout.addWidget(synthesis_combo)
         btn_layout.addWidget(calc_btn)
         btn_layout.addStretch()
 
         main_layout.addWidget(btn_container)
         self.scroll_layout.addWidget(main_frame)
+        self._update_fill_progress()
 
     def _setup_results_controls(self):
         """Настройка элементов управления для результатов"""
         self._clear_layout(self.res_controls_layout)
 
-        # Стиль для кнопок
-        button_style = """
-            QPushButton {
-                padding: 8px 12px;
-                border: 1px solid #ccc;
-                border-radius: 4px;
-                background: #f8f8f8;
-                margin-right: 5px;
-                min-width: 80px;
-            }
-            QPushButton:hover {
-                background: #e8e8e8;
-            }
-            QPushButton:checked {
-                background: #4CAF50;
-                color: white;
-                border-color: #3e8e41;
-                font-weight: bold;
-            }
-        """
-
         # Группа кнопок отображения
         self.view_buttons = {}
         formats = [("График", "chart"), ("Таблица", "table"), ("Диаграмма", "diagram")]
@@ -1158,34 +2085,46 @@ class AHPFrontend(QMainWindow):
             btn = QPushButton(text)
             btn.setCheckable(True)
             btn.setChecked(self.result_display_mode == mode)
-            btn.setStyleSheet(button_style)
+            btn.setProperty("role", "viewToggle")
             btn.clicked.connect(lambda _, m=mode: self._set_result_display_mode(m))
             self.res_controls_layout.addWidget(btn)
             self.view_buttons[mode] = btn
 
+        # Режим столбчатых диаграмм для больших наборов элементов
+        self.chart_mode_combo = QComboBox()
+        chart_modes = [(f"Первые {self.CHART_TOP_N} + прочие", "top"),
+                       ("Все элементы", "all"),
+                       ("Прокрутка (горизонтально)", "scroll")]
+        for text, mode in chart_modes:
+            self.chart_mode_combo.addItem(text, mode)
+        self.chart_mode_combo.setCurrentIndex(self.chart_mode_combo.findData(self.chart_mode))
+        self.chart_mode_combo.currentIndexChanged.connect(self._set_chart_mode)
+        self.res_controls_layout.addWidget(self.chart_mode_combo)
+
+        self.decimate_labels_check = QCheckBox("Прореживать подписи")
+        self.decimate_labels_check.setChecked(self.decimate_chart_labels)
+        self.decimate_labels_check.toggled.connect(self._toggle_chart_label_decimation)
+        self.res_controls_layout.addWidget(self.decimate_labels_check)
+
         # Кнопка переключения процентов/абсолютных значений
         self.percent_toggle = QPushButton()
         self._update_percent_toggle_text()
         self.percent_toggle.setCheckable(True)
         self.percent_toggle.setChecked(self.display_percent)
-        self.percent_toggle.setStyleSheet(button_style)
+        self.percent_toggle.setProperty("role", "viewToggle")
         self.percent_toggle.clicked.connect(self._toggle_percent_display)
         self.res_controls_layout.addWidget(self.percent_toggle)
 
+        # Отчет об устойчивости лидера к весам критериев
+        self.stability_btn = QPushButton("Устойчивость")
+        self.stability_btn.setEnabled(bool(self.backend.reweight_state))
+        self.stability_btn.clicked.connect(self._show_stability_report)
+        self.res_controls_layout.addWidget(self.stability_btn)
+
         # Кнопка экспорта результатов
         self.export_btn = QPushButton("Экспорт результатов")
-        self.export_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4CAF50;
-                color: white;
-                padding: 8px 12px;
-                border-radius: 4px;
-                min-width: 120px;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-        """)
+        self.export_btn.setProperty("role", "primary")
+        self.export_btn.setProperty("compact", True)
         self.export_btn.clicked.connect(self._export_results)
         self.res_controls_layout.addWidget(self.export_btn)
 
@@ -1331,6 +2270,10 @@ class AHPFrontend(QMainWindow):
                 adjusted_width = (max_length + 2) * 1.2
                 ws.column_dimensions[column].width = adjusted_width
 
+            report = self._stability_report()
+            if report is not None:
+                self._export_stability_to_excel(wb, report)
+
             wb.save(file_path)
 
         except Exception as e:
@@ -1419,17 +2362,123 @@ class AHPFrontend(QMainWindow):
                     row_cells[2].text = f"{value:.4f}"
                     row_cells[3].text = f"{value * 100:.2f}"
 
+            report = self._stability_report()
+            if report is not None:
+                self._export_stability_to_word(doc, report)
+
             doc.save(file_path)
 
         except Exception as e:
             raise Exception(f"Ошибка экспорта в Word: {str(e)}")
 
+    def _stability_report(self):
+        """Отчет об устойчивости для первых CHART_TOP_N альтернатив или None, если расчет устарел"""
+        if not self.backend.reweight_state or len(self.backend.criteria) < 2:
+            return None
+        try:
+            return self.backend.stability_report(self.CHART_TOP_N)
+        except ValueError:
+            return None
+
+    def _stability_rows(self, report):
+        """Строки таблицы диапазонов весов лидера"""
+        rivals = report['rival_names']
+        rows = []
+        for k, criterion in enumerate(report['criteria']):
+            lower_rival, upper_rival = report['lower_rival'][0, k], report['upper_rival'][0, k]
+            rows.append([criterion, float(report['weights'][k]), float(report['lower'][0, k]),
+                         float(report['upper'][0, k]),
+                         rivals[lower_rival] if lower_rival >= 0 else "—",
+                         rivals[upper_rival] if upper_rival >= 0 else "—"])
+        return rows
+
+    def _show_stability_report(self):
+        """Диаграмма «торнадо» и тепловая карта устойчивости мест в отдельном окне"""
+        try:
+            report = self._stability_report()
+            if report is None:
+                QMessageBox.warning(self, "Нет данных",
+                                    "Отчет строится по последнему расчету с двумя и более критериями")
+                return
+
+            dialog = QDialog(self)
+            dialog.setWindowTitle("Устойчивость результатов к весам критериев")
+            dialog.resize(1000, 700)
+            layout = QVBoxLayout(dialog)
+
+            tabs = QTabWidget()
+            figures = [self.backend.plot_tornado(report), self.backend.plot_rank_heatmap(report)]
+            for fig, name in zip(figures, ["Торнадо", "Устойчивость мест"]):
+                tabs.addTab(FigureCanvas(fig), name)
+            layout.addWidget(tabs)
+
+            narrowest = int(np.argmin(report['upper'][0] - report['lower'][0]))
+            summary = QLabel(
+                f"Лидер «{report['alternatives'][0]}» наиболее чувствителен к весу критерия "
+                f"«{report['criteria'][narrowest]}»: остается первым при весе от "
+                f"{report['lower'][0, narrowest]:.3f} до {report['upper'][0, narrowest]:.3f} "
+                f"(сейчас {report['weights'][narrowest]:.3f}).")
+            summary.setWordWrap(True)
+            layout.addWidget(summary)
+
+            buttons = QDialogButtonBox(QDialogButtonBox.Close)
+            buttons.rejected.connect(dialog.reject)
+            layout.addWidget(buttons)
+
+            dialog.finished.connect(lambda _: [plt.close(fig) for fig in figures])
+            dialog.exec_()
+
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка", f"Ошибка построения отчета об устойчивости: {str(e)}")
+
+    def _export_stability_to_excel(self, wb, report):
+        """Лист с диапазонами весов лидера и запасами весов до смены мест"""
+        ws = wb.create_sheet("Устойчивость")
+        ws.append([f"Диапазоны весов, в которых «{report['alternatives'][0]}» остается лучшей"])
+        ws['A1'].font = Font(bold=True, size=14)
+        ws.append(self.STABILITY_HEADERS)
+        for row in self._stability_rows(report):
+            ws.append(row)
+            for col in range(2, 5):
+                ws.cell(row=ws.max_row, column=col).number_format = '0.0000'
+
+        ws.append([])
+        ws.append(["Запас веса до смены места альтернативы"])
+        ws.cell(row=ws.max_row, column=1).font = Font(bold=True)
+        ws.append(["Альтернатива"] + report['criteria'])
+        for name, margins in zip(report['alternatives'], report['margin']):
+            ws.append([name] + margins.tolist())
+            for col in range(2, len(report['criteria']) + 2):
+                ws.cell(row=ws.max_row, column=col).number_format = '0.0000'
+
+        ws.column_dimensions['A'].width = max(len(str(name)) for name in report['alternatives'] + ["Альтернатива"]) + 4
+        for col in range(2, max(len(self.STABILITY_HEADERS), len(report['criteria']) + 1) + 1):
+            ws.column_dimensions[get_column_letter(col)].width = 20
+
+    def _export_stability_to_word(self, doc, report):
+        """Раздел отчета об устойчивости: таблица диапазонов и обе диаграммы"""
+        doc.add_paragraph()
+        doc.add_paragraph("Устойчивость результатов к весам критериев", style='Heading 2')
+
+        table = doc.add_table(rows=1, cols=len(self.STABILITY_HEADERS))
+        table.style = 'Table Grid'
+        for cell, header in zip(table.rows[0].cells, self.STABILITY_HEADERS):
+            cell.text = header
+        for row in self._stability_rows(report):
+            cells = table.add_row().cells
+            for cell, value in zip(cells, row):
+                cell.text = f"{value:.4f}" if isinstance(value, float) else str(value)
+
+        for fig in (self.backend.plot_tornado(report), self.backend.plot_rank_heatmap(report)):
+            image = io.BytesIO()
+            fig.savefig(image, format='png', dpi=120)
+            plt.close(fig)
+            image.seek(0)
+            doc.add_picture(image, width=Inches(6))
+
     def _export_to_json(self, file_path):
         """Экспорт результатов в JSON с обработкой numpy массивов"""
         try:
-            import json
-            import numpy as np
-
             # Функция для преобразования numpy типов в стандартные Python типы
             def convert_numpy(obj):
                 if isinstance(obj, np.ndarray):
@@ -1483,205 +2532,49 @@ class AHPFrontend(QMainWindow):
         except Exception as e:
             raise Exception(f"Ошибка экспорта в JSON: {str(e)}")
 
-    def _display_table_results(self):
-        """Отображение результатов в виде таблицы с исправлениями"""
-        try:
-            # Очищаем предыдущие результаты
-            self._clear_layout(self.res_display_layout)
-
-            if not hasattr(self, 'result_data') or not self.result_data:
-                QMessageBox.warning(self, "Нет данных", "Нет данных для отображения таблицы")
-                return
-
-            # Проверяем наличие необходимых данных
-            if 'priorities' not in self.result_data:
-                QMessageBox.warning(self, "Ошибка данных", "Отсутствуют данные о приоритетах")
-                return
-
-            # Создаем главный контейнер
-            container = QWidget()
-            layout = QVBoxLayout(container)
-
-            # Приоритеты типов критериев (для 3 уровней)
-            if self.selected_levels >= 3 and 'type_priority' in self.result_data['priorities']:
-                type_names = list(self.backend.criteria_types.keys())
-                if len(type_names) == len(self.result_data['priorities']['type_priority']):
-                    self._create_priority_table(
-                        container,
-                        type_names,
-                        self.result_data['priorities']['type_priority'],
-                        "Приоритеты видов критериев (Первый уровень)"
-                    )
-
-            # Приоритеты критериев (для 2 и 3 уровней)
-            if self.selected_levels >= 2 and 'criteria_priority' in self.result_data['priorities']:
-                if len(self.backend.criteria) == len(self.result_data['priorities']['criteria_priority']):
-                    title = "Приоритеты критериев" + (" (Второй уровень)" if self.selected_levels >= 3 else "")
-                    self._create_priority_table(
-                        container,
-                        self.backend.criteria,
-                        self.result_data['priorities']['criteria_priority'],
-                        title
-                    )
-
-            # Приоритеты альтернатив
-            if ('alternatives_priority' in self.result_data['priorities'] and
-                    len(self.backend.alternatives) == len(self.result_data['priorities']['alternatives_priority'])):
-                self._create_priority_table(
-                    container,
-                    self.backend.alternatives,
-                    self.result_data['priorities']['alternatives_priority'],
-                    "Итоговые приоритеты альтернатив",
-                    show_percent=True
-                )
-
-            # Если таблицы не были созданы
-            if layout.count() == 0:
-                QMessageBox.information(self, "Информация", "Нет данных для отображения таблицы")
-            else:
-                # Добавляем контейнер с таблицами в основной layout
-                scroll = QScrollArea()
-                scroll.setWidgetResizable(True)
-                scroll.setWidget(container)
-                self.res_display_layout.addWidget(scroll)
-
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Ошибка при отображении таблицы: {str(e)}")
-
-    def _create_priority_table(self, parent_layout, labels, values, title, show_percent=False):
-        """Создает таблицу с приоритетами с исправленной обработкой значений"""
+    def _create_priority_table(self, parent, labels, values, title, show_percent=False, bounds=None):
+        """Создание таблицы с приоритетами на основе модели"""
         try:
-            # Преобразуем значения в numpy array и проверяем их
-            values = np.array(values, dtype=float)
-            if values.size == 0:
-                raise ValueError("Массив значений пуст")
-
-            group = QGroupBox(title)
-            layout = QVBoxLayout(group)
-
-            table = QTableWidget()
-            table.setColumnCount(4)
-            table.setHorizontalHeaderLabels(["№", "Элемент", "Значение", "Процент"])
-            table.verticalHeader().setVisible(False)
-            table.setEditTriggers(QTableWidget.NoEditTriggers)
-
-            table.setRowCount(len(labels))
-
-            # Находим максимальное значение безопасным способом
-            max_value = np.max(values) if values.size > 0 else 0
-
-            for row, (label, value) in enumerate(zip(labels, values)):
-                # Номер
-                item_num = QTableWidgetItem(str(row + 1))
-                item_num.setTextAlignment(Qt.AlignCenter)
-
-                # Название
-                item_label = QTableWidgetItem(label)
-                item_label.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-
-                # Значение
-                item_value = QTableWidgetItem(f"{value:.4f}")
-                item_value.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-
-                # Процент
-                percent = value * 100
-                item_percent = QTableWidgetItem(f"{percent:.2f}%")
-                item_percent.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-
-                # Подсветка максимального значения (с безопасным сравнением)
-                if not np.isnan(value) and np.allclose(value, max_value):
-                    for item in [item_num, item_label, item_value, item_percent]:
-                        item.setBackground(QColor(230, 255, 230))
-                        item.setForeground(QColor(0, 100, 0))
-                        font = item.font()
-                        font.setBold(True)
-                        item.setFont(font)
-
-                table.setItem(row, 0, item_num)
-                table.setItem(row, 1, item_label)
-                table.setItem(row, 2, item_value)
-                table.setItem(row, 3, item_percent)
-
-            table.resizeColumnsToContents()
-            table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
-            layout.addWidget(table)
-            parent_layout.addWidget(group)
-
-        except Exception as e:
-            error_msg = f"Ошибка создания таблицы: {str(e)}"
-            print(error_msg)  # Логируем ошибку
-            raise Exception(error_msg)
-
-    def _create_priority_table(self, parent, labels, values, title, show_percent=False):
-        """Создание таблицы с приоритетами"""
-        try:
-            # Преобразуем значения в numpy array
-            values = np.array(values, dtype=float)
+            bounds_title = "Интервал приоритета" if 'priority_bounds' in self.result_data else "Нечеткий вес (l – u)"
+            model = PriorityTableModel(labels, values, bounds=bounds, bounds_title=bounds_title)
 
             # Создаем группу для таблицы
             group = QGroupBox(title)
             layout = QVBoxLayout(group)
+            model.setParent(group)
+
+            # Фильтр по названию и ограничение числа строк
+            filter_layout = QHBoxLayout()
+            search = QLineEdit()
+            search.setPlaceholderText("Фильтр по названию...")
+            search.textChanged.connect(model.set_filter_text)
+            top_n = QSpinBox()
+            top_n.setRange(0, model.total_count())
+            top_n.setSpecialValueText("Все")
+            top_n.valueChanged.connect(model.set_top_n)
+            filter_layout.addWidget(search)
+            filter_layout.addWidget(QLabel("Показать первые:"))
+            filter_layout.addWidget(top_n)
+            layout.addLayout(filter_layout)
 
             # Создаем таблицу
-            table = QTableWidget()
-            table.setColumnCount(4)
-            table.setHorizontalHeaderLabels(
-                ["№", "Элемент", "Значение приоритета", "Процент"])
+            table = QTableView()
+            table.setModel(model)
             table.verticalHeader().setVisible(False)
-            table.setEditTriggers(QTableWidget.NoEditTriggers)
-            table.setSelectionMode(QTableWidget.SingleSelection)
-
-            # Устанавливаем количество строк
-            table.setRowCount(len(labels))
-
-            # Находим максимальное значение для подсветки
-            max_value = np.max(values) if values.size > 0 else 0
-
-            # Заполняем таблицу данными
-            for row, (label, value) in enumerate(zip(labels, values)):
-                # Номер
-                item_num = QTableWidgetItem(str(row + 1))
-                item_num.setTextAlignment(Qt.AlignCenter)
-
-                # Название элемента
-                item_label = QTableWidgetItem(label)
-                item_label.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-
-                # Значение приоритета
-                item_value = QTableWidgetItem(f"{value:.4f}")
-                item_value.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-
-                # Процентное значение
-                percent_value = value * 100
-                item_percent = QTableWidgetItem(f"{percent_value:.2f}%")
-                item_percent.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-
-                # Подсветка максимального значения
-                if not np.isnan(value) and np.allclose(value, max_value):
-                    for item in [item_num, item_label, item_value, item_percent]:
-                        item.setBackground(QColor(230, 255, 230))
-                        item.setForeground(QColor(0, 100, 0))
-                        font = item.font()
-                        font.setBold(True)
-                        item.setFont(font)
-
-                # Добавляем ячейки в таблицу
-                table.setItem(row, 0, item_num)
-                table.setItem(row, 1, item_label)
-                table.setItem(row, 2, item_value)
-                table.setItem(row, 3, item_percent)
-
-            # Настраиваем размеры столбцов
-            table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
-            table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
-            table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeToContents)
-            table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeToContents)
+            table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+            table.setSelectionMode(QAbstractItemView.SingleSelection)
+            table.horizontalHeader().setSortIndicator(0, Qt.AscendingOrder)
+            table.setSortingEnabled(True)
+
+            # Размеры столбцов и строк не зависят от количества строк
+            self._fit_priority_table(table)
 
             # Устанавливаем минимальную высоту таблицы
             table.setMinimumHeight(min(300, len(labels) * 30 + 50))
 
             # Добавляем таблицу в группу
             layout.addWidget(table)
+            self.result_tables.append(table)
 
             # Добавляем группу в родительский layout
             parent.layout().addWidget(group)
@@ -1689,20 +2582,103 @@ class AHPFrontend(QMainWindow):
         except Exception as e:
             raise Exception(f"Ошибка создания таблицы приоритетов: {str(e)}")
 
+    def _fit_priority_table(self, table):
+        """Подгоняет размеры таблицы по метрикам шрифта, не обходя строки"""
+        metrics = table.fontMetrics()
+        table.verticalHeader().setDefaultSectionSize(int(metrics.height() * 1.6))
+
+        header = table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Interactive)
+        header.setSectionResizeMode(1, QHeaderView.Stretch)
+        samples = {0: "№ 000000", 2: "Значение приоритета", 3: "Процент 100.00%"}
+        for column, sample in samples.items():
+            header.resizeSection(column, metrics.width(sample) + 24)
+
     def _toggle_percent_display(self):
         """Переключение между процентами и абсолютными значениями"""
         try:
             self.display_percent = not self.display_percent
             if hasattr(self, 'percent_toggle'):
                 self.percent_toggle.setChecked(self.display_percent)
-                self.percent_toggle.setText(
-                    "Показать в процентах" if not self.display_percent
-                    else "Показать абсолютные значения"
-                )
-            self._display_results()
+                self._update_percent_toggle_text()
+            self._refresh_result_values()
         except Exception as e:
             QMessageBox.warning(self, "Ошибка", f"Ошибка переключения режима: {str(e)}")
 
+    def _create_alternatives_ui(self, main_layout):
+        """Сравнение альтернатив по критериям: матрицы или, в режиме оценок, шкалы и таблица оценок"""
+        if not self.backend.rating_mode:
+            title = QLabel("Матрицы сравнения альтернатив по критериям")
+            title.setProperty("role", "sectionTitle")
+            main_layout.addWidget(title, alignment=Qt.AlignTop)
+
+            for criterion in self.backend.criteria:
+                subtitle = QLabel(f"Критерий: {criterion}")
+                subtitle.setProperty("role", "subtitle")
+                main_layout.addWidget(subtitle, alignment=Qt.AlignTop)
+
+                self._create_matrix_ui(
+                    self.backend.alternatives,
+                    f'alternatives_{criterion}',
+                    main_layout
+                )
+            return
+
+        title = QLabel("Шкалы оценок критериев")
+        title.setProperty("role", "sectionTitle")
+        main_layout.addWidget(title, alignment=Qt.AlignTop)
+
+        for criterion in self.backend.criteria:
+            subtitle = QLabel(f"Критерий: {criterion}")
+            subtitle.setProperty("role", "subtitle")
+            main_layout.addWidget(subtitle, alignment=Qt.AlignTop)
+
+            scale_layout = QHBoxLayout()
+            scale_layout.addWidget(QLabel("Градации (от лучшей к худшей, через ;):"))
+            scale_entry = QLineEdit("; ".join(self.backend.rating_scale(criterion)))
+            scale_layout.addWidget(scale_entry)
+            scale_btn = QPushButton("Изменить шкалу")
+            scale_btn.clicked.connect(lambda _, c=criterion, e=scale_entry: self._set_rating_scale(c, e.text()))
+            scale_layout.addWidget(scale_btn)
+            main_layout.addLayout(scale_layout)
+
+            self._create_matrix_ui(self.backend.rating_scale(criterion), f'ratings_{criterion}', main_layout)
+
+        title = QLabel("Оценки альтернатив")
+        title.setProperty("role", "sectionTitle")
+        main_layout.addWidget(title, alignment=Qt.AlignTop)
+
+        self.rating_model = RatingTableModel(self.backend)
+        self.rating_model.dataChanged.connect(lambda *_: self._update_fill_progress())
+        table = QTableView()
+        table.setModel(self.rating_model)
+        table.setItemDelegate(RatingDelegate(table))
+        table.setEditTriggers(QAbstractItemView.AllEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table.verticalHeader().setDefaultSectionSize(table.fontMetrics().height() + 10)
+        table.setMinimumHeight(400)
+        main_layout.addWidget(table)
+
+    def _toggle_rating_mode(self, checked):
+        """Переключение между попарным сравнением альтернатив и режимом оценок"""
+        self.backend.rating_mode = checked
+        if self.tabs.isTabEnabled(1) and self.matrix_sizes:
+            self._setup_comparison_tab()
+
+    def _toggle_cluster_mode(self, checked):
+        """Переключение между одной матрицей альтернатив и сравнением по группам"""
+        self.backend.cluster_mode = checked
+        if self.tabs.isTabEnabled(1) and self.matrix_sizes:
+            self._setup_comparison_tab()
+
+    def _set_rating_scale(self, criterion, text):
+        """Изменение градаций шкалы критерия; введенные суждения и оценки сохраняются по названиям"""
+        levels = [level.strip() for level in text.split(';')]
+        if not self.backend.set_rating_scale(criterion, levels):
+            QMessageBox.warning(self, "Ошибка", "Укажите хотя бы одну градацию шкалы")
+            return
+        self._setup_comparison_tab()
+
     def _create_matrix_ui(self, items, matrix_key, parent_layout):
         """Создание интерфейса матрицы сравнения с улучшенным стилем"""
         try:
@@ -1711,14 +2687,7 @@ class AHPFrontend(QMainWindow):
 
             frame = QFrame()
             frame.setFrameShape(QFrame.StyledPanel)
-            frame.setStyleSheet("""
-                QFrame {
-                    background-color: %s;
-                    border-radius: 5px;
-                    padding: 10px;
-                    margin-bottom: 15px;
-                }
-            """ % ("#353535" if self.dark_mode else "#f9f9f9"))
+            frame.setObjectName("matrixFrame")
 
             layout = QVBoxLayout(frame)
             layout.setContentsMargins(10, 10, 10, 10)
@@ -1731,110 +2700,103 @@ class AHPFrontend(QMainWindow):
                 "5 — существенное превосходство; 7 — значительное превосходство;\n"
                 "9 — абсолютное превосходство; 2,4,6,8 — промежуточные значения"
             )
-            saaty_tip.setStyleSheet("""
-                QLabel {
-                    background-color: %s;
-                    border: 1px solid %s;
-                    padding: 8px;
-                    border-radius: 4px;
-                    font-size: %dpt;
-                    margin-bottom: 10px;
-                    color: %s;
-                }
-            """ % (
-                "#444" if self.dark_mode else "#f0f0f0",
-                "#555" if self.dark_mode else "#ddd",
-                int(10 * self.current_scale),
-                "white" if self.dark_mode else "black"
-            ))
+            saaty_tip.setObjectName("saatyTip")
             layout.addWidget(saaty_tip)
 
-            grid = QGridLayout()
-            grid.setSpacing(5)
-            grid.setContentsMargins(5, 5, 5, 5)
-
-            n = len(items)
-            cell_size = int((90 if n <= 5 else 70) * self.current_scale)
-
-            # Устанавливаем стили для ячеек и заголовков
-            header_style = self._get_matrix_header_style()
-            cell_style = self._get_dark_matrix_cell_style() if self.dark_mode else self._get_light_matrix_cell_style()
-
-            # Заголовки столбцов
-            for j in range(n):
-                label = QLabel(items[j] if j < len(items) else "")
-                label.setStyleSheet(header_style)
-                grid.addWidget(label, 0, j + 1)
-
-            # Заполнение матрицы
-            for i in range(n):
-                # Заголовок строки
-                row_label = QLabel(items[i] if i < len(items) else "")
-                row_label.setStyleSheet(header_style)
-                grid.addWidget(row_label, i + 1, 0)
-
-                for j in range(n):
-                    if i == j:
-                        label = QLabel("1")
-                        label.setStyleSheet(cell_style)
-                        grid.addWidget(label, i + 1, j + 1)
-                    elif i < j:
-                        entry = QLineEdit()
-                        entry.setStyleSheet(cell_style)
-                        validator = QRegExpValidator(QRegExp(r"^([1-9]|1/[1-9])$"))
-                        entry.setValidator(validator)
-                        entry.setToolTip("Введите значение по шкале Саати (1-9 или 1/1-1/9)")
-
-                        def make_lambda(key, row, col):
-                            return lambda: self._safe_update_reciprocal(key, row, col)
-
-                        entry.editingFinished.connect(make_lambda(matrix_key, i, j))
-                        grid.addWidget(entry, i + 1, j + 1)
-                        self.matrix_entries[(matrix_key, i, j)] = entry
-                    else:
-                        label = QLabel("")
-                        label.setStyleSheet(cell_style)
-                        grid.addWidget(label, i + 1, j + 1)
-                        self.matrix_entries[(matrix_key, i, j)] = label
+            progress_layout = QHBoxLayout()
+            progress_label = QLabel()
+            progress_layout.addWidget(progress_label)
+            progress_layout.addStretch()
+            accept_btn = QPushButton("Принять подсказки")
+            accept_btn.setToolTip("Заполнить пустые ячейки значениями, выведенными по транзитивности\n"
+                                  "из уже введенных суждений (показаны серым)")
+            accept_btn.clicked.connect(lambda: self._accept_suggestions(matrix_key))
+            progress_layout.addWidget(accept_btn)
+            layout.addLayout(progress_layout)
+            self.matrix_progress_labels[matrix_key] = progress_label
+            self.matrix_suggestion_buttons[matrix_key] = accept_btn
+
+            clusters = self.backend.matrix_clusters(matrix_key)
+            for number, (start, stop) in enumerate(clusters, 1):
+                if len(clusters) > 1:
+                    caption = f"Группа {number} из {len(clusters)}"
+                    if number > 1:
+                        caption += f" (опорная альтернатива: {items[start]})"
+                    layout.addWidget(QLabel(caption))
+                layout.addLayout(self._create_matrix_grid(items, matrix_key, start, stop))
 
-            layout.addLayout(grid)
             parent_layout.addWidget(frame)
+            self.matrix_sizes[matrix_key] = len(items)
+            self.matrix_frames[matrix_key] = frame
+            self._update_fill_progress(matrix_key)
+            self._update_suggestions(matrix_key)
 
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Ошибка создания матрицы: {str(e)}")
             raise
 
-    def _get_matrix_header_style(self):
-        """Возвращает стиль заголовков матрицы"""
-        cell_size = 90 if len(self.backend.alternatives) <= 5 else 70
-        if self.dark_mode:
-            return f"""
-                QLabel {{
-                    font-weight: bold;
-                    border: 1px solid #666;
-                    padding: 5px;
-                    background-color: #444;
-                    color: white;
-                    min-width: {cell_size}px;
-                    min-height: 30px;
-                    text-align: center;
-                    border-radius: 3px;
-                }}
-            """
-        else:
-            return f"""
-                QLabel {{
-                    font-weight: bold;
-                    border: 1px solid #999;
-                    padding: 5px;
-                    background-color: #e0e0e0;
-                    color: black;
-                    min-width: {cell_size}px;
-                    min-height: 30px;
-                    text-align: center;
-                    border-radius: 3px;
-                }}
-            """
+    def _create_matrix_grid(self, items, matrix_key, start, stop):
+        """Сетка ячеек для элементов items[start:stop]; ячейки адресуются номерами во всей матрице"""
+        grid = QGridLayout()
+        grid.setSpacing(5)
+        grid.setContentsMargins(5, 5, 5, 5)
+
+        # Узкие заголовки для матриц с большим числом альтернатив
+        compact = len(self.backend.alternatives) > 5
+
+        # Заголовки столбцов
+        for j in range(start, stop):
+            label = QLabel(items[j])
+            label.setObjectName("matrixHeader")
+            label.setProperty("compact", compact)
+            grid.addWidget(label, 0, j - start + 1)
+
+        # Заполнение матрицы
+        for i in range(start, stop):
+            # Заголовок строки
+            row_label = QLabel(items[i])
+            row_label.setObjectName("matrixHeader")
+            row_label.setProperty("compact", compact)
+            grid.addWidget(row_label, i - start + 1, 0)
+
+            for j in range(start, stop):
+                row, col = i - start + 1, j - start + 1
+                if i == j:
+                    label = QLabel("1")
+                    label.setObjectName("matrixCell")
+                    grid.addWidget(label, row, col)
+                elif i < j:
+                    entry = QLineEdit()
+                    entry.setObjectName("matrixCell")
+                    value = r"([1-9]|1/[1-9])"
+                    validator = QRegExpValidator(QRegExp(rf"^(~?{value}|{value}-{value})$"))
+                    entry.setValidator(validator)
+                    entry.setToolTip("Введите значение по шкале Саати (1-9 или 1/1-1/9),\n"
+                                     "~3 — нечеткое суждение «примерно 3», 3-5 — интервал «от 3 до 5».\n"
+                                     "Enter/Tab — следующая ячейка, Shift+Tab — предыдущая,\n"
+                                     "Ctrl+V — вставка блока значений из Excel")
+                    entry.matrix_cell = (matrix_key, i, j)
+                    entry.installEventFilter(self)
+
+                    def make_lambda(key, row, col):
+                        return lambda: self._safe_update_reciprocal(key, row, col)
+
+                    text = self.backend.judgment_text(matrix_key, i, j)
+                    entry.setText(text)
+                    if text and self.backend.parse_judgment(text) is None:
+                        # Отношение из таблицы показателей не записывается по шкале Саати
+                        entry.setReadOnly(True)
+                        entry.setToolTip("Отношение значений показателя из таблицы; чтобы вводить суждения\n"
+                                         "вручную, постройте матрицу с округлением до шкалы Саати")
+                    entry.editingFinished.connect(make_lambda(matrix_key, i, j))
+                    grid.addWidget(entry, row, col)
+                    self.matrix_entries[(matrix_key, i, j)] = entry
+                else:
+                    label = QLabel(self.backend.judgment_text(matrix_key, i, j))
+                    label.setObjectName("matrixCell")
+                    grid.addWidget(label, row, col)
+                    self.matrix_entries[(matrix_key, i, j)] = label
+        return grid
 
     def _clear_layout(self, layout):
         """Безопасная очистка layout"""
@@ -1863,23 +2825,232 @@ class AHPFrontend(QMainWindow):
             entry = self.matrix_entries.get((matrix_key, i, j))
             recip_entry = self.matrix_entries.get((matrix_key, j, i))
 
-            if not entry or not recip_entry:
+            if not entry or not recip_entry or entry.isReadOnly():
                 return
 
             value = entry.text().strip()
+            self.backend.set_judgment(matrix_key, i, j, value)
+            self._update_fill_progress(matrix_key)
+            self._update_suggestions(matrix_key)
             if not value:
+                if isinstance(recip_entry, QLabel):
+                    recip_entry.setText("")
                 return
 
-            if value.startswith("1/"):
-                recip_value = value[2:]
-            else:
-                recip_value = f"1/{value}" if value != "1" else "1"
-
             if isinstance(recip_entry, QLabel):
-                recip_entry.setText(recip_value)
+                recip_entry.setText(self._reciprocal_text(value))
         except Exception as e:
             print(f"Ошибка обновления обратного значения: {str(e)}")
 
+    @staticmethod
+    def _reciprocal_text(value):
+        """Обратное значение по шкале Саати в текстовой записи"""
+        if value.startswith("~"):
+            return "~" + AHPFrontend._reciprocal_text(value[1:])
+        if "-" in value:
+            low, high = value.split("-", 1)
+            return f"{AHPFrontend._reciprocal_text(high)}-{AHPFrontend._reciprocal_text(low)}"
+        if value.startswith("1/"):
+            return value[2:]
+        return f"1/{value}" if value != "1" else "1"
+
+    def eventFilter(self, obj, event):
+        """Клавиатурный ввод в ячейки матриц: переходы по Enter/Tab и вставка блоков"""
+        cell = getattr(obj, 'matrix_cell', None)
+        if cell is not None and event.type() == QEvent.KeyPress:
+            matrix_key, i, j = cell
+            if event.matches(QKeySequence.Paste):
+                text = QApplication.clipboard().text()
+                if '\t' in text or '\n' in text.strip():
+                    self._paste_matrix_block(matrix_key, i, j, text)
+                    return True
+            elif event.key() in (Qt.Key_Return, Qt.Key_Enter, Qt.Key_Tab, Qt.Key_Backtab):
+                step = -1 if event.key() == Qt.Key_Backtab or event.modifiers() & Qt.ShiftModifier else 1
+                if self.guided_mode and step > 0 and obj.text().strip():
+                    self._safe_update_reciprocal(matrix_key, i, j)
+                    self._guided_step(matrix_key)
+                    return True
+                target = self._adjacent_matrix_cell(matrix_key, i, j, step)
+                if target is not None:
+                    # editingFinished не придет, пока фокус не ушел, поэтому обновляем сразу
+                    self._safe_update_reciprocal(matrix_key, i, j)
+                    self._focus_matrix_cell(target)
+                    return True
+        return super().eventFilter(obj, event)
+
+    def _adjacent_matrix_cell(self, matrix_key, i, j, step):
+        """Следующая (step=1) или предыдущая (step=-1) ячейка над диагональю
+
+        Обход идет по строкам; после последней ячейки матрицы — переход
+        в следующую матрицу на вкладке.
+        """
+        keys = list(self.matrix_sizes)
+        if matrix_key not in self.matrix_sizes:
+            return None
+        k = keys.index(matrix_key)
+        n = self.matrix_sizes[matrix_key]
+
+        while True:
+            j += step
+            if step > 0 and j >= n:
+                i, j = i + 1, i + 2
+            elif step < 0 and j <= i:
+                i -= 1
+                j = n - 1
+            if not 0 <= i < j < n:
+                break
+            # При вводе по группам ячейки между группами пропускаются
+            if isinstance(self.matrix_entries.get((matrix_key, i, j)), QLineEdit):
+                return matrix_key, i, j
+
+        # Переход в соседнюю матрицу, пропуская матрицы без ячеек ввода
+        k += step
+        while 0 <= k < len(keys):
+            n = self.matrix_sizes[keys[k]]
+            if n > 1:
+                return (keys[k], 0, 1) if step > 0 else (keys[k], n - 2, n - 1)
+            k += step
+        return None
+
+    def _focus_matrix_cell(self, cell):
+        """Переводит фокус в ячейку матрицы и прокручивает к ней"""
+        entry = self.matrix_entries.get(cell)
+        if not isinstance(entry, QLineEdit):
+            return
+        entry.setFocus(Qt.TabFocusReason)
+        entry.selectAll()
+        if hasattr(self, 'comp_scroll'):
+            self.comp_scroll.ensureWidgetVisible(entry)
+
+    def _update_fill_progress(self, matrix_key=None):
+        """Обновление процента заполнения матрицы и общей сводки по вкладке"""
+        label = self.matrix_progress_labels.get(matrix_key)
+        if label is not None:
+            filled, total = self.backend.matrix_progress(matrix_key)
+            percent = 100 * filled // total if total else 100
+            label.setText(f"Заполнено: {filled} из {total} ({percent}%)")
+
+        if hasattr(self, 'fill_status_label'):
+            missing = self.backend.missing_judgments(self.selected_levels)
+            self.fill_status_label.setText(f"Осталось ввести суждений: {missing}" if missing
+                                           else "Все матрицы заполнены")
+
+    def _jump_to_next_missing(self):
+        """Переход к следующей незаполненной ячейке после текущей"""
+        current = getattr(QApplication.focusWidget(), 'matrix_cell', None)
+        cell = self.backend.next_missing_judgment(self.selected_levels, current)
+        if cell is None:
+            self.statusBar().showMessage("Все суждения введены", 3000)
+            return
+        self._focus_matrix_cell(cell)
+
+    def _paste_matrix_block(self, matrix_key, row, col, text):
+        """Вставка блока значений из буфера обмена в матрицу
+
+        Блок проверяется целиком: при любой ошибке ничего не вставляется.
+        """
+        n = self.matrix_sizes.get(matrix_key, 0)
+        comparisons, errors = self.backend.parse_comparison_block(text, n, row, col)
+
+        if errors:
+            shown = "\n".join(errors[:10])
+            if len(errors) > 10:
+                shown += f"\n... и еще {len(errors) - 10}"
+            QMessageBox.warning(self, "Ошибка вставки",
+                                "Значения не соответствуют шкале Саати (1-9 или 1/1-1/9):\n" + shown)
+            return
+        if not comparisons:
+            QMessageBox.warning(self, "Ошибка вставки", "В буфере обмена нет значений для ячеек над диагональю")
+            return
+
+        self._apply_matrix_values(matrix_key, comparisons)
+        self.statusBar().showMessage(f"Вставлено значений: {len(comparisons)}", 3000)
+
+    def _apply_matrix_values(self, matrix_key, comparisons):
+        """Запись набора значений {(i, j): "3"} в ячейки матрицы и в backend"""
+        # Все ячейки обновляются одним проходом без промежуточных перерисовок
+        frame = self.matrix_frames.get(matrix_key)
+        if frame is not None:
+            frame.setUpdatesEnabled(False)
+        try:
+            for (i, j), value in comparisons.items():
+                entry = self.matrix_entries.get((matrix_key, i, j))
+                recip_entry = self.matrix_entries.get((matrix_key, j, i))
+                if entry is None or entry.isReadOnly():
+                    continue
+                entry.blockSignals(True)
+                entry.setText(value)
+                entry.blockSignals(False)
+                self.backend.set_judgment(matrix_key, i, j, value)
+                if isinstance(recip_entry, QLabel):
+                    recip_entry.setText(self._reciprocal_text(value))
+        finally:
+            if frame is not None:
+                frame.setUpdatesEnabled(True)
+        self._update_fill_progress(matrix_key)
+        self._update_suggestions(matrix_key)
+
+    def _update_suggestions(self, matrix_key):
+        """Подсказки по транзитивности в пустых ячейках матрицы"""
+        suggestions = self.backend.suggest_missing_judgments(matrix_key)
+        previous = self.matrix_suggestions.get(matrix_key, {})
+        self.matrix_suggestions[matrix_key] = suggestions
+
+        # Обновляются только ячейки, у которых подсказка появилась, исчезла или изменилась
+        for cell in previous.keys() | suggestions.keys():
+            text = suggestions.get(cell, "")
+            if previous.get(cell, "") != text:
+                entry = self.matrix_entries.get((matrix_key, *cell))
+                if isinstance(entry, QLineEdit):
+                    entry.setPlaceholderText(text)
+
+        button = self.matrix_suggestion_buttons.get(matrix_key)
+        if button is not None:
+            button.setEnabled(bool(suggestions))
+            button.setText(f"Принять подсказки ({len(suggestions)})" if suggestions else "Принять подсказки")
+
+    def _accept_suggestions(self, matrix_key):
+        """Заполнение всех пустых ячеек матрицы подсказками"""
+        suggestions = self.matrix_suggestions.get(matrix_key)
+        if suggestions:
+            self._apply_matrix_values(matrix_key, suggestions)
+            self.statusBar().showMessage(f"Принято подсказок: {len(suggestions)}", 3000)
+
+    def _toggle_guided_mode(self, checked):
+        """Включение пошагового ввода: фокус переходит к первой предложенной паре"""
+        self.guided_mode = checked
+        if checked:
+            self._guided_step(None)
+
+    def _guided_step(self, matrix_key):
+        """Переход к следующей информативной паре в матрице matrix_key или в следующих
+
+        Когда ранжирование в матрице устойчиво, оставшиеся ячейки можно
+        заполнить по оценке приоритетов, не опрашивая эксперта.
+        """
+        keys = [key for key in self.backend.required_matrices(self.selected_levels) if key in self.matrix_sizes]
+        start = keys.index(matrix_key) if matrix_key in keys else 0
+
+        for key in keys[start:]:
+            pair = self.backend.next_informative_pair(key, self.GUIDED_TOLERANCE)
+            if pair is not None:
+                self._focus_matrix_cell((key, *pair))
+                return
+
+            filled, total = self.backend.matrix_progress(key)
+            if filled < total and self.matrix_sizes[key] > 1:
+                self._focus_matrix_cell((key, 0, 1))
+                answer = QMessageBox.question(
+                    self, "Пошаговый ввод",
+                    f"Ранжирование в этой матрице устойчиво после {filled} из {total} сравнений.\n"
+                    f"Заполнить оставшиеся {total - filled} ячеек по оценке приоритетов?",
+                    QMessageBox.Yes | QMessageBox.No)
+                if answer != QMessageBox.Yes:
+                    return
+                self._apply_matrix_values(key, self.backend.fill_from_estimate(key))
+
+        self.statusBar().showMessage("Пошаговый ввод завершен: все матрицы заполнены", 5000)
+
     def _calculate_priorities(self):
         """Расчет приоритетов с улучшенной обработкой ошибок"""
         try:
@@ -1887,83 +3058,14 @@ class AHPFrontend(QMainWindow):
             if not self._check_all_matrices_filled():
                 QMessageBox.warning(self, "Ошибка",
                                     "Не все матрицы сравнений заполнены!\n"
-                                    "Заполните все необходимые матрицы перед расчетом.")
-                return
-
-            # Сбор данных для расчета
-            matrices = {}
-            errors = []
-
-            # Для 3 уровней - матрица типов критериев
-            if self.selected_levels >= 3:
-                type_names = list(self.backend.criteria_types.keys())
-                if not type_names:
-                    errors.append("Не заданы типы критериев")
-                else:
-                    type_comparisons = self._collect_comparisons('criteria_types', type_names)
-                    if type_comparisons:
-                        matrix = self.backend.build_matrix(type_names, type_comparisons)
-                        if matrix is not None:
-                            matrices['criteria_types'] = matrix
-                        else:
-                            errors.append("Ошибка в матрице сравнения видов критериев")
-
-            # Для 2 и 3 уровней - матрицы критериев
-            if self.selected_levels >= 2 and not errors:
-                if self.selected_levels >= 3:
-                    # Для 3 уровней - матрицы критериев по типам
-                    for type_name, type_criteria in self.backend.criteria_types.items():
-                        comparisons = self._collect_comparisons(f'criteria_{type_name}', type_criteria)
-                        if comparisons:
-                            matrix = self.backend.build_matrix(type_criteria, comparisons)
-                            if matrix is not None:
-                                matrices[f'criteria_{type_name}'] = matrix
-                            else:
-                                errors.append(f"Ошибка в матрице критериев для вида '{type_name}'")
-                else:
-                    # Для 2 уровней - одна матрица критериев
-                    criteria = self.backend.criteria
-                    if not criteria:
-                        errors.append("Не заданы критерии")
-                    else:
-                        comparisons = self._collect_comparisons('criteria', criteria)
-                        if comparisons:
-                            matrix = self.backend.build_matrix(criteria, comparisons)
-                            if matrix is not None:
-                                matrices['criteria'] = matrix
-                            else:
-                                errors.append("Ошибка в матрице сравнения критериев")
-
-            # Для всех уровней - матрицы альтернатив
-            if self.backend.alternatives and not errors:
-                if self.selected_levels >= 2:
-                    # Для 2 и 3 уровней - матрицы альтернатив по критериям
-                    for criterion in self.backend.criteria:
-                        comparisons = self._collect_comparisons(f'alternatives_{criterion}', self.backend.alternatives)
-                        if comparisons:
-                            matrix = self.backend.build_matrix(self.backend.alternatives, comparisons)
-                            if matrix is not None:
-                                matrices[f'alternatives_{criterion}'] = matrix
-                            else:
-                                errors.append(f"Ошибка в матрице альтернатив для критерия '{criterion}'")
-                else:
-                    # Для 1 уровня - одна матрица альтернатив
-                    comparisons = self._collect_comparisons('alternatives', self.backend.alternatives)
-                    if comparisons:
-                        matrix = self.backend.build_matrix(self.backend.alternatives, comparisons)
-                        if matrix is not None:
-                            matrices['alternatives'] = matrix
-                        else:
-                            errors.append("Ошибка в матрице сравнения альтернатив")
-
-            # Проверка ошибок перед расчетом
-            if errors:
-                QMessageBox.critical(self, "Ошибка", "\n".join(errors))
+                                    "Заполните все необходимые матрицы перед расчетом.\n"
+                                    f"Осталось ввести суждений: {self.backend.missing_judgments(self.selected_levels)}")
+                self._jump_to_next_missing()
                 return
 
             # Сохранение матриц и расчет AHP
-            self.backend.matrices = matrices
-            results = self.backend.calculate_ahp(self.selected_levels)
+            self.backend.matrices = self.backend.build_required_matrices(self.selected_levels)
+            results = self.backend.calculate_ahp(self.selected_levels, self.synthesis_mode)
 
             if results is None:
                 QMessageBox.critical(self, "Ошибка", "Не удалось рассчитать приоритеты")
@@ -1977,75 +3079,9 @@ class AHPFrontend(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Произошла ошибка при расчетах:\n{str(e)}")
 
-    def _collect_comparisons(self, matrix_key, items):
-        """Собирает сравнения для матрицы из полей ввода"""
-        comparisons = {}
-        n = len(items)
-        for i in range(n):
-            for j in range(i + 1, n):
-                entry = self.matrix_entries.get((matrix_key, i, j))
-                if entry and isinstance(entry, QLineEdit):
-                    value = entry.text().strip()
-                    if value:
-                        comparisons[(i, j)] = value
-        return comparisons
-
-
     def _check_all_matrices_filled(self):
         """Проверка заполнения всех матриц"""
-        try:
-            # Проверка матрицы типов критериев (для 3 уровней)
-            if self.selected_levels >= 3:
-                type_names = list(getattr(self.backend, 'criteria_types', {}).keys())
-                for i in range(len(type_names)):
-                    for j in range(i + 1, len(type_names)):
-                        entry = self.matrix_entries.get(('criteria_types', i, j))
-                        if not entry or not entry.text().strip():
-                            return False
-
-            # Проверка матриц критериев (для 2 и 3 уровней)
-            if self.selected_levels >= 2:
-                if self.selected_levels >= 3:
-                    # Для 3 уровней - проверка матриц критериев по типам
-                    for type_name in getattr(self.backend, 'criteria_types', {}):
-                        criteria = self.backend.criteria_types[type_name]
-                        for i in range(len(criteria)):
-                            for j in range(i + 1, len(criteria)):
-                                entry = self.matrix_entries.get((f'criteria_{type_name}', i, j))
-                                if not entry or not entry.text().strip():
-                                    return False
-                else:
-                    # Для 2 уровней - проверка одной матрицы критериев
-                    criteria = getattr(self.backend, 'criteria', [])
-                    for i in range(len(criteria)):
-                        for j in range(i + 1, len(criteria)):
-                            entry = self.matrix_entries.get(('criteria', i, j))
-                            if not entry or not entry.text().strip():
-                                return False
-
-            # Проверка матриц альтернатив (для всех уровней)
-            if getattr(self.backend, 'alternatives', []):
-                if self.selected_levels >= 2:
-                    # Для 2 и 3 уровней - проверка матриц альтернатив по критериям
-                    for criterion in getattr(self.backend, 'criteria', []):
-                        for i in range(len(self.backend.alternatives)):
-                            for j in range(i + 1, len(self.backend.alternatives)):
-                                entry = self.matrix_entries.get((f'alternatives_{criterion}', i, j))
-                                if not entry or not entry.text().strip():
-                                    return False
-                else:
-                    # Для 1 уровня - проверка одной матрицы альтернатив
-                    for i in range(len(self.backend.alternatives)):
-                        for j in range(i + 1, len(self.backend.alternatives)):
-                            entry = self.matrix_entries.get(('alternatives', i, j))
-                            if not entry or not entry.text().strip():
-                                return False
-
-            return True
-        except Exception as e:
-            print(f"Ошибка проверки матриц: {str(e)}")
-            return False
-
+        return self.backend.is_ready(self.selected_levels)
 
     def _show_results(self, results):
         """Отображение результатов с проверкой согласованности"""
@@ -2069,6 +3105,7 @@ class AHPFrontend(QMainWindow):
             # Настройка отображения
             if all_consistent:
                 self._setup_results_controls()
+                self._build_result_views()
                 self._display_results()
 
         except Exception as e:
@@ -2094,70 +3131,217 @@ class AHPFrontend(QMainWindow):
             print(f"Ошибка при смене режима отображения: {str(e)}")
 
 
-    def _display_results(self):
-        """Отображение результатов в выбранном режиме"""
+    def _build_result_views(self):
+        """Однократное построение всех представлений результатов в стеке страниц"""
         try:
-            self._clear_layout(self.res_display_layout)
+            self._release_result_views()
 
             if not hasattr(self, 'result_data') or not self.result_data:
-                QMessageBox.warning(self, "Нет данных", "Нет данных для отображения")
                 return
 
-            # Создаем контейнер с прокруткой
-            scroll = QScrollArea()
-            scroll.setWidgetResizable(True)
-            content = QWidget()
-            layout = QVBoxLayout(content)
-            layout.setAlignment(Qt.AlignTop)
+            self.res_stack = QStackedWidget()
+            builders = [
+                ("chart", self._display_chart_results),
+                ("table", self._display_table_results),
+                ("diagram", self._display_diagram_results),
+            ]
+
+            for mode, builder in builders:
+                scroll = QScrollArea()
+                scroll.setWidgetResizable(True)
+                content = QWidget()
+                layout = QVBoxLayout(content)
+                layout.setAlignment(Qt.AlignTop)
+
+                builder(layout)
 
-            # Выбираем способ отображения
-            if self.result_display_mode == "table":
-                self._display_table_results(layout)
-            elif self.result_display_mode == "chart":
-                self._display_chart_results(layout)
-            elif self.result_display_mode == "diagram":
-                self._display_diagram_results(layout)
+                scroll.setWidget(content)
+                self.res_stack.addWidget(scroll)
+                self.result_pages[mode] = scroll
 
-            scroll.setWidget(content)
-            self.res_display_layout.addWidget(scroll)
+            self._refresh_result_values()
+            self._create_whatif_panel()
+            self.res_display_layout.addWidget(self.res_stack)
 
         except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Ошибка отображения: {str(e)}")
+            QMessageBox.critical(self, "Ошибка", f"Ошибка построения результатов: {str(e)}")
+
+    def _release_result_views(self):
+        """Освобождает страницы и фигуры предыдущего расчета"""
+        for chart in self.result_charts + self.bar_charts:
+            chart.close()
+        self.result_charts = []
+        self.bar_charts = []
+        self.level_bar_charts = {}
+        self.whatif_timer.stop()
+        self.whatif_sliders = []
+        self.whatif_group = None
+        self.whatif_status = None
+        self.result_tables = []
+        self.result_pages = {}
+        self._clear_layout(self.res_display_layout)
+
+    def _refresh_result_values(self):
+        """Переформатирует значения на уже построенных представлениях"""
+        for chart in self.result_charts + self.bar_charts:
+            chart.set_percent(self.display_percent)
+
+    def _set_chart_mode(self, index):
+        """Смена режима столбчатых диаграмм: перестраивается только страница графиков"""
+        self.chart_mode = self.chart_mode_combo.itemData(index)
+        self._rebuild_chart_page()
+
+    def _toggle_chart_label_decimation(self, checked):
+        self.decimate_chart_labels = checked
+        self._rebuild_chart_page()
+
+    def _rebuild_chart_page(self):
+        """Перестраивает только страницу столбчатых диаграмм"""
+        page = self.result_pages.get("chart")
+        if page is None:
+            return
 
+        for chart in self.bar_charts:
+            chart.close()
+        self.bar_charts = []
+        self.level_bar_charts = {}
 
-    def _display_all_tables(self, layout):
-        """Отображение всех данных в табличном виде"""
-        # Типы критериев (для 3 уровней)
-        if self.selected_levels >= 3 and 'type_priority' in self.result_data['priorities']:
-            types = list(self.backend.criteria_types.keys())
-            if len(types) == len(self.result_data['priorities']['type_priority']):
-                self._create_table(
-                    types,
-                    self.result_data['priorities']['type_priority'],
-                    "Приоритеты видов критериев (Первый уровень)"
-                )
+        self._display_chart_results(page.widget().layout())
+        self._refresh_result_values()
+        if self.whatif_sliders:
+            self._apply_whatif_weights()
 
-        # Критерии (для 2 и 3 уровней)
-        if 'criteria_priority' in self.result_data['priorities']:
-            criteria = self.backend.criteria
-            if len(criteria) == len(self.result_data['priorities']['criteria_priority']):
-                title = "Приоритеты критериев" + (" (Второй уровень)" if self.selected_levels >= 3 else "")
-                self._create_table(
-                    criteria,
-                    self.result_data['priorities']['criteria_priority'],
-                    title
-                )
+    def _create_whatif_panel(self):
+        """Ползунки весов верхнего уровня (видов критериев или критериев) над результатами
 
-        # Альтернативы
-        if 'alternatives_priority' in self.result_data['priorities']:
-            alts = self.backend.alternatives
-            if len(alts) == len(self.result_data['priorities']['alternatives_priority']):
-                self._create_table(
-                    alts,
-                    self.result_data['priorities']['alternatives_priority'],
-                    "Итоговые приоритеты альтернатив",
-                    show_percent=True
-                )
+        Новые приоритеты альтернатив считаются по сохраненным локальным приоритетам
+        одним умножением матрицы на вектор (AHPBackend.reweight), а диаграммы на
+        странице графиков только меняют высоты столбцов.
+        """
+        priorities = self.result_data.get('priorities', {})
+        if not self.backend.reweight_state or 'alternatives_priority' not in priorities:
+            return
+
+        if self.selected_levels >= 3 and 'type_priority' in priorities:
+            self.whatif_level, names, weights = 'types', list(self.backend.criteria_types), priorities['type_priority']
+        else:
+            self.whatif_level, names, weights = 'criteria', self.backend.criteria, priorities['criteria_priority']
+        self.whatif_base = np.asarray(weights, dtype=float)
+
+        group = QGroupBox("Что если: веса " + ("видов критериев" if self.whatif_level == 'types' else "критериев"))
+        grid = QGridLayout(group)
+        self.whatif_sliders = []
+        self.whatif_share_labels = []
+        for row, name in enumerate(names):
+            slider = QSlider(Qt.Horizontal)
+            slider.setRange(0, self.WHATIF_SLIDER_STEPS)
+            slider.valueChanged.connect(self._schedule_whatif_update)
+            slider.sliderReleased.connect(self._apply_whatif_weights)
+            share = QLabel()
+            share.setMinimumWidth(60)
+            grid.addWidget(QLabel(name), row, 0)
+            grid.addWidget(slider, row, 1)
+            grid.addWidget(share, row, 2)
+            self.whatif_sliders.append(slider)
+            self.whatif_share_labels.append(share)
+
+        reset_btn = QPushButton("Исходные веса")
+        reset_btn.clicked.connect(self._reset_whatif_weights)
+        grid.addWidget(reset_btn, len(names), 0, 1, 3, Qt.AlignLeft)
+        # Сообщение о том, что пересчет недоступен, выводится здесь, а не окном посреди перетаскивания
+        self.whatif_status = QLabel()
+        self.whatif_status.setProperty("status", "warn")
+        self.whatif_status.setWordWrap(True)
+        self.whatif_status.hide()
+        grid.addWidget(self.whatif_status, len(names) + 1, 0, 1, 3)
+        grid.setColumnStretch(1, 1)
+        self.whatif_group = group
+
+        self._reset_whatif_weights()
+        self.res_display_layout.addWidget(group)
+
+    def _disable_whatif_panel(self, message):
+        """Отключает ползунки и показывает причину в самой панели"""
+        self.whatif_timer.stop()
+        for slider in self.whatif_sliders:
+            slider.setEnabled(False)
+        if self.whatif_status is not None:
+            self.whatif_status.setText(message)
+            self.whatif_status.show()
+
+    def _reset_whatif_weights(self):
+        """Возвращает ползунки к рассчитанным весам"""
+        top = self.whatif_base.max() if self.whatif_base.size else 0
+        for slider, weight in zip(self.whatif_sliders, self.whatif_base):
+            slider.blockSignals(True)
+            slider.setValue(int(round(weight / top * self.WHATIF_SLIDER_STEPS)) if top > 0 else 0)
+            slider.blockSignals(False)
+        self._apply_whatif_weights()
+
+    def _schedule_whatif_update(self):
+        if not self.whatif_timer.isActive():
+            self.whatif_timer.start()
+
+    def _apply_whatif_weights(self):
+        """Пересчитывает приоритеты по положению ползунков и обновляет диаграммы на месте"""
+        if not self.whatif_sliders or not all(slider.isEnabled() for slider in self.whatif_sliders):
+            return
+        if not self.backend.reweight_ready():
+            self._disable_whatif_panel("Исходные данные изменились после расчета - "
+                                       "выполните расчет заново, чтобы менять веса")
+            return
+        try:
+            live = any(slider.isSliderDown() for slider in self.whatif_sliders)
+            weights = np.array([slider.value() for slider in self.whatif_sliders], dtype=float)
+            total = weights.sum()
+            if total == 0:
+                return
+            weights /= total
+            for label, weight in zip(self.whatif_share_labels, weights):
+                label.setText(f"{weight * 100:.1f}%")
+
+            if self.whatif_level == 'types':
+                self._set_level_chart_values('types', list(self.backend.criteria_types), weights, live)
+                weights = self.backend.criteria_weights_from_types(weights)
+                weights /= weights.sum()
+            self._set_level_chart_values('criteria', self.backend.criteria, weights, live)
+            self._set_level_chart_values('alternatives', self.backend.alternatives,
+                                         self.backend.reweight(weights), live)
+        except Exception as e:
+            self._disable_whatif_panel(f"Пересчет весов недоступен: {str(e)}")
+
+    def _set_level_chart_values(self, level, labels, values, live=False):
+        """Передает новые значения диаграмме уровня с учетом режима «первые N + прочие»"""
+        chart = self.level_bar_charts.get(level)
+        if chart is None:
+            return
+        if isinstance(chart, ResultBarChart) and self.chart_mode == "top":
+            if live and len(chart.labels) > self.CHART_TOP_N:
+                # При перетаскивании состав и порядок первых N сохраняются, пересортировка - при отпускании
+                index = {name: k for k, name in enumerate(labels)}
+                shown = np.array([index[name] for name in chart.labels[:-1]])
+                values = np.asarray(values, dtype=float)
+                labels, values = chart.labels, np.append(values[shown], values.sum() - values[shown].sum())
+            else:
+                labels, values = self.backend.aggregate_top_n(labels, values, self.CHART_TOP_N)
+        chart.set_values(values, labels, live)
+
+    def _display_results(self):
+        """Отображение результатов в выбранном режиме"""
+        try:
+            if not hasattr(self, 'result_data') or not self.result_data:
+                QMessageBox.warning(self, "Нет данных", "Нет данных для отображения")
+                return
+
+            if not self.result_pages:
+                self._build_result_views()
+
+            page = self.result_pages.get(self.result_display_mode)
+            if page is not None:
+                self.res_stack.setCurrentWidget(page)
+
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка", f"Ошибка отображения: {str(e)}")
 
 
     def _display_all_charts(self, layout):
@@ -2286,40 +3470,19 @@ class AHPFrontend(QMainWindow):
             # Создаем вкладки для переключения между диаграммами
             tab_widget = QTabWidget()
 
-            def create_bar_chart_tab(labels, values, title, color, tab_name):
-                """Создает одну столбчатую диаграмму во вкладке"""
-                fig = plt.figure(figsize=(10, 6))
-                ax = fig.add_subplot(111)
+            max_labels = self.CHART_MAX_LABELS if self.decimate_chart_labels else None
 
-                if self.display_percent:
-                    values = [v * 100 for v in values]
-                    ylabel = "Приоритет, %"
-                    fmt = lambda v: f"{v:.2f}%"
+            def create_bar_chart_tab(labels, values, title, color, tab_name, level):
+                """Создает одну столбчатую диаграмму во вкладке в выбранном режиме"""
+                if self.chart_mode == "scroll" and len(labels) > self.CHART_SCROLL_WINDOW:
+                    chart = ScrollingBarChart(labels, values, title, color, self.CHART_SCROLL_WINDOW)
                 else:
-                    ylabel = "Значение приоритета"
-                    fmt = lambda v: f"{v:.4f}"
-
-                bars = ax.bar(labels, values, color=color, alpha=0.8)
-                ax.set_title(title, fontsize=16, pad=20, fontweight='bold')
-                ax.set_ylabel(ylabel, fontsize=14)
-                ax.grid(axis='y', linestyle='--', alpha=0.5)
-
-                if len(values) > 0:
-                    ax.set_ylim(0, max(values) * 1.15)
-
-                plt.xticks(rotation=45, ha='right')
-
-                for bar in bars:
-                    height = bar.get_height()
-                    ax.text(bar.get_x() + bar.get_width() / 2., height + 0.01,
-                            fmt(height),
-                            ha='center', va='bottom', fontsize=12)
-
-                # Оптимизация расположения элементов
-                fig.tight_layout()
-
-                canvas = FigureCanvas(fig)
-                tab_widget.addTab(canvas, tab_name)
+                    if self.chart_mode == "top":
+                        labels, values = self.backend.aggregate_top_n(labels, values, self.CHART_TOP_N)
+                    chart = ResultBarChart(labels, values, title, color, max_labels)
+                self.bar_charts.append(chart)
+                self.level_bar_charts[level] = chart
+                tab_widget.addTab(chart.widget, tab_name)
 
             # Для 3 уровня - график типов критериев (первый уровень)
             if self.selected_levels >= 3 and 'type_priority' in self.result_data['priorities']:
@@ -2327,7 +3490,7 @@ class AHPFrontend(QMainWindow):
                 values = self.result_data['priorities']['type_priority']
                 if len(types) == len(values):
                     title = "ПРИОРИТЕТЫ ВИДОВ КРИТЕРИЕВ" + (" (Первый уровень)" if self.selected_levels >= 3 else "")
-                    create_bar_chart_tab(types, values, title, '#4C72B0', "Типы критериев")
+                    create_bar_chart_tab(types, values, title, '#4C72B0', "Типы критериев", 'types')
 
             # Для 2 и 3 уровней - график критериев
             if self.selected_levels >= 2 and 'criteria_priority' in self.result_data['priorities']:
@@ -2335,14 +3498,15 @@ class AHPFrontend(QMainWindow):
                 values = self.result_data['priorities']['criteria_priority']
                 if len(criteria) == len(values):
                     title = "ПРИОРИТЕТЫ КРИТЕРИЕВ" + (" (Второй уровень)" if self.selected_levels >= 3 else "")
-                    create_bar_chart_tab(criteria, values, title, '#55A868', "Критерии")
+                    create_bar_chart_tab(criteria, values, title, '#55A868', "Критерии", 'criteria')
 
             # Для всех уровней - график альтернатив
             if 'alternatives_priority' in self.result_data['priorities']:
                 alts = self.backend.alternatives
                 values = self.result_data['priorities']['alternatives_priority']
                 if len(alts) == len(values):
-                    create_bar_chart_tab(alts, values, "ПРИОРИТЕТЫ АЛЬТЕРНАТИВ", '#C44E52', "Альтернативы")
+                    create_bar_chart_tab(alts, values, "ПРИОРИТЕТЫ АЛЬТЕРНАТИВ", '#C44E52', "Альтернативы",
+                                         'alternatives')
 
             container_layout.addWidget(tab_widget)
             layout.addWidget(container)
@@ -2442,7 +3606,8 @@ class AHPFrontend(QMainWindow):
                 if len(types) == len(priorities['type_priority']):
                     self._create_priority_table(
                         layout, types, priorities['type_priority'],
-                        "Приоритеты видов критериев (Первый уровень)"
+                        "Приоритеты видов критериев (Первый уровень)",
+                        bounds=self._priority_bounds('type_priority')
                     )
 
             # Приоритеты критериев (для 2 и 3 уровней)
@@ -2451,7 +3616,8 @@ class AHPFrontend(QMainWindow):
                 if len(criteria) == len(priorities['criteria_priority']):
                     title = "Приоритеты критериев" + (" (Второй уровень)" if self.selected_levels >= 3 else "")
                     self._create_priority_table(
-                        layout, criteria, priorities['criteria_priority'], title
+                        layout, criteria, priorities['criteria_priority'], title,
+                        bounds=self._priority_bounds('criteria_priority')
                     )
 
             # Приоритеты альтернатив
@@ -2461,12 +3627,32 @@ class AHPFrontend(QMainWindow):
                     self._create_priority_table(
                         layout, alts, priorities['alternatives_priority'],
                         "Итоговые приоритеты альтернатив",
-                        show_percent=True
+                        show_percent=True,
+                        bounds=self._priority_bounds('alternatives_priority')
                     )
+                    if 'robust_alternatives' in self.result_data:
+                        robust = self.result_data['robust_alternatives']
+                        summary = (f"Место не зависит от выбора значений в интервалах у {len(robust)} "
+                                   f"из {len(alts)} альтернатив")
+                        if robust:
+                            summary += ": " + ", ".join(robust[:20]) + (" ..." if len(robust) > 20 else "")
+                        robust_label = QLabel(summary)
+                        robust_label.setWordWrap(True)
+                        layout.layout().addWidget(robust_label)
 
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Ошибка создания таблицы: {str(e)}")
 
+    def _priority_bounds(self, name):
+        """Границы приоритетов: интервальные или нечеткие (l, u) в масштабе нормированных весов; None - нет"""
+        bounds = self.result_data.get('priority_bounds', {}).get(name)
+        if bounds is not None:
+            return bounds
+        weights = self.result_data.get('fuzzy_priorities', {}).get(name)
+        if weights is None:
+            return None
+        return weights[:, [0, 2]] / weights.mean(axis=1).sum()
+
     def _display_diagram_results(self, layout):
         """Отображение результатов в виде круговых диаграмм с адаптивной легендой"""
         try:
@@ -2485,28 +3671,25 @@ class AHPFrontend(QMainWindow):
             textprops = {'fontsize': 10, 'fontweight': 'bold', 'color': '#333333'}  # Уменьшаем шрифт
             explode = 0.05
 
-            def autopct_format(values):
-                if self.display_percent:
-                    return lambda p: f'{p:.1f}%'  # Уменьшаем точность для компактности
-                else:
-                    total = sum(values)
-                    return lambda p: f'{p * total / 100:.3f}'
-
             # Создаем вкладки для переключения между диаграммами
             tab_widget = QTabWidget()
 
             def create_pie_chart(data, labels, title, legend_title):
                 """Создает круговую диаграмму с адаптивной легендой"""
+                # Мелкие секторы объединяются, иначе тысячи альтернатив строятся минутами
+                labels, data = self.backend.aggregate_top_n(labels, data, self.CHART_TOP_N)
+
                 # Адаптивный размер фигуры в зависимости от количества элементов
                 n_items = len(labels)
                 fig_height = 6 + min(n_items // 10, 4)  # Увеличиваем высоту для большого количества элементов
                 fig = plt.figure(figsize=(12, fig_height), facecolor='#f8f8f8', dpi=100)
                 ax = fig.add_subplot(111)
 
-                wedges, texts, autotexts = ax.pie(
+                # Текст подписей секторов заполняет ResultPieChart.set_percent
+                pie_parts = tuple(ax.pie(
                     data,
                     labels=labels if n_items < 15 else None,  # Убираем подписи при большом количестве элементов
-                    autopct=autopct_format(data) if n_items < 20 else None,  # Убираем проценты при большом количестве
+                    autopct='' if n_items < 20 else None,  # Убираем проценты при большом количестве
                     startangle=90,
                     colors=colors,
                     explode=[explode] * len(data),
@@ -2514,7 +3697,9 @@ class AHPFrontend(QMainWindow):
                     textprops=textprops,
                     wedgeprops={'linewidth': 1.2, 'edgecolor': 'white'},
                     pctdistance=0.8
-                )
+                ))
+                wedges = pie_parts[0]
+                autotexts = pie_parts[2] if len(pie_parts) > 2 else []
 
                 ax.set_title(title, pad=15, fontsize=14, fontweight='bold', color='#2a2a2a')
 
@@ -2560,23 +3745,24 @@ class AHPFrontend(QMainWindow):
                     autotext.set_fontweight('bold')
 
                 # Адаптивные отступы
-                bottom_margin = 0.15 + 0.02 * n_items  # Динамический отступ снизу
+                bottom_margin = min(0.15 + 0.02 * n_items, 0.6)  # Динамический отступ снизу
                 plt.subplots_adjust(bottom=bottom_margin, top=0.85)
 
-                return fig
+                chart = ResultPieChart(fig, autotexts, data)
+                self.result_charts.append(chart)
+                return chart
 
             # 1. Типы критериев (Первый уровень)
             if self.selected_levels >= 3 and 'type_priority' in self.result_data['priorities']:
                 types = list(self.backend.criteria_types.keys())
                 values = self.result_data['priorities']['type_priority']
                 if len(types) == len(values):
-                    fig = create_pie_chart(
+                    chart = create_pie_chart(
                         values, types,
                         "ПРИОРИТЕТЫ ВИДОВ КРИТЕРИЕВ (Первый уровень)",
                         "Типы критериев (абсолютное значение / процент)"
                     )
-                    canvas = FigureCanvas(fig)
-                    tab_widget.addTab(canvas, "Виды критериев")
+                    tab_widget.addTab(chart.canvas, "Виды критериев")
 
             # 2. Критерии (Второй уровень)
             if self.selected_levels >= 2 and 'criteria_priority' in self.result_data['priorities']:
@@ -2584,26 +3770,24 @@ class AHPFrontend(QMainWindow):
                 values = self.result_data['priorities']['criteria_priority']
                 if len(criteria) == len(values):
                     title = "ПРИОРИТЕТЫ КРИТЕРИЕВ" + (" (Второй уровень)" if self.selected_levels >= 3 else "")
-                    fig = create_pie_chart(
+                    chart = create_pie_chart(
                         values, criteria,
                         title,
                         "Критерии (абсолютное значение / процент)"
                     )
-                    canvas = FigureCanvas(fig)
-                    tab_widget.addTab(canvas, "Критерии")
+                    tab_widget.addTab(chart.canvas, "Критерии")
 
             # 3. Альтернативы
             if 'alternatives_priority' in self.result_data['priorities']:
                 alts = self.backend.alternatives
                 values = self.result_data['priorities']['alternatives_priority']
                 if len(alts) == len(values):
-                    fig = create_pie_chart(
+                    chart = create_pie_chart(
                         values, alts,
                         "ПРИОРИТЕТЫ АЛЬТЕРНАТИВ",
                         "Альтернативы (абсолютное значение / процент)"
                     )
-                    canvas = FigureCanvas(fig)
-                    tab_widget.addTab(canvas, "Альтернативы")
+                    tab_widget.addTab(chart.canvas, "Альтернативы")
 
             container_layout.addWidget(tab_widget)
             layout.addWidget(container)
@@ -2611,149 +3795,6 @@ class AHPFrontend(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Ошибка создания диаграмм: {str(e)}")
 
-    def _create_table(self, labels, values, title, show_percent=False,
-                      is_comparison_matrix=False, is_second_level=False,
-                      first_level_weights=None):
-        """Создание таблицы с результатами анализа, включая главный вектор"""
-        try:
-            # Проверка входных данных
-            if not labels or values is None:
-                raise ValueError("Не переданы labels или values")
-            if is_second_level and first_level_weights is None:
-                raise ValueError("Для таблицы второго уровня нужны first_level_weights")
-
-            # Создаем группу для таблицы
-            group = QGroupBox(title)
-            group.setStyleSheet("""
-                QGroupBox {
-                    border: 1px solid #e0e0e0;
-                    border-radius: 4px;
-                    margin-top: 10px;
-                    padding-top: 15px;
-                }
-                QGroupBox::title {
-                    subcontrol-origin: margin;
-                    left: 10px;
-                    padding: 0 5px;
-                }
-            """)
-
-            layout = QVBoxLayout(group)
-            layout.setContentsMargins(5, 15, 5, 10)
-            layout.setSpacing(10)
-
-            # Создаем таблицу с нужным количеством столбцов
-            table = QTableWidget()
-            columns = 4  # Убрали столбец с процентами/долей, оставили только главный вектор и вектор приоритетов
-            table.setColumnCount(columns)
-
-            headers = ["№", "Элемент", "Главный вектор (ΓB)", "Вектор приоритетов (w)"]
-            table.setHorizontalHeaderLabels(headers)
-
-            # Настройка таблицы
-            table.verticalHeader().setVisible(False)
-            table.setEditTriggers(QTableWidget.NoEditTriggers)
-            table.setSelectionMode(QTableWidget.NoSelection)
-            table.setMinimumHeight(min(300, len(labels) * 35 + 40))
-
-            # Настройка размеров столбцов
-            for i in range(columns):
-                resize_mode = QHeaderView.ResizeToContents if i != 1 else QHeaderView.Stretch
-                table.horizontalHeader().setSectionResizeMode(i, resize_mode)
-
-            # Обработка значений и расчет векторов
-            values_array = np.array(values, dtype=float)
-
-            if values_array.ndim == 1:
-                # Если переданы готовые приоритеты (w)
-                w = values_array
-                # Рассчитываем главный вектор ΓB из вектора приоритетов
-                n = len(w)
-                CB = np.array([np.prod([(w[i] / w[j]) if w[j] != 0 else 0
-                                        for j in range(n)]) ** (1 / n) for i in range(n)])
-
-                # Нормализуем главный вектор
-                CB = CB / np.sum(CB) if np.sum(CB) > 0 else CB
-                w_normalized = w / np.sum(w) if np.sum(w) > 0 else w
-            else:
-                # Если передана матрица сравнения
-                CB, w = self.backend.calculate_priority_vector(values_array)
-                w_normalized = w / np.sum(w) if np.sum(w) > 0 else w
-
-            # Округление до 4 знаков после запятой
-            CB = np.round(CB, 4)
-            w_normalized = np.round(w_normalized, 4)
-
-            # Заполнение таблицы данными
-            table.setRowCount(len(labels))
-            max_w = np.max(w_normalized) if len(w_normalized) > 0 else 0
-
-            for row in range(len(labels)):
-                # Создаем элементы таблицы
-                items = [
-                    QTableWidgetItem(str(row + 1)),  # №
-                    QTableWidgetItem(str(labels[row])),  # Элемент
-                    QTableWidgetItem(f"{CB[row]:.4f}"),  # Главный вектор ΓB (4 знака)
-                    QTableWidgetItem(f"{w_normalized[row]:.4f}")  # Вектор приоритетов (4 знака)
-                ]
-
-                # Настройка стилей
-                alignments = [
-                    Qt.AlignCenter,
-                    Qt.AlignLeft | Qt.AlignVCenter,
-                    Qt.AlignRight | Qt.AlignVCenter,
-                    Qt.AlignRight | Qt.AlignVCenter
-                ]
-
-                # Подсветка максимального значения
-                if w_normalized[row] == max_w:
-                    highlight_color = QColor(235, 245, 235)
-                    text_color = QColor(0, 100, 0)
-                    font = QFont()
-                    font.setBold(True)
-                else:
-                    highlight_color = QColor(255, 255, 255)
-                    text_color = QColor(0, 0, 0)
-                    font = QFont()
-
-                # Устанавливаем свойства для всех ячеек строки
-                for col in range(len(items)):
-                    items[col].setTextAlignment(alignments[col])
-                    items[col].setBackground(highlight_color)
-                    items[col].setForeground(text_color)
-                    items[col].setFont(font)
-                    table.setItem(row, col, items[col])
-
-            # Добавление информации о согласованности для матриц сравнения
-            if is_comparison_matrix and values_array.ndim > 1 and values_array.shape[0] > 2:
-                consistency = self.backend.check_consistency(values_array)
-                # Округление показателей согласованности до 4 знаков
-                status_text = (
-                    f"Согласованность: λmax = {round(consistency['lambda_max'], 4)}, "
-                    f"ИС = {round(consistency['CI'], 4)}, ОС = {round(consistency['CR'], 4)} - "
-                    f"{consistency['status']}"
-                )
-                status_label = QLabel(status_text)
-
-                if consistency['CR'] < 0.1:
-                    status_label.setStyleSheet("color: green;")
-                elif consistency['CR'] < 0.2:
-                    status_label.setStyleSheet("color: orange;")
-                else:
-                    status_label.setStyleSheet("color: red; font-weight: bold;")
-
-                layout.addWidget(status_label)
-
-            layout.addWidget(table)
-            self.res_display_layout.addWidget(group)
-            return True
-
-        except Exception as e:
-            error_msg = f"Не удалось создать таблицу:\n{str(e)}"
-            print(error_msg)
-            QMessageBox.critical(self, "Ошибка", error_msg)
-            return False
-
     def _add_consistency_info(self, layout, matrix):
         """Добавляет информацию о согласованности матрицы"""
         consistency = self.backend.check_consistency(matrix)
@@ -2765,57 +3806,14 @@ class AHPFrontend(QMainWindow):
         status_label = QLabel(status_text)
 
         if consistency['CR'] < 0.1:
-            status_label.setStyleSheet("color: green;")
+            status_label.setProperty("status", "good")
         elif consistency['CR'] < 0.2:
-            status_label.setStyleSheet("color: orange;")
+            status_label.setProperty("status", "warn")
         else:
-            status_label.setStyleSheet("color: red; font-weight: bold;")
+            status_label.setProperty("status", "bad")
 
         layout.addWidget(status_label)
 
-    def _add_table_row(self, table, row_num, label, CB_value, w_value, max_w,
-                       show_percent, is_second_level, second_level_w=None):
-        """Добавляет строку в таблицу результатов"""
-        # Создаем элементы таблицы
-        items = [
-            QTableWidgetItem(str(row_num + 1)),
-            QTableWidgetItem(str(label)),
-            QTableWidgetItem(f"{CB_value:.4f}"),
-            QTableWidgetItem(f"{w_value * 100:.2f}%" if show_percent else f"{w_value:.2f}")
-        ]
-
-        if is_second_level and second_level_w is not None:
-            items.append(QTableWidgetItem(
-                f"{second_level_w[row_num] * 100:.2f}%" if show_percent else f"{second_level_w[row_num]:.2f}"
-            ))
-
-        # Настройка стилей и выравнивания
-        alignments = [Qt.AlignCenter,
-                      Qt.AlignLeft | Qt.AlignVCenter,
-                      Qt.AlignRight | Qt.AlignVCenter,
-                      Qt.AlignRight | Qt.AlignVCenter]
-
-        if is_second_level:
-            alignments.append(Qt.AlignRight | Qt.AlignVCenter)
-
-        # Подсветка максимального значения
-        is_max = w_value == max_w
-        highlight_color = QColor(235, 245, 235) if is_max else QColor(255, 255, 255)
-        text_color = QColor(0, 100, 0) if is_max else QColor(0, 0, 0)
-
-        font = QFont()
-        if is_max:
-            font.setBold(True)
-
-        # Устанавливаем свойства для всех ячеек строки
-        for col in range(len(items)):
-            items[col].setTextAlignment(alignments[col])
-            items[col].setBackground(highlight_color)
-            items[col].setForeground(text_color)
-            items[col].setFont(font)
-            table.setItem(row_num, col, items[col])
-
-
     def _get_color_for_value(self, value, min_val, max_val):
         """Получение цвета для значения"""
         try:
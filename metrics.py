@@ -0,0 +1,162 @@
+"""Согласованность ранжирований и расстояния между векторами приоритетов
+
+Все функции принимают массив прогоны × альтернативы (эксперты, сценарии,
+испытания Монте-Карло) и возвращают квадратные матрицы прогоны × прогоны.
+Попарные величины получаются матричными произведениями, поэтому 1000 прогонов
+по 1000 альтернатив считаются без циклов по прогонам и парам альтернатив.
+Строка с NaN (неполный расчет) дает NaN в своих строке и столбце результата.
+"""
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Объем блока знаков пар альтернатив (элементов float32) при расчете тау Кендалла:
+# матрица прогоны × все пары для 1000 альтернатив не помещается в память целиком
+KENDALL_BLOCK_ELEMENTS = 1 << 22
+
+
+def _as_runs(priorities) -> np.ndarray:
+    priorities = np.asarray(priorities, dtype=float)
+    if priorities.ndim != 2:
+        raise ValueError("Ожидается массив прогоны × альтернативы")
+    return priorities
+
+
+def average_ranks(priorities) -> np.ndarray:
+    """Места альтернатив в каждом прогоне (1 - наибольший приоритет)
+
+    Равным приоритетам назначается среднее их мест. Границы групп равных
+    значений находятся накопленными максимумом и минимумом по отсортированным строкам.
+    """
+    priorities = _as_runs(priorities)
+    runs, n = priorities.shape
+    order = np.argsort(-priorities, axis=1, kind='stable')
+    ordered = np.take_along_axis(-priorities, order, axis=1)
+    positions = np.broadcast_to(np.arange(n), (runs, n))
+    starts = np.ones((runs, n), dtype=bool)
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    ends = np.ones((runs, n), dtype=bool)
+    ends[:, :-1] = starts[:, 1:]
+    first = np.maximum.accumulate(np.where(starts, positions, 0), axis=1)
+    last = np.minimum.accumulate(np.where(ends, positions, n - 1)[:, ::-1], axis=1)[:, ::-1]
+    ranks = np.empty((runs, n))
+    np.put_along_axis(ranks, order, (first + last) / 2 + 1, axis=1)
+    ranks[np.isnan(priorities)] = np.nan
+    return ranks
+
+
+def _pair_products(priorities: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Суммы по всем парам альтернатив для каждой пары прогонов: произведений знаков
+    и совпадений «пара равна в обоих прогонах»
+
+    Знаки считаются по местам в float32 (целые и полуцелые места представимы
+    точно, близкие приоритеты не сливаются при округлении). Альтернативы идут
+    блоками: знаки пар «блок - следующие альтернативы» и «внутри блока» берутся
+    срезами без выборки по индексам и дают по одному матричному произведению;
+    пары внутри блока входят в него дважды, поэтому их вклад делится пополам.
+    Равные пары считаются тем же способом по индикатору нулевого знака,
+    только если равенства вообще встречаются.
+    """
+    ranks = np.ascontiguousarray(average_ranks(priorities).T, dtype=np.float32)
+    n, runs = ranks.shape
+    ordered = np.sort(ranks, axis=0)
+    has_ties = bool(np.any(ordered[1:] == ordered[:-1]))
+    block = max(1, KENDALL_BLOCK_ELEMENTS // max(n * runs, 1))
+    concordance = np.zeros((runs, runs))
+    ties = np.zeros((runs, runs))
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        head = ranks[start:stop, None, :]
+        signs = np.sign(head - ranks[None, stop:, :]).reshape(-1, runs)
+        inner = np.sign(head - ranks[None, start:stop, :]).reshape(-1, runs)
+        concordance += signs.T @ signs + (inner.T @ inner) / 2
+        if has_ties:
+            tied = (signs == 0).astype(np.float32)
+            # Диагональ блока (элемент с самим собой) - не пара, ее вклад вычитается
+            inner_tied = (inner == 0).astype(np.float32)
+            ties += tied.T @ tied + (inner_tied.T @ inner_tied - (stop - start)) / 2
+    return concordance, ties
+
+
+def kendall_tau(priorities, concordance: Optional[np.ndarray] = None) -> np.ndarray:
+    """Тау-b Кендалла между ранжированиями (поправка на связанные пары)"""
+    if concordance is None:
+        concordance = _pair_products(_as_runs(priorities))[0]
+    untied = np.sqrt(np.diag(concordance))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return concordance / np.outer(untied, untied)
+
+
+def kendall_distance(priorities, products: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> np.ndarray:
+    """Нормированное расстояние Кендалла: доля пар, упорядоченных по-разному
+
+    0 - одинаковый порядок, 1 - обратный; пара, равная в одном прогоне
+    и упорядоченная в другом, считается за половину, равная в обоих - совпадает.
+    """
+    priorities = _as_runs(priorities)
+    pairs = priorities.shape[1] * (priorities.shape[1] - 1) // 2
+    if pairs == 0:
+        return np.zeros((priorities.shape[0], priorities.shape[0]))
+    concordance, ties = products if products is not None else _pair_products(priorities)
+    # Пары: C согласованных, D несогласованных, X равных в одном прогоне, T равных в обоих;
+    # pairs - (C - D) - T = 2D + X
+    return (pairs - concordance - ties) / (2 * pairs)
+
+
+def spearman_rho(priorities) -> np.ndarray:
+    """Ро Спирмена: корреляция Пирсона средних мест"""
+    ranks = average_ranks(priorities)
+    ranks -= ranks.mean(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ranks /= np.linalg.norm(ranks, axis=1, keepdims=True)
+    return ranks @ ranks.T
+
+
+def top_k_overlap(priorities, k: int) -> np.ndarray:
+    """Доля общих альтернатив в первых k местах двух прогонов"""
+    priorities = _as_runs(priorities)
+    runs, n = priorities.shape
+    k = min(max(int(k), 1), n)
+    top = np.argpartition(-np.nan_to_num(priorities, nan=-np.inf), k - 1, axis=1)[:, :k]
+    members = np.zeros((runs, n), dtype=np.float32)
+    np.put_along_axis(members, top, 1, axis=1)
+    overlap = (members @ members.T).astype(float) / k
+    incomplete = np.isnan(priorities).any(axis=1)
+    overlap[incomplete, :] = np.nan
+    overlap[:, incomplete] = np.nan
+    return overlap
+
+
+def euclidean_distances(priorities) -> np.ndarray:
+    """Евклидовы расстояния между векторами приоритетов через матрицу Грама"""
+    priorities = _as_runs(priorities)
+    gram = priorities @ priorities.T
+    squares = np.diag(gram)
+    distances = np.sqrt(np.maximum(squares[:, None] + squares[None, :] - 2 * gram, 0))
+    np.fill_diagonal(distances, np.where(np.isnan(squares), np.nan, 0))
+    return distances
+
+
+def cosine_distances(priorities) -> np.ndarray:
+    """Косинусные расстояния (1 - косинус угла) между векторами приоритетов"""
+    priorities = _as_runs(priorities)
+    norms = np.linalg.norm(priorities, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 1 - (priorities @ priorities.T) / np.outer(norms, norms)
+
+
+def pairwise_metrics(priorities, top_k: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Все матрицы согласованности и расстояний сразу (суммы знаков пар - один раз)
+
+    top_k по умолчанию - десятая часть альтернатив, не меньше одной.
+    """
+    priorities = _as_runs(priorities)
+    products = _pair_products(priorities)
+    return {
+        'kendall_tau': kendall_tau(priorities, products[0]),
+        'kendall_distance': kendall_distance(priorities, products),
+        'spearman_rho': spearman_rho(priorities),
+        'top_k_overlap': top_k_overlap(priorities, top_k or max(1, priorities.shape[1] // 10)),
+        'euclidean': euclidean_distances(priorities),
+        'cosine': cosine_distances(priorities),
+    }
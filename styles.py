@@ -0,0 +1,247 @@
+"""Единая таблица стилей приложения
+
+Все виджеты оформляются одной QSS-таблицей, которая собирается из шаблона
+и набора цветов темы. Виджеты помечаются objectName (matrixCell, saatyTip, ...)
+или динамическими свойствами (role, status, compact), поэтому смена темы
+или масштаба сводится к одному вызову QApplication.setStyleSheet.
+
+Размеры шрифтов тоже задаются таблицей: при активной таблице стилей Qt
+не распространяет шрифт приложения на уже оформленные виджеты.
+"""
+
+THEMES = {
+    'light': {
+        'window_bg': '#f0f0f0',
+        'pane_border': '#C2C7CB',
+        'tab_bg': '#F0F0F0',
+        'tab_selected_bg': 'white',
+        'group_bg': 'white',
+        'group_title': '#333',
+        'text': 'black',
+        'border': '#C2C7CB',
+        'input_bg': 'white',
+        'button_bg': '#f0f0f0',
+        'button_hover': '#e0e0e0',
+        'toggle_bg': '#f8f8f8',
+        'toggle_border': '#ccc',
+        'toggle_hover': '#e8e8e8',
+        'matrix_frame_bg': '#f9f9f9',
+        'tip_bg': '#f0f0f0',
+        'tip_border': '#ddd',
+        'header_bg': '#e0e0e0',
+        'header_border': '#999',
+        'cell_bg': 'white',
+        'cell_border': '#ccc',
+        'focus_border': '#4CAF50',
+        'base_font': 10,
+        'matrix_font': 9,
+    },
+    'dark': {
+        'window_bg': '#353535',
+        'pane_border': '#444',
+        'tab_bg': '#444',
+        'tab_selected_bg': '#555',
+        'group_bg': '#353535',
+        'group_title': 'white',
+        'text': 'white',
+        'border': '#555',
+        'input_bg': '#454545',
+        'button_bg': '#555',
+        'button_hover': '#666',
+        'toggle_bg': '#555',
+        'toggle_border': '#666',
+        'toggle_hover': '#666',
+        'matrix_frame_bg': '#353535',
+        'tip_bg': '#444',
+        'tip_border': '#555',
+        'header_bg': '#444',
+        'header_border': '#666',
+        'cell_bg': '#454545',
+        'cell_border': '#555',
+        'focus_border': '#8E2DC5',
+        'base_font': 9,
+        'matrix_font': 8,
+    },
+}
+
+APP_STYLESHEET = """
+    QWidget {
+        font-size: %(base_font)dpt;
+    }
+    QMainWindow, QDialog, QWidget {
+        background-color: %(window_bg)s;
+    }
+    QTabWidget::pane {
+        border: 1px solid %(pane_border)s;
+        background: %(window_bg)s;
+    }
+    QTabBar::tab {
+        background: %(tab_bg)s;
+        color: %(text)s;
+        padding: 8px;
+        border: 1px solid %(pane_border)s;
+        border-bottom: none;
+        border-top-left-radius: 4px;
+        border-top-right-radius: 4px;
+    }
+    QTabBar::tab:selected {
+        background: %(tab_selected_bg)s;
+    }
+    QGroupBox {
+        border: 1px solid %(border)s;
+        margin-top: 10px;
+        padding-top: 15px;
+        background: %(group_bg)s;
+    }
+    QGroupBox::title {
+        color: %(group_title)s;
+        subcontrol-origin: margin;
+        left: 10px;
+    }
+    QLabel {
+        color: %(text)s;
+    }
+    QLineEdit, QTextEdit, QPlainTextEdit {
+        background: %(input_bg)s;
+        color: %(text)s;
+        border: 1px solid %(border)s;
+        padding: 5px;
+    }
+    QPushButton {
+        background: %(button_bg)s;
+        color: %(text)s;
+        border: 1px solid %(border)s;
+        padding: 5px 10px;
+        border-radius: 4px;
+    }
+    QPushButton:hover {
+        background: %(button_hover)s;
+    }
+    QListWidget, QListView, QTableView {
+        background: %(input_bg)s;
+        color: %(text)s;
+        border: 1px solid %(border)s;
+    }
+
+    /* Заголовки разделов */
+    QLabel[role="sectionTitle"] {
+        font-weight: bold;
+        font-size: %(title_font)dpt;
+        margin-bottom: 10px;
+    }
+    QLabel[role="levelTitle"] {
+        font-weight: bold;
+        font-size: %(title_font)dpt;
+        margin-top: 20px;
+    }
+    QLabel[role="subtitle"] {
+        font-weight: bold;
+        margin-top: 15px;
+    }
+
+    /* Статусы согласованности */
+    QLabel[status="good"] {
+        color: green;
+    }
+    QLabel[status="warn"] {
+        color: orange;
+    }
+    QLabel[status="bad"] {
+        color: red;
+        font-weight: bold;
+    }
+
+    /* Кнопки */
+    QPushButton[role="primary"] {
+        font-weight: bold;
+        padding: 10px;
+        margin-top: 20px;
+        min-width: 200px;
+        background-color: #4CAF50;
+        color: white;
+        border: none;
+    }
+    QPushButton[role="primary"]:hover {
+        background-color: #45a049;
+    }
+    QPushButton[role="primary"][compact="true"] {
+        padding: 8px 12px;
+        margin-top: 0;
+        min-width: 120px;
+    }
+    QPushButton[role="action"] {
+        font-weight: bold;
+        padding: 8px;
+        margin: 10px;
+        min-width: 200px;
+    }
+    QPushButton[role="viewToggle"] {
+        padding: 8px 12px;
+        border: 1px solid %(toggle_border)s;
+        border-radius: 4px;
+        background: %(toggle_bg)s;
+        margin-right: 5px;
+        min-width: 80px;
+    }
+    QPushButton[role="viewToggle"]:hover {
+        background: %(toggle_hover)s;
+    }
+    QPushButton[role="viewToggle"]:checked {
+        background: #4CAF50;
+        color: white;
+        border-color: #3e8e41;
+        font-weight: bold;
+    }
+
+    /* Матрицы парных сравнений */
+    QFrame#matrixFrame {
+        background-color: %(matrix_frame_bg)s;
+        border-radius: 5px;
+        padding: 10px;
+        margin-bottom: 15px;
+    }
+    QLabel#saatyTip {
+        background-color: %(tip_bg)s;
+        border: 1px solid %(tip_border)s;
+        padding: 8px;
+        border-radius: 4px;
+        font-size: %(tip_font)dpt;
+        margin-bottom: 10px;
+    }
+    QLabel#matrixHeader {
+        font-weight: bold;
+        border: 1px solid %(header_border)s;
+        padding: 5px;
+        background-color: %(header_bg)s;
+        min-width: %(header_width)dpx;
+        min-height: 30px;
+        border-radius: 3px;
+    }
+    QLabel#matrixHeader[compact="true"] {
+        min-width: %(header_width_compact)dpx;
+    }
+    QLineEdit#matrixCell, QLabel#matrixCell {
+        border: 1px solid %(cell_border)s;
+        padding: 5px;
+        background-color: %(cell_bg)s;
+        font-size: %(matrix_font)dpt;
+        border-radius: 3px;
+    }
+    QLineEdit#matrixCell:focus {
+        border: 2px solid %(focus_border)s;
+    }
+"""
+
+
+def render_stylesheet(dark_mode: bool, scale: float) -> str:
+    """Собирает таблицу стилей для темы и масштаба"""
+    tokens = dict(THEMES['dark' if dark_mode else 'light'])
+    tokens.update({
+        'base_font': int(tokens['base_font'] * scale),
+        'matrix_font': int(tokens['matrix_font'] * scale),
+        'title_font': int(12 * scale),
+        'tip_font': int(10 * scale),
+        'header_width': int(90 * scale),
+        'header_width_compact': int(70 * scale),
+    })
+    return APP_STYLESHEET % tokens
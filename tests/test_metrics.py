@@ -0,0 +1,52 @@
+import itertools
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+
+
+def brute_kendall_distance(a, b):
+    total = 0.0
+    pairs = list(itertools.combinations(range(len(a)), 2))
+    for i, j in pairs:
+        sa, sb = np.sign(a[i] - a[j]), np.sign(b[i] - b[j])
+        if sa == 0 and sb == 0:
+            continue
+        total += 0.5 if sa == 0 or sb == 0 else float(sa != sb)
+    return total / len(pairs)
+
+
+def test_kendall_distance_of_tied_ranking_with_itself_is_zero():
+    priorities = np.array([[0.3, 0.3, 0.2, 0.2],
+                           [0.25, 0.25, 0.25, 0.25],
+                           [0.4, 0.3, 0.2, 0.1]])
+    distance = metrics.kendall_distance(priorities)
+    assert np.all(np.diag(distance) == 0)
+    assert np.all(np.diag(metrics.pairwise_metrics(priorities)['kendall_distance']) == 0)
+
+
+def test_kendall_distance_matches_pairwise_count():
+    rng = np.random.default_rng(0)
+    priorities = rng.integers(0, 4, (6, 9)).astype(float)
+    distance = metrics.kendall_distance(priorities)
+    expected = np.array([[brute_kendall_distance(a, b) for b in priorities] for a in priorities])
+    assert np.allclose(distance, expected)
+    assert np.allclose(distance, distance.T)
+
+
+def test_kendall_distance_does_not_depend_on_block_size(monkeypatch):
+    rng = np.random.default_rng(1)
+    priorities = rng.integers(0, 3, (5, 11)).astype(float)
+    expected = metrics.kendall_distance(priorities)
+    monkeypatch.setattr(metrics, 'KENDALL_BLOCK_ELEMENTS', 5 * 11 * 3)
+    assert np.allclose(metrics.kendall_distance(priorities), expected)
+    assert np.all(np.diag(metrics.kendall_distance(priorities)) == 0)
+
+
+def test_kendall_distance_reversed_order_is_one():
+    distance = metrics.kendall_distance(np.array([[0.4, 0.3, 0.2, 0.1], [0.1, 0.2, 0.3, 0.4]]))
+    assert np.allclose(distance, [[0, 1], [1, 0]])